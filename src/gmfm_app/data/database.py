@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 import os
+import threading
+import weakref
 from contextlib import contextmanager
 from pathlib import Path
 import sqlite3
-from typing import Generator, Optional, TYPE_CHECKING
+from typing import Dict, Generator, List, Optional, Sequence, TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover
     from gmfm_app.services.security import SecurityProvider
 
 APP_DB_NAME = "gmfm_app.db"
+MIGRATION_BATCH_SIZE = 500
+
+# Connection tuning applied to every pooled connection
+STATEMENT_CACHE_SIZE = 256
+MMAP_SIZE = 64 * 1024 * 1024
 
 
 def resolve_db_path(explicit: Optional[str] = None) -> Path:
@@ -106,6 +113,152 @@ def init_db(path: Path) -> None:
             pass
             
         conn.commit()
+        _apply_migrations(conn)
+
+
+def _migrate_packed_scores(conn: sqlite3.Connection) -> None:
+    """Convert legacy JSON raw_scores rows to the packed BLOB format."""
+    from gmfm_app.data.score_codec import decode_scores, encode_scores
+
+    read = conn.cursor()
+    read.execute("SELECT id, raw_scores FROM sessions WHERE typeof(raw_scores) = 'text'")
+    while True:
+        rows = read.fetchmany(MIGRATION_BATCH_SIZE)
+        if not rows:
+            break
+        updates = []
+        for session_id, raw in rows:
+            try:
+                updates.append((encode_scores(decode_scores(raw)), session_id))
+            except (ValueError, TypeError):
+                continue  # unreadable rows stay as text; readers still try them
+        conn.executemany("UPDATE sessions SET raw_scores = ? WHERE id = ?", updates)
+
+
+def _migrate_domain_columns(conn: sqlite3.Connection) -> None:
+    """Add denormalized domain percentages and backfill them for existing rows."""
+    from gmfm_app.data.score_codec import DOMAIN_COLUMNS, decode_scores, domain_column_values
+    from gmfm_app.scoring.engine import calculate_gmfm_scores_batch
+
+    for column in DOMAIN_COLUMNS:
+        try:
+            conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} REAL")
+        except sqlite3.OperationalError:
+            pass
+    try:
+        conn.execute("ALTER TABLE sessions ADD COLUMN items_scored INTEGER")
+    except sqlite3.OperationalError:
+        pass
+
+    assignments = ", ".join(f"{column} = ?" for column in DOMAIN_COLUMNS)
+    update_sql = f"UPDATE sessions SET {assignments}, items_scored = ? WHERE id = ?"
+    read = conn.cursor()
+    read.execute("SELECT id, scale, raw_scores FROM sessions WHERE items_scored IS NULL")
+    while True:
+        rows = read.fetchmany(MIGRATION_BATCH_SIZE)
+        if not rows:
+            break
+        by_scale = {}
+        for session_id, scale, raw in rows:
+            try:
+                by_scale.setdefault(scale, []).append((session_id, decode_scores(raw)))
+            except (ValueError, TypeError):
+                continue
+        updates = []
+        for scale, entries in by_scale.items():
+            results = calculate_gmfm_scores_batch([scores for _, scores in entries], scale=scale)
+            for (session_id, _), result in zip(entries, results):
+                updates.append(domain_column_values(result) + (session_id,))
+        conn.executemany(update_sql, updates)
+
+
+def _migrate_lookup_indexes(conn: sqlite3.Connection) -> None:
+    """Indexes backing every repository lookup (see tests/test_query_plans.py)."""
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sessions_student_created ON sessions (student_id, created_at DESC)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (created_at DESC)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_students_created ON students (created_at DESC, id DESC)")
+
+
+def _migrate_search_tokens(conn: sqlite3.Connection) -> None:
+    """Keyed-HMAC name tokens for searching encrypted names (see data/search_index.py).
+
+    The table is filled lazily on first search, when the encryption key is known.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS student_search_tokens (
+            token INTEGER NOT NULL,
+            student_id INTEGER NOT NULL,
+            PRIMARY KEY (token, student_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_search_tokens_student ON student_search_tokens (student_id)"
+    )
+
+
+def _migrate_import_ledger(conn: sqlite3.Connection) -> None:
+    """One row per imported DOCX file (see data/import_ledger.py).
+
+    Keyed by the SHA-256 of the file bytes so re-imports are skipped before
+    parsing; ``scores_sha256`` catches the same sheet saved as a new file.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS import_ledger (
+            file_sha256 TEXT PRIMARY KEY,
+            scores_sha256 TEXT NOT NULL,
+            student_id INTEGER,
+            session_id INTEGER,
+            imported_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_import_ledger_scores ON import_ledger (scores_sha256)")
+
+
+def _migrate_import_ledger_cleanup(conn: sqlite3.Connection) -> None:
+    """Drop ledger rows together with their session.
+
+    Session ids are reused (no AUTOINCREMENT, and bulk inserts take
+    MAX(id) + 1), so a stale row would otherwise match an unrelated session
+    that inherited the id and block the sheet from being imported again.
+    """
+    conn.execute("DELETE FROM import_ledger WHERE session_id NOT IN (SELECT id FROM sessions)")
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_delete_import_ledger
+        AFTER DELETE ON sessions
+        BEGIN
+            DELETE FROM import_ledger WHERE session_id = OLD.id;
+        END
+        """
+    )
+
+
+# (schema version, migration) pairs applied in order and tracked in PRAGMA user_version
+MIGRATIONS = [
+    (1, _migrate_packed_scores),
+    (2, _migrate_domain_columns),
+    (3, _migrate_lookup_indexes),
+    (4, _migrate_search_tokens),
+    (5, _migrate_import_ledger),
+    (6, _migrate_import_ledger_cleanup),
+]
+
+
+def _apply_migrations(conn: sqlite3.Connection) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migrate in MIGRATIONS:
+        if version >= target:
+            continue
+        migrate(conn)
+        conn.execute(f"PRAGMA user_version = {int(target)}")
+        conn.commit()
+        version = target
 
 
 _db_initialized: set = set()  # Track which DB paths have been initialized
@@ -132,19 +285,186 @@ def db_context(path: Path | None = None) -> Generator[sqlite3.Connection, None,
         conn.close()
 
 
+class _ThreadOwner:
+    """Weak-referenceable marker living in a thread's pool-local storage."""
+
+
+class ConnectionPool:
+    """Per-thread SQLite connections for one database file.
+
+    The database path is resolved (and the schema initialised) once, then each
+    thread reuses a single connection tuned for WAL mode. Nested ``connection()``
+    blocks on the same thread share the connection and only the outermost block
+    commits or rolls back. A thread's connection is closed when the thread
+    exits, so short-lived workers (exports, imports) don't leave one behind.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None) -> None:
+        self._explicit = db_path
+        self._path: Optional[Path] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._stats: Dict[str, int] = {"opened": 0, "closed": 0, "checkouts": 0, "reused": 0, "commits": 0, "rollbacks": 0}
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            with self._lock:
+                if self._path is None:
+                    resolved = resolve_db_path(str(self._explicit) if self._explicit else None)
+                    init_db(resolved)
+                    self._path = resolved
+        return self._path
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self._connections.append(conn)
+            self._stats["opened"] += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        return self._acquire(self._local)
+
+    def _acquire(self, local: threading.local) -> sqlite3.Connection:
+        conn = getattr(local, "conn", None)
+        with self._lock:
+            self._stats["checkouts"] += 1
+            if conn is not None:
+                self._stats["reused"] += 1
+        if conn is None:
+            conn = self._open()
+            local.conn = conn
+            local.depth = 0
+            # The thread-local is cleared when the thread exits, taking the
+            # owner with it; the finalizer then closes the connection
+            local.owner = owner = _ThreadOwner()
+            weakref.finalize(owner, self._discard, conn)
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if conn not in self._connections:
+                return  # already closed by close_all()
+            self._connections.remove(conn)
+            self._stats["closed"] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self) -> Generator[sqlite3.Connection, None, None]:
+        # close_all() may swap self._local while this block runs: finish on
+        # the thread-local the block started with
+        local = self._local
+        conn = self._acquire(local)
+        local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            local.depth -= 1
+            if local.depth == 0:
+                try:
+                    conn.rollback()
+                except sqlite3.ProgrammingError:
+                    pass  # closed by close_all(): nothing left to roll back
+                self._count("rollbacks")
+            raise
+        local.depth -= 1
+        if local.depth == 0:
+            # Raises sqlite3.ProgrammingError if close_all() closed the
+            # connection mid-block, since its uncommitted work is gone
+            conn.commit()
+            self._count("commits")
+
+    @contextmanager
+    def transaction(self) -> Generator[sqlite3.Connection, None, None]:
+        """A ``connection()`` block that takes the write lock up front (BEGIN IMMEDIATE).
+
+        Nested ``connection()``/``transaction()`` blocks on the same thread join
+        it; everything commits or rolls back together when the outermost block exits.
+        """
+        with self.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open"] = len(self._connections)
+        return stats
+
+    def close_all(self) -> None:
+        """Close every pooled connection; the next use re-resolves and re-initialises."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._path = None
+            # Dropped outside the lock: releasing it runs this thread's _discard
+            stale_local, self._local = self._local, threading.local()
+            for conn in connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+                self._stats["closed"] += 1
+        del stale_local
+
+
+_pools: Dict[Optional[str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: Path | None = None) -> ConnectionPool:
+    """Return the shared pool for a database path (None = default location)."""
+    key = str(Path(path).expanduser()) if path else None
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(Path(key) if key else None)
+        return pool
+
+
 class DatabaseContext:
     """Helper class to hand out SQLite connections with shared config/security."""
 
     def __init__(self, db_path: str | None = None, security: "SecurityProvider" | None = None):
         self.db_path = Path(db_path).expanduser() if db_path else None
         self.security = security
+        self.pool = get_pool(self.db_path)
+
+    @property
+    def path(self) -> Path:
+        return self.pool.path
 
     def connect(self) -> Generator[sqlite3.Connection, None, None]:
-        return db_context(self.db_path)
+        return self.pool.connection()
 
     def __call__(self) -> Generator[sqlite3.Connection, None, None]:
         return self.connect()
 
+    def unit_of_work(self) -> Generator[sqlite3.Connection, None, None]:
+        """One transaction spanning every repository call made inside the block."""
+        return self.pool.transaction()
+
+    def pool_stats(self) -> Dict[str, int]:
+        return self.pool.stats()
+
+    def close(self) -> None:
+        self.pool.close_all()
+
     # security helpers
     def encrypt(self, value: Optional[str]) -> Optional[str]:
         if self.security:
@@ -155,3 +475,19 @@ class DatabaseContext:
         if self.security:
             return self.security.decrypt(value)
         return value
+
+    def encrypt_many(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        if self.security:
+            return self.security.encrypt_many(values)
+        return list(values)
+
+    def decrypt_many(self, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+        if self.security:
+            return self.security.decrypt_many(values)
+        return list(values)
+
+    def search_key(self) -> Optional[bytes]:
+        """HMAC key for the blind search index, or None when running unencrypted."""
+        if self.security:
+            return self.security.blind_index_key()
+        return None
@@ -0,0 +1,100 @@
+"""Ledger of imported DOCX scoresheets.
+
+Every import is recorded under two digests:
+
+* ``file_sha256`` - SHA-256 of the file bytes, the primary key. A re-run
+  over an intake folder looks every file up by this key and only parses
+  the ones it has not seen;
+* ``scores_sha256`` - a keyed SHA-256 (HMAC, using the blind search index
+  key) of the student's normalized name, the assessment date and the packed
+  item scores. It catches the same sheet saved again as a different file,
+  without putting a plaintext-derived hash of names in the database.
+
+Entries only count while their session still exists, so deleting a session
+(or a student) makes the sheet importable again; a trigger removes the entry
+with its session, so a later session that reuses the id can't revive it.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from gmfm_app.data.search_index import UNENCRYPTED_INDEX_KEY, full_name
+from gmfm_app.scoring.packed import PackedScores
+
+HASH_CHUNK_SIZE = 1 << 20
+# SQLite's default limit on host parameters is 999 on older builds
+LOOKUP_BATCH_SIZE = 500
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImportLedger:
+    """Reads and writes ``import_ledger`` rows for one database."""
+
+    def __init__(self, db_context) -> None:
+        self.db_context = db_context
+        self._key = db_context.search_key() or UNENCRYPTED_INDEX_KEY
+
+    def scores_sha256(
+        self,
+        given_name: Optional[str],
+        family_name: Optional[str],
+        assessment_date: Optional[date],
+        raw_scores: Mapping[int, int],
+    ) -> str:
+        payload = b"\0".join((
+            full_name(given_name, family_name).encode("utf-8"),
+            assessment_date.isoformat().encode("ascii") if assessment_date else b"",
+            PackedScores.from_dict(raw_scores).to_bytes(),
+        ))
+        return hmac.new(self._key, payload, hashlib.sha256).hexdigest()
+
+    def known_files(self, conn, file_hashes: Iterable[str]) -> Dict[str, int]:
+        """Map each already-imported file hash to its (still existing) session id."""
+        hashes = list(dict.fromkeys(file_hashes))
+        found: Dict[str, int] = {}
+        for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+            batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+            rows = conn.execute(
+                "SELECT l.file_sha256, l.session_id FROM import_ledger l"
+                " JOIN sessions s ON s.id = l.session_id"
+                f" WHERE l.file_sha256 IN ({', '.join('?' for _ in batch)})",
+                batch,
+            )
+            found.update((file_hash, session_id) for file_hash, session_id in rows)
+        return found
+
+    def find_scores(self, conn, scores_hash: str) -> Optional[Tuple[int, int]]:
+        """(student_id, session_id) of an existing import of the same sheet, if any."""
+        return conn.execute(
+            "SELECT l.student_id, l.session_id FROM import_ledger l"
+            " JOIN sessions s ON s.id = l.session_id"
+            " WHERE l.scores_sha256 = ? LIMIT 1",
+            (scores_hash,),
+        ).fetchone()
+
+    def record(
+        self,
+        conn,
+        file_hash: str,
+        scores_hash: str,
+        student_id: Optional[int],
+        session_id: Optional[int],
+    ) -> None:
+        # REPLACE: an entry whose session was deleted is simply overwritten.
+        # File names are not stored; they often contain the student's name.
+        conn.execute(
+            "INSERT OR REPLACE INTO import_ledger"
+            " (file_sha256, scores_sha256, student_id, session_id, imported_at) VALUES (?, ?, ?, ?, ?)",
+            (file_hash, scores_hash, student_id, session_id, datetime.utcnow().isoformat()),
+        )
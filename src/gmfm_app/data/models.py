@@ -3,6 +3,8 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Dict, Optional, Literal
 
+from gmfm_app.scoring.packed import PackedScores
+
 try:
     from pydantic import BaseModel, Field, constr, conint
 
@@ -22,6 +24,8 @@ try:
         total_score: Optional[float] = None
         notes: Optional[str] = None
         created_at: datetime = Field(default_factory=datetime.utcnow)
+        domain_scores: Optional[Dict[str, float]] = None
+        items_scored: Optional[int] = None
 
 except Exception:
     from dataclasses import dataclass, field
@@ -73,9 +77,15 @@ except Exception:
         total_score: Optional[float] = None
         notes: Optional[str] = None
         created_at: datetime = field(default_factory=datetime.utcnow)
+        # denormalized per-domain percentages keyed by domain letter ("A".."E")
+        domain_scores: Optional[Dict[str, float]] = None
+        items_scored: Optional[int] = None
 
         def __post_init__(self):
             self.created_at = _parse_datetime(self.created_at)
+            # PackedScores are already canonical; only plain dicts need coercion
+            if isinstance(self.raw_scores, PackedScores):
+                return
             # Ensure raw_scores keys are ints (json.loads returns string keys)
             if self.raw_scores and isinstance(self.raw_scores, dict):
                 self.raw_scores = {int(k): int(v) for k, v in self.raw_scores.items()}
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
-import json
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 from datetime import datetime, date
 
 from gmfm_app.data.database import DatabaseContext
 from gmfm_app.data.models import Student, Session
+from gmfm_app.data.score_codec import (
+    DOMAIN_COLUMNS,
+    decode_scores,
+    domain_column_values,
+    encode_scores,
+    pop_domain_scores,
+    score_many,
+    summarize_scores,
+)
+from gmfm_app.data.search_index import StudentSearchIndex, full_name, matches, normalize
+from gmfm_app.scoring.packed import PackedScores
 
 
 class BaseRepository:
@@ -22,21 +32,87 @@ class BaseRepository:
     def _decrypt(self, value: Optional[str]) -> Optional[str]:
         return self.db.decrypt(value)
 
+    def _encrypt_many(self, values: List[Optional[str]]) -> List[Optional[str]]:
+        return self.db.encrypt_many(values)
+
+    def _decrypt_many(self, values: List[Optional[str]]) -> List[Optional[str]]:
+        return self.db.decrypt_many(values)
+
+
+# Keyset pagination cursor for the students list: (created_at, id) of the last row seen
+StudentCursor = Tuple[str, int]
+
 
 class StudentRepository(BaseRepository):
+    STUDENT_COLUMNS = ("id", "given_name", "family_name", "dob", "identifier", "created_at")
+
+    _search_index: Optional[StudentSearchIndex] = None
+
+    @property
+    def search_index(self) -> StudentSearchIndex:
+        # Rebuilt after a key rotation: tokens from the old key would go stale
+        if self._search_index is None or not self._search_index.is_current():
+            self._search_index = StudentSearchIndex(self.db)
+        return self._search_index
+
+    def from_row(self, row) -> Student:
+        """Build a decrypted Student from a row holding the students columns."""
+        data = {key: row[key] for key in self.STUDENT_COLUMNS}
+        data["given_name"] = self._decrypt(data.get("given_name"))
+        data["family_name"] = self._decrypt(data.get("family_name"))
+        data["identifier"] = self._decrypt(data.get("identifier"))
+        return Student(**data)
+
+    def from_rows(self, rows) -> List[Student]:
+        """Bulk ``from_row``: all encrypted fields are decrypted in one batch."""
+        encrypted = ("given_name", "family_name", "identifier")
+        records = [{key: row[key] for key in self.STUDENT_COLUMNS} for row in rows]
+        plain = iter(self._decrypt_many([record[key] for record in records for key in encrypted]))
+        students = []
+        for record in records:
+            for key in encrypted:
+                record[key] = next(plain)
+            students.append(Student(**record))
+        return students
+
+    @staticmethod
+    def cursor_for(row) -> StudentCursor:
+        """Keyset cursor that resumes the newest-first listing after *row*.
+
+        Built from the stored ``created_at`` text, not the parsed datetime:
+        stored values that don't round-trip through ``isoformat()`` (a space
+        separator, an unparsable date) would otherwise skip or repeat rows.
+        """
+        return (row["created_at"], row["id"])
+
     def list_students(self, limit: int = 50) -> List[Student]:
         with self.db() as conn:  # type: ignore[misc]
             cur = conn.cursor()
-            cur.execute("SELECT * FROM students ORDER BY created_at DESC LIMIT ?", (limit,))
+            cur.execute("SELECT * FROM students ORDER BY created_at DESC, id DESC LIMIT ?", (limit,))
+            return self.from_rows(cur.fetchall())
+
+    def list_students_page(
+        self, after: Optional[StudentCursor] = None, limit: int = 50
+    ) -> Tuple[List[Student], Optional[StudentCursor]]:
+        """Return one newest-first page of students and the cursor for the next page.
+
+        The cursor is None once the last page has been returned. Pages are
+        seeked through the (created_at, id) index, so deep pages cost the same
+        as the first one.
+        """
+        with self.db() as conn:  # type: ignore[misc]
+            cur = conn.cursor()
+            if after is None:
+                cur.execute("SELECT * FROM students ORDER BY created_at DESC, id DESC LIMIT ?", (limit + 1,))
+            else:
+                cur.execute(
+                    "SELECT * FROM students WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (after[0], after[1], limit + 1),
+                )
             rows = cur.fetchall()
-            students: List[Student] = []
-            for row in rows:
-                data = dict(row)
-                data["given_name"] = self._decrypt(data.get("given_name"))
-                data["family_name"] = self._decrypt(data.get("family_name"))
-                data["identifier"] = self._decrypt(data.get("identifier"))
-                students.append(Student(**data))
-            return students
+        students = self.from_rows(rows[:limit])
+        next_cursor = self.cursor_for(rows[limit - 1]) if len(rows) > limit else None
+        return students, next_cursor
 
     def get_student(self, student_id: int) -> Optional[Student]:
         with self.db() as conn:  # type: ignore[misc]
@@ -45,11 +121,7 @@ class StudentRepository(BaseRepository):
             row = cur.fetchone()
             if row is None:
                 return None
-            data = dict(row)
-            data["given_name"] = self._decrypt(data.get("given_name"))
-            data["family_name"] = self._decrypt(data.get("family_name"))
-            data["identifier"] = self._decrypt(data.get("identifier"))
-            return Student(**data)
+            return self.from_row(row)
 
     def create_student(self, student: Student) -> Student:
         with self.db() as conn:  # type: ignore[misc]
@@ -65,8 +137,41 @@ class StudentRepository(BaseRepository):
                 ),
             )
             student.id = cur.lastrowid
+            self.search_index.index_student(conn, student.id, student.given_name, student.family_name)
             return student
 
+    def bulk_create_students(self, students: Sequence[Student]) -> List[Student]:
+        """Insert many students in one transaction (one executemany); ids are set in order."""
+        students = list(students)
+        if not students:
+            return students
+        fields = self._encrypt_many(
+            [value for student in students for value in (student.given_name, student.family_name, student.identifier)]
+        )
+        with self.db.unit_of_work() as conn:
+            # The write lock is held, so ids after the current maximum are ours
+            first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM students").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO students (id, given_name, family_name, dob, identifier, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        first_id + offset,
+                        fields[3 * offset],
+                        fields[3 * offset + 1],
+                        student.dob.isoformat() if student.dob else None,
+                        fields[3 * offset + 2],
+                        student.created_at.isoformat(),
+                    )
+                    for offset, student in enumerate(students)
+                ],
+            )
+            self.search_index.add_students(
+                conn, ((first_id + offset, s.given_name, s.family_name) for offset, s in enumerate(students))
+            )
+        for offset, student in enumerate(students):
+            student.id = first_id + offset
+        return students
+
     def update_student(self, student: Student) -> Student:
         if student.id is None:
             raise ValueError("Student must have id for update")
@@ -82,32 +187,137 @@ class StudentRepository(BaseRepository):
                     student.id,
                 ),
             )
+            self.search_index.index_student(conn, student.id, student.given_name, student.family_name)
             return student
 
     def delete_student(self, student_id: int) -> None:
         with self.db() as conn:  # type: ignore[misc]
             cur = conn.cursor()
             cur.execute("DELETE FROM students WHERE id = ?", (student_id,))
+            self.search_index.remove_student(conn, student_id)
+
+    def delete_student_cascade(self, student_id: int) -> int:
+        """Delete a student and all of their sessions in one transaction. Returns sessions removed."""
+        with self.db.unit_of_work() as conn:
+            removed = conn.execute("DELETE FROM sessions WHERE student_id = ?", (student_id,)).rowcount
+            conn.execute("DELETE FROM students WHERE id = ?", (student_id,))
+            self.search_index.remove_student(conn, student_id)
+        return removed
+
+    def search_students(self, term: str, limit: int = 50) -> List[Student]:
+        """Students whose full name contains *term* (1-2 letter terms match word starts).
+
+        Candidates come from the blind token index, so only matching rows are
+        decrypted; newest students first.
+        """
+        term = normalize(term)
+        if not term:
+            return []
+        results: List[Student] = []
+        with self.db() as conn:  # type: ignore[misc]
+            self.search_index.ensure(conn)
+            for row in self.search_index.candidate_rows(conn, term):
+                student = self.from_row(row)
+                if matches(term, full_name(student.given_name, student.family_name)):
+                    results.append(student)
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def find_student_by_name(self, given_name: Optional[str], family_name: Optional[str]) -> Optional[Student]:
+        """Newest student whose normalized given and family names both match exactly."""
+        given, family = normalize(given_name), normalize(family_name)
+        for student in self.search_students(full_name(given, family)):
+            if normalize(student.given_name) == given and normalize(student.family_name) == family:
+                return student
+        return None
+
+
+_SESSION_INSERT_COLUMNS = (
+    "student_id", "scale", "raw_scores", "total_score", "notes", "created_at", *DOMAIN_COLUMNS, "items_scored"
+)
+_SESSION_INSERT_SQL = "INSERT INTO sessions ({}) VALUES ({})".format(
+    ", ".join(_SESSION_INSERT_COLUMNS), ", ".join("?" for _ in _SESSION_INSERT_COLUMNS)
+)
+# Bulk inserts assign ids up front so executemany can hand them back
+_SESSION_BULK_INSERT_SQL = "INSERT INTO sessions (id, {}) VALUES (?, {})".format(
+    ", ".join(_SESSION_INSERT_COLUMNS), ", ".join("?" for _ in _SESSION_INSERT_COLUMNS)
+)
+_SESSION_UPDATE_SQL = (
+    "UPDATE sessions SET raw_scores=?, total_score=?, notes=?, "
+    + ", ".join(f"{column}=?" for column in DOMAIN_COLUMNS)
+    + ", items_scored=? WHERE id=?"
+)
+
+
+def _session_from_row(row) -> Session:
+    data = dict(row)
+    data["raw_scores"] = decode_scores(data.get("raw_scores"))
+    data["domain_scores"] = pop_domain_scores(data)
+    return Session(**data)
+
+
+def _session_insert_values(session: Session, summary) -> tuple:
+    return (
+        session.student_id,
+        session.scale,
+        encode_scores(session.raw_scores),
+        session.total_score if session.total_score is not None else 0.0,
+        session.notes,
+        session.created_at.isoformat(),
+        *summary,
+    )
+
+
+def _apply_summary(session: Session, summary) -> None:
+    """Mirror the denormalized column values onto the in-memory session."""
+    session.domain_scores = {
+        column[-1].upper(): value for column, value in zip(DOMAIN_COLUMNS, summary) if value is not None
+    }
+    session.items_scored = summary[-1]
 
 
 class SessionRepository(BaseRepository):
     def create_session(self, session: Session) -> Session:
+        summary = summarize_scores(session.raw_scores, session.scale)
         with self.db() as conn:  # type: ignore[misc]
             cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO sessions (student_id, scale, raw_scores, total_score, notes, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                (
-                    session.student_id,
-                    session.scale,
-                    json.dumps(session.raw_scores),
-                    session.total_score if session.total_score is not None else 0.0,
-                    session.notes,
-                    session.created_at.isoformat(),
-                ),
-            )
+            cur.execute(_SESSION_INSERT_SQL, _session_insert_values(session, summary))
             session.id = cur.lastrowid
+            _apply_summary(session, summary)
             return session
 
+    def bulk_create_sessions(self, sessions: Sequence[Session]) -> List[Session]:
+        """Insert many sessions in one transaction; domain columns come from batch scoring.
+
+        Sessions without a ``total_score`` get the engine's ``total_percent``,
+        the same total ScoringView saves.
+        """
+        sessions = list(sessions)
+        if not sessions:
+            return sessions
+        for session in sessions:
+            session.raw_scores = PackedScores.from_dict(session.raw_scores)  # pack once for scoring and storage
+        results = score_many([(session.raw_scores, session.scale) for session in sessions])
+        summaries = []
+        for session, result in zip(sessions, results):
+            if session.total_score is None:
+                session.total_score = result["total_percent"]
+            summaries.append(domain_column_values(result))
+        with self.db.unit_of_work() as conn:
+            first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM sessions").fetchone()[0]
+            conn.executemany(
+                _SESSION_BULK_INSERT_SQL,
+                [
+                    (first_id + offset, *_session_insert_values(session, summary))
+                    for offset, (session, summary) in enumerate(zip(sessions, summaries))
+                ],
+            )
+        for offset, (session, summary) in enumerate(zip(sessions, summaries)):
+            session.id = first_id + offset
+            _apply_summary(session, summary)
+        return sessions
+
     def get_session(self, session_id: int) -> Optional[Session]:
         with self.db() as conn:  # type: ignore[misc]
             cur = conn.cursor()
@@ -115,21 +325,13 @@ class SessionRepository(BaseRepository):
             row = cur.fetchone()
             if row is None:
                 return None
-            data = dict(row)
-            data["raw_scores"] = json.loads(data["raw_scores"]) if data.get("raw_scores") else {}
-            return Session(**data)
+            return _session_from_row(row)
 
     def list_sessions_for_student(self, student_id: int) -> List[Session]:
         with self.db() as conn:  # type: ignore[misc]
             cur = conn.cursor()
             cur.execute("SELECT * FROM sessions WHERE student_id = ? ORDER BY created_at DESC", (student_id,))
-            rows = cur.fetchall()
-            sessions: List[Session] = []
-            for r in rows:
-                data = dict(r)
-                data["raw_scores"] = json.loads(data["raw_scores"]) if data.get("raw_scores") else {}
-                sessions.append(Session(**data))
-            return sessions
+            return [_session_from_row(r) for r in cur.fetchall()]
 
     def get_latest_session_for_student(self, student_id: int) -> Optional[Session]:
         with self.db() as conn:  # type: ignore[misc]
@@ -141,9 +343,7 @@ class SessionRepository(BaseRepository):
             row = cur.fetchone()
             if row is None:
                 return None
-            data = dict(row)
-            data["raw_scores"] = json.loads(data["raw_scores"]) if data.get("raw_scores") else {}
-            return Session(**data)
+            return _session_from_row(row)
 
     def delete_session(self, session_id: int) -> None:
         with self.db() as conn:  # type: ignore[misc]
@@ -156,8 +356,7 @@ class SessionRepository(BaseRepository):
             cur = conn.cursor()
             cur.execute(
                 """
-                SELECT s.id, s.student_id, s.scale, s.raw_scores, s.total_score,
-                       s.notes, s.created_at, st.given_name, st.family_name
+                SELECT s.*, st.given_name, st.family_name
                 FROM sessions s
                 JOIN students st ON s.student_id = st.id
                 ORDER BY s.created_at DESC
@@ -171,8 +370,7 @@ class SessionRepository(BaseRepository):
                 data = dict(r)
                 given = data.pop("given_name", "")
                 family = data.pop("family_name", "")
-                data["raw_scores"] = json.loads(data["raw_scores"]) if data.get("raw_scores") else {}
-                sess = Session(**data)
+                sess = _session_from_row(data)
                 results.append({"session": sess, "given_name": given, "family_name": family})
             return results
 
@@ -184,6 +382,42 @@ class SessionRepository(BaseRepository):
             row = cur.fetchone()
             return {"total_sessions": row["cnt"] or 0, "avg_score": row["avg_score"] or 0}
 
+    def get_domain_averages(self, student_id: Optional[int] = None) -> dict:
+        """Average stored domain percentages, optionally for one student. Returns {"A": float, ...}."""
+        averages = ", ".join(f"AVG({column}) AS {column}" for column in DOMAIN_COLUMNS)
+        sql = f"SELECT {averages} FROM sessions"
+        params: tuple = ()
+        if student_id is not None:
+            sql += " WHERE student_id = ?"
+            params = (student_id,)
+        with self.db() as conn:  # type: ignore[misc]
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            row = cur.fetchone()
+            return {column[-1].upper(): row[column] for column in DOMAIN_COLUMNS if row[column] is not None}
+
+    def get_domain_trend(self, student_id: int) -> List[dict]:
+        """Per-session total and domain percentages for a student, oldest first, without rescoring."""
+        columns = ", ".join(DOMAIN_COLUMNS)
+        with self.db() as conn:  # type: ignore[misc]
+            cur = conn.cursor()
+            cur.execute(
+                f"SELECT id, created_at, total_score, items_scored, {columns} FROM sessions "
+                "WHERE student_id = ? ORDER BY created_at",
+                (student_id,),
+            )
+            trend = []
+            for r in cur.fetchall():
+                data = dict(r)
+                trend.append({
+                    "session_id": data["id"],
+                    "created_at": datetime.fromisoformat(data["created_at"]),
+                    "total_score": data["total_score"],
+                    "items_scored": data["items_scored"],
+                    "domains": pop_domain_scores(data) or {},
+                })
+            return trend
+
     def get_latest_session_per_student(self) -> dict:
         """Get latest session for every student in one query. Returns {student_id: Session}."""
         with self.db() as conn:  # type: ignore[misc]
@@ -197,12 +431,9 @@ class SessionRepository(BaseRepository):
                 ) latest ON s.student_id = latest.student_id AND s.created_at = latest.max_date
                 """
             )
-            rows = cur.fetchall()
             result = {}
-            for r in rows:
-                data = dict(r)
-                data["raw_scores"] = json.loads(data["raw_scores"]) if data.get("raw_scores") else {}
-                sess = Session(**data)
+            for r in cur.fetchall():
+                sess = _session_from_row(r)
                 result[sess.student_id] = sess
             return result
 
@@ -210,15 +441,18 @@ class SessionRepository(BaseRepository):
         """Update an existing session's scores and notes."""
         if session.id is None:
             raise ValueError("Session must have id for update")
+        summary = summarize_scores(session.raw_scores, session.scale)
         with self.db() as conn:  # type: ignore[misc]
             cur = conn.cursor()
             cur.execute(
-                "UPDATE sessions SET raw_scores=?, total_score=?, notes=? WHERE id=?",
+                _SESSION_UPDATE_SQL,
                 (
-                    json.dumps(session.raw_scores),
+                    encode_scores(session.raw_scores),
                     session.total_score if session.total_score is not None else 0.0,
                     session.notes,
+                    *summary,
                     session.id,
                 ),
             )
+            _apply_summary(session, summary)
             return session
@@ -0,0 +1,71 @@
+"""Storage encoding for ``sessions.raw_scores``.
+
+New rows store a BLOB: one format byte followed by the 33-byte PackedScores
+buffer. Rows written by older versions hold JSON text; readers accept both.
+"""
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from gmfm_app.scoring.engine import calculate_gmfm_scores, calculate_gmfm_scores_batch
+from gmfm_app.scoring.packed import PACKED_SIZE, PackedScores
+from gmfm_app.scoring.plan import get_scoring_plan
+
+FORMAT_PACKED_V1 = 1
+
+# Denormalized per-domain percentages stored next to total_score
+DOMAIN_COLUMNS = ("domain_a", "domain_b", "domain_c", "domain_d", "domain_e")
+
+
+def encode_scores(raw_scores: Optional[Mapping[int, int]]) -> bytes:
+    packed = PackedScores.from_dict(raw_scores or {})
+    return bytes((FORMAT_PACKED_V1,)) + packed.to_bytes()
+
+
+def decode_scores(value: Union[bytes, str, None]) -> PackedScores:
+    if not value:
+        return PackedScores()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value)
+        if value[0] == FORMAT_PACKED_V1 and len(value) == 1 + PACKED_SIZE:
+            return PackedScores(value[1:])
+        raise ValueError(f"Unknown raw_scores format byte: {value[0]}")
+    # legacy JSON text with string keys
+    return PackedScores.from_dict(json.loads(value))
+
+
+def domain_column_values(result: Mapping[str, object]) -> Tuple[Optional[float], ...]:
+    """Map an engine result onto DOMAIN_COLUMNS + items_scored."""
+    plan = get_scoring_plan(str(result["scale"]))
+    domains = result["domains"]
+    by_letter: Dict[str, float] = {
+        dimension.lower(): domains[name]["percent"]  # type: ignore[index]
+        for dimension, name in zip(plan.dimensions, plan.domain_names)
+    }
+    values = tuple(by_letter.get(column[-1]) for column in DOMAIN_COLUMNS)
+    return values + (result["items_scored"],)
+
+
+def summarize_scores(raw_scores: Mapping[int, int], scale: str) -> Tuple[Optional[float], ...]:
+    return domain_column_values(calculate_gmfm_scores(raw_scores, scale=scale))
+
+
+def score_many(entries: Sequence[Tuple[Mapping[int, int], str]]) -> List[Dict[str, object]]:
+    """Engine results for (raw_scores, scale) pairs: one batch pass per scale, input order kept."""
+    by_scale: Dict[str, List[int]] = {}
+    for index, (_, scale) in enumerate(entries):
+        by_scale.setdefault(scale, []).append(index)
+    results: List[Dict[str, object]] = [{}] * len(entries)
+    for scale, indexes in by_scale.items():
+        for index, result in zip(indexes, calculate_gmfm_scores_batch([entries[i][0] for i in indexes], scale=scale)):
+            results[index] = result
+    return results
+
+
+def pop_domain_scores(data: Dict[str, object]) -> Optional[Dict[str, float]]:
+    """Remove the denormalized columns from a row dict, keyed by domain letter."""
+    values = {column[-1].upper(): data.pop(column, None) for column in DOMAIN_COLUMNS}
+    if all(v is None for v in values.values()):
+        return None
+    return {letter: v for letter, v in values.items() if v is not None}
@@ -0,0 +1,173 @@
+"""Blind search index over encrypted student names.
+
+Names are stored Fernet-encrypted, so SQL cannot match them. Instead every
+student gets a set of keyed-HMAC tokens in ``student_search_tokens``: one per
+trigram of the normalized full name and one per 1-2 character word prefix.
+A search hashes the query the same way and intersects the token postings in
+SQL; only the (few) candidate rows are decrypted to confirm the match. The
+table never holds plaintext, and without the key the tokens cannot be
+reversed or recomputed.
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Set, Tuple
+
+from gmfm_app.data.database import MIGRATION_BATCH_SIZE
+
+GRAM_SIZE = 3
+MAX_PREFIX = GRAM_SIZE - 1
+FINGERPRINT_SETTING = "search_index_key"
+
+# Key used when the database runs without encryption; names are plaintext then anyway
+UNENCRYPTED_INDEX_KEY = b"gmfm-search-index"
+
+_ready: Set[Tuple[str, str]] = set()  # (db path, key fingerprint) pairs known to be fully indexed
+_ready_lock = threading.Lock()
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+def full_name(given: Optional[str], family: Optional[str]) -> str:
+    return normalize(f"{given or ''} {family or ''}")
+
+
+def name_grams(name: str) -> Set[str]:
+    """Index terms for a normalized full name: trigrams plus short word prefixes."""
+    grams = {"t:" + name[i:i + GRAM_SIZE] for i in range(len(name) - GRAM_SIZE + 1)}
+    for word in name.split():
+        for size in range(1, min(MAX_PREFIX, len(word)) + 1):
+            grams.add("p:" + word[:size])
+    return grams
+
+
+def query_grams(term: str) -> Set[str]:
+    """Index terms that every match of *term* must carry."""
+    if len(term) >= GRAM_SIZE:
+        return {"t:" + term[i:i + GRAM_SIZE] for i in range(len(term) - GRAM_SIZE + 1)}
+    return {"p:" + term} if term else set()
+
+
+def matches(term: str, name: str) -> bool:
+    """Exact check applied to decrypted candidates (mirrors ``query_grams``)."""
+    if len(term) >= GRAM_SIZE:
+        return term in name
+    return any(word.startswith(term) for word in name.split())
+
+
+class StudentSearchIndex:
+    """Maintains and queries the HMAC token table for one database."""
+
+    def __init__(self, db_context) -> None:
+        self.db_context = db_context
+        key = self._key = db_context.search_key() or UNENCRYPTED_INDEX_KEY
+        self.fingerprint = hmac.new(key, b"fingerprint", hashlib.sha256).hexdigest()[:16]
+        # HMAC-SHA256 with the keyed inner/outer states precomputed (RFC 2104);
+        # copying two hash states is about twice as fast as hmac.HMAC.copy()
+        block = key if len(key) <= 64 else hashlib.sha256(key).digest()
+        block = block.ljust(64, b"\0")
+        self._inner = hashlib.sha256(block.translate(hmac.trans_36))
+        self._outer = hashlib.sha256(block.translate(hmac.trans_5C))
+
+    def is_current(self) -> bool:
+        """False once the database's search key has changed (after a key rotation)."""
+        return (self.db_context.search_key() or UNENCRYPTED_INDEX_KEY) == self._key
+
+    def token(self, gram: str) -> int:
+        inner = self._inner.copy()
+        inner.update(gram.encode("utf-8"))
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return int.from_bytes(outer.digest()[:8], "big", signed=True)
+
+    def tokens(self, given: Optional[str], family: Optional[str]) -> List[int]:
+        return [self.token(gram) for gram in name_grams(full_name(given, family))]
+
+    # maintenance -------------------------------------------------------
+    def index_student(self, conn: sqlite3.Connection, student_id: int, given: Optional[str], family: Optional[str]) -> None:
+        conn.execute("DELETE FROM student_search_tokens WHERE student_id = ?", (student_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO student_search_tokens (token, student_id) VALUES (?, ?)",
+            [(token, student_id) for token in self.tokens(given, family)],
+        )
+
+    def remove_student(self, conn: sqlite3.Connection, student_id: int) -> None:
+        conn.execute("DELETE FROM student_search_tokens WHERE student_id = ?", (student_id,))
+
+    def add_students(self, conn: sqlite3.Connection, names: Iterable[Tuple[int, Optional[str], Optional[str]]]) -> None:
+        """Insert tokens for (student_id, given, family) plaintext triples not yet indexed."""
+        conn.executemany(
+            "INSERT OR IGNORE INTO student_search_tokens (token, student_id) VALUES (?, ?)",
+            [(token, student_id) for student_id, given, family in names for token in self.tokens(given, family)],
+        )
+
+    def mark_built(self, conn: sqlite3.Connection) -> None:
+        """Record that every student is indexed under the current key."""
+        conn.execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (FINGERPRINT_SETTING, self.fingerprint)
+        )
+
+    def rebuild(self, conn: sqlite3.Connection) -> int:
+        """Re-tokenize every student (decrypting each name once). Returns rows indexed."""
+        conn.execute("DELETE FROM student_search_tokens")
+        read = conn.execute("SELECT id, given_name, family_name FROM students")
+        count = 0
+        while True:
+            rows = read.fetchmany(MIGRATION_BATCH_SIZE)
+            if not rows:
+                break
+            names = self.db_context.decrypt_many([name for _, given, family in rows for name in (given, family)])
+            self.add_students(conn, ((row[0], names[2 * i], names[2 * i + 1]) for i, row in enumerate(rows)))
+            count += len(rows)
+        self.mark_built(conn)
+        return count
+
+    def ensure(self, conn: sqlite3.Connection) -> None:
+        """Build the index on first use, or after the key changed."""
+        marker = (str(self.db_context.path), self.fingerprint)
+        if marker in _ready:
+            return
+        row = conn.execute("SELECT value FROM settings WHERE key = ?", (FINGERPRINT_SETTING,)).fetchone()
+        if row is None or row[0] != self.fingerprint:
+            self.rebuild(conn)
+        if conn.in_transaction:
+            # The rebuild (or a marker we just read) may still roll back with
+            # the enclosing transaction: check the marker again next time
+            return
+        with _ready_lock:
+            _ready.add(marker)
+
+    # lookup ------------------------------------------------------------
+    def candidate_rows(self, conn: sqlite3.Connection, term: str) -> Iterable[sqlite3.Row]:
+        """Student rows carrying every token of *term*, newest first."""
+        tokens = sorted({self.token(gram) for gram in query_grams(term)})
+        if not tokens:
+            return []
+        placeholders = ", ".join("?" for _ in tokens)
+        return conn.execute(
+            f"""
+            SELECT st.* FROM students st
+            JOIN (
+                SELECT student_id FROM student_search_tokens
+                WHERE token IN ({placeholders})
+                GROUP BY student_id
+                HAVING COUNT(*) = ?
+            ) hits ON hits.student_id = st.id
+            ORDER BY st.created_at DESC, st.id DESC
+            """,
+            (*tokens, len(tokens)),
+        )
+
+
+def forget_ready(path=None) -> None:
+    """Drop the in-process 'already indexed' markers (all, or for one database path)."""
+    with _ready_lock:
+        if path is None:
+            _ready.clear()
+        else:
+            _ready.difference_update({marker for marker in _ready if marker[0] == str(path)})
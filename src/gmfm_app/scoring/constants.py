@@ -49,6 +49,10 @@ class _LazyItems:
 
 
 GMFM88_ITEMS = _LazyItems("88")
+GMFM66_ITEMS = _LazyItems("66")
 
 # Maximum score per item (0-3 per manual)
 MAX_ITEM_SCORE = 3
+
+# Byte value marking a not-tested (NT) item in packed score vectors
+NOT_TESTED = 0xFF
@@ -1,76 +1,246 @@
-"""GMFM-88 scoring engine.
-Calculates domain percentages and total percentage for GMFM-88.
+"""GMFM-66/88 scoring engine.
+Calculates domain percentages and total percentage for GMFM-88 or the
+GMFM-66 item subset.
 Input: raw_scores -> dict[int, int] mapping item_id to score (0..3)
 Output: dict with per-domain percent (0-100) and total_percent
 """
 from __future__ import annotations
 
-from typing import Dict, Iterable, Tuple
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
 
-from gmfm_app.scoring.constants import GMFM88_ITEMS, MAX_ITEM_SCORE
+from gmfm_app.scoring.constants import MAX_ITEM_SCORE, NOT_TESTED
+from gmfm_app.scoring.packed import ITEM_COUNT, PackedScores
+from gmfm_app.scoring.plan import ScoringPlan, get_scoring_plan
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # Android builds ship without numpy
+    np = None
+    NUMPY_AVAILABLE = False
 
-def _score_domain(item_ids: Iterable[int], raw_scores: Dict[int, int]) -> Tuple[float, int]:
-    """Return (percent, n_items) for given domain."""
-    if not item_ids:
-        return 0.0, 0
-    total = 0
-    count = 0
-    for iid in item_ids:
-        if iid in raw_scores:
-            val = raw_scores[iid]
-            # clamp 0..MAX_ITEM_SCORE
-            val = max(0, min(MAX_ITEM_SCORE, int(val)))
-            total += val
-            count += 1
-    if count == 0:
-        return 0.0, len(list(item_ids))
-    max_possible = count * MAX_ITEM_SCORE
-    percent = (total / max_possible) * 100.0
-    return percent, count
+
+def _build_result(plan: ScoringPlan, sums: Sequence[float], counts: Sequence[int], scale: str) -> Dict[str, object]:
+    """Turn per-domain raw sums and scored counts into the engine result dict."""
+    domains: Dict[str, Dict[str, object]] = {}
+    total_score = 0.0
+    total_items_scored = 0
+    for d, name in enumerate(plan.domain_names):
+        count = counts[d]
+        size = plan.domain_size(d)
+        percent = (sums[d] / (count * MAX_ITEM_SCORE)) * 100.0 if count else 0.0
+        domains[name] = {"percent": round(percent, 2), "n_items_scored": count, "n_items_total": size}
+        total_items_scored += count
+        # convert the domain percent back to a raw contribution over the whole domain
+        total_score += (percent / 100.0) * plan.domain_max_scores[d]
+
+    # total percent computed as (sum of raw scores) / (max_possible_all_items) *100
+    max_possible_all = plan.max_score if plan.n_items > 0 else 1
+    total_percent = (total_score / max_possible_all) * 100.0
+
+    return {
+        "scale": scale,
+        "domains": domains,
+        "total_percent": round(total_percent, 2),
+        "items_scored": total_items_scored,
+        "items_total": plan.n_items,
+    }
+
+
+SCORE_CACHE_SIZE = 512
+
+
+class _ScoreCache:
+    """Bounded LRU of scoring results keyed by (scale, PackedScores bytes)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, bytes], Dict[str, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, bytes]):
+        with self._lock:
+            result = self._data.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Tuple[str, bytes], result: Dict[str, object]) -> None:
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "maxsize": self.maxsize, "currsize": len(self._data)}
+
+
+_score_cache = _ScoreCache(SCORE_CACHE_SIZE)
+
+
+def scoring_cache_info() -> Dict[str, int]:
+    """Return hit/miss counters and size of the scoring result cache."""
+    return _score_cache.info()
+
+
+def clear_scoring_cache() -> None:
+    _score_cache.clear()
+
+
+_ALL_ITEMS = tuple(range(1, ITEM_COUNT + 1))
 
 
-def calculate_gmfm_scores(raw_scores: Dict[int, int], scale: str = "88") -> Dict[str, object]:
-    """Calculate domain percentages and total for GMFM-88.
+def score_fingerprint(raw_scores: Mapping[int, int], scale: str = "88") -> bytes:
+    """Canonical encoding of raw scores: one byte per plan slot.
+
+    Each byte holds the clamped score (0..3) or NOT_TESTED. Items outside the
+    scale are dropped, so equivalent sheets always share a fingerprint.
+    PackedScores are expanded directly without going through a dict.
+    """
+    plan = get_scoring_plan(scale)
+    if isinstance(raw_scores, PackedScores):
+        full = raw_scores.to_vector()
+        if plan.item_numbers == _ALL_ITEMS:
+            return full
+        return bytes(full[iid - 1] if 0 < iid <= ITEM_COUNT else NOT_TESTED for iid in plan.item_numbers)
+    vector = bytearray([NOT_TESTED]) * plan.n_items
+    slots = plan.item_slots
+    for iid, val in raw_scores.items():
+        slot = slots.get(iid)
+        if slot is None or val is None:
+            continue
+        # clamp 0..MAX_ITEM_SCORE
+        val = int(val)
+        if val < 0:
+            val = 0
+        elif val > MAX_ITEM_SCORE:
+            val = MAX_ITEM_SCORE
+        vector[slot] = val
+    return bytes(vector)
+
+
+def _score_fingerprint(plan: ScoringPlan, vector: bytes, scale: str) -> Dict[str, object]:
+    sums: List[int] = []
+    counts: List[int] = []
+    offsets = plan.domain_offsets
+    for d in range(plan.n_domains):
+        chunk = vector[offsets[d]:offsets[d + 1]]
+        untested = chunk.count(NOT_TESTED)
+        counts.append(len(chunk) - untested)
+        sums.append(sum(chunk) - untested * NOT_TESTED)
+    return _build_result(plan, sums, counts, scale)
+
+
+def _copy_result(result: Dict[str, object]) -> Dict[str, object]:
+    copied = dict(result)
+    copied["domains"] = {name: dict(values) for name, values in result["domains"].items()}  # type: ignore[union-attr]
+    return copied
+
+
+def calculate_gmfm_scores(raw_scores: Mapping[int, int], scale: str = "88") -> Dict[str, object]:
+    """Calculate domain percentages and total for a GMFM scale ("88" or "66").
+
+    Only items belonging to the scale are scored; anything else in raw_scores
+    is ignored.
 
     Returns:
       {
         "scale": "88",
-        "domains": {domain_name: {"percent": float, "n_items": int}},
+        "domains": {domain_name: {"percent": float, "n_items_scored": int, "n_items_total": int}},
         "total_percent": float,
         "items_scored": int,
         "items_total": int,
       }
+
+    Results for PackedScores (how stored sessions are loaded) are memoized on
+    their packed bytes, so rescoring a stored session (detail, compare,
+    charts, PDF) skips scoring. Dicts are scored directly: building their
+    fingerprint costs as much as scoring it.
     """
-    items_map = GMFM88_ITEMS
+    plan = get_scoring_plan(scale)
+    if not isinstance(raw_scores, PackedScores):
+        return _score_fingerprint(plan, score_fingerprint(raw_scores, scale), scale)
+    key = (scale, raw_scores.to_bytes())
+    result = _score_cache.get(key)
+    if result is None:
+        result = _score_fingerprint(plan, score_fingerprint(raw_scores, scale), scale)
+        _score_cache.put(key, result)
+    return _copy_result(result)
 
-    domains: Dict[str, Dict[str, object]] = {}
-    total_score = 0.0
-    total_items_scored = 0
-    total_items = 0
 
-    for domain, item_ids in items_map.items():
-        percent, n_items_scored = _score_domain(item_ids, raw_scores)
-        domains[domain] = {"percent": round(percent, 2), "n_items_scored": n_items_scored, "n_items_total": len(item_ids)}
-        # accumulate raw totals for overall calculation: convert percent back to raw sum
-        total_items_scored += n_items_scored
-        total_items += len(item_ids)
-        # compute raw contribution
-        total_score += (percent / 100.0) * (len(item_ids) * MAX_ITEM_SCORE)
+def _batch_scores_python(sessions: Sequence[Mapping[int, int]], scale: str) -> List[Dict[str, object]]:
+    # Bypasses the memo: a bulk import of distinct sheets would only evict the
+    # entries the detail/compare screens rely on
+    plan = get_scoring_plan(scale)
+    return [_score_fingerprint(plan, score_fingerprint(raw, scale), scale) for raw in sessions]
 
-    # total percent computed as (sum of raw scores) / (max_possible_all_items) *100
-    max_possible_all = total_items * MAX_ITEM_SCORE if total_items > 0 else 1
-    total_percent = (total_score / max_possible_all) * 100.0
 
-    return {
-        "scale": scale,
-        "domains": domains,
-        "total_percent": round(total_percent, 2),
-        "items_scored": total_items_scored,
-        "items_total": total_items,
-    }
+def _batch_scores_numpy(sessions: Sequence[Mapping[int, int]], scale: str) -> List[Dict[str, object]]:
+    plan = get_scoring_plan(scale)
+    slots = plan.item_slots
+
+    # (n_sessions x n_items) matrix, NaN marks items that were not tested
+    matrix = np.full((len(sessions), plan.n_items), np.nan)
+    for row, raw in enumerate(sessions):
+        if isinstance(raw, PackedScores):
+            vector = np.frombuffer(score_fingerprint(raw, scale), dtype=np.uint8)
+            matrix[row] = np.where(vector == NOT_TESTED, np.nan, vector)
+            continue
+        for iid, val in raw.items():
+            slot = slots.get(iid)
+            if slot is not None and val is not None:
+                matrix[row, slot] = int(val)
+    tested = ~np.isnan(matrix)
+    clamped = np.clip(np.where(tested, matrix, 0.0), 0, MAX_ITEM_SCORE)
+
+    # per-domain raw sums and scored counts, one column per domain
+    starts = list(plan.domain_offsets[:-1])
+    sums = np.add.reduceat(clamped, starts, axis=1) if plan.n_items else np.zeros((len(sessions), 0))
+    counts = np.add.reduceat(tested, starts, axis=1, dtype=np.int64) if plan.n_items else np.zeros((len(sessions), 0), dtype=np.int64)
 
+    # _build_result works on plain Python numbers so rounding matches the
+    # single-session path exactly
+    return [
+        _build_result(plan, row_sums, [int(c) for c in row_counts], scale)
+        for row_sums, row_counts in zip(sums.tolist(), counts.tolist())
+    ]
 
-# convenience wrapper
-def calculate_gmfm88(raw_scores: Dict[int, int]) -> Dict[str, object]:
+
+def calculate_gmfm_scores_batch(sessions: Iterable[Mapping[int, int]], scale: str = "88") -> List[Dict[str, object]]:
+    """Score many raw_scores dicts at once.
+
+    Sessions are packed into an (n_sessions x n_items) matrix so every domain
+    sum and scored count is computed with a handful of array operations.
+    Results are identical to calling calculate_gmfm_scores on each session;
+    without numpy (Android) the per-session function is used directly.
+    """
+    sessions = list(sessions)
+    if not sessions:
+        return []
+    if not NUMPY_AVAILABLE:
+        return _batch_scores_python(sessions, scale)
+    return _batch_scores_numpy(sessions, scale)
+
+
+# convenience wrappers
+def calculate_gmfm88(raw_scores: Mapping[int, int]) -> Dict[str, object]:
     return calculate_gmfm_scores(raw_scores, scale="88")
+
+
+def calculate_gmfm66(raw_scores: Mapping[int, int]) -> Dict[str, object]:
+    return calculate_gmfm_scores(raw_scores, scale="66")
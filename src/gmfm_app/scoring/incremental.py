@@ -0,0 +1,103 @@
+"""Incremental scoring for live score entry.
+
+IncrementalScorer keeps per-domain running sums and scored counts, so each
+score change is O(1) and live domain percentages never require rescoring the
+whole sheet. ``result()`` returns the same dict as calculate_gmfm_scores.
+"""
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional
+
+from gmfm_app.scoring.constants import MAX_ITEM_SCORE
+from gmfm_app.scoring.engine import _build_result
+from gmfm_app.scoring.plan import get_scoring_plan
+
+
+class IncrementalScorer:
+    """Running GMFM totals updated one item at a time."""
+
+    def __init__(self, scale: str = "88", raw_scores: Optional[Mapping[int, int]] = None) -> None:
+        self.scale = scale
+        self.plan = get_scoring_plan(scale)
+        self._scores: Dict[int, int] = {}
+        self._sums = [0] * self.plan.n_domains
+        self._counts = [0] * self.plan.n_domains
+        if raw_scores:
+            self.update(raw_scores)
+
+    # -- updates -----------------------------------------------------------
+
+    def set(self, item_number: int, value: Optional[int]) -> None:
+        """Record a score for an item; ``None`` marks it not tested."""
+        slot = self.plan.item_slots.get(item_number)
+        if slot is None:
+            return  # not part of this scale
+        d = self.plan.item_domains[slot]
+        previous = self._scores.pop(item_number, None)
+        if previous is not None:
+            self._sums[d] -= previous
+            self._counts[d] -= 1
+        if value is None:
+            return
+        value = max(0, min(MAX_ITEM_SCORE, int(value)))
+        self._scores[item_number] = value
+        self._sums[d] += value
+        self._counts[d] += 1
+
+    def clear_item(self, item_number: int) -> None:
+        """Mark an item as not tested (NT)."""
+        self.set(item_number, None)
+
+    def update(self, raw_scores: Mapping[int, int]) -> None:
+        for item_number, value in raw_scores.items():
+            self.set(item_number, value)
+
+    def fill(self, value: int) -> None:
+        """Score every item of the scale with the same value."""
+        value = max(0, min(MAX_ITEM_SCORE, int(value)))
+        plan = self.plan
+        self._scores = dict.fromkeys(plan.item_numbers, value)
+        self._sums = [value * plan.domain_size(d) for d in range(plan.n_domains)]
+        self._counts = [plan.domain_size(d) for d in range(plan.n_domains)]
+
+    def clear(self) -> None:
+        self._scores.clear()
+        self._sums = [0] * self.plan.n_domains
+        self._counts = [0] * self.plan.n_domains
+
+    # -- live values -------------------------------------------------------
+
+    @property
+    def items_scored(self) -> int:
+        return len(self._scores)
+
+    def domain_index(self, item_number: int) -> Optional[int]:
+        slot = self.plan.item_slots.get(item_number)
+        return None if slot is None else self.plan.item_domains[slot]
+
+    def domain_count(self, domain_index: int) -> int:
+        return self._counts[domain_index]
+
+    def domain_percent(self, domain_index: int) -> float:
+        count = self._counts[domain_index]
+        if not count:
+            return 0.0
+        return (self._sums[domain_index] / (count * MAX_ITEM_SCORE)) * 100.0
+
+    def domain_percents(self) -> Dict[str, float]:
+        return {name: self.domain_percent(d) for d, name in enumerate(self.plan.domain_names)}
+
+    @property
+    def total_percent(self) -> float:
+        plan = self.plan
+        if not plan.n_items:
+            return 0.0
+        total = sum(
+            (self.domain_percent(d) / 100.0) * plan.domain_max_scores[d]
+            for d in range(plan.n_domains)
+        )
+        return (total / plan.max_score) * 100.0
+
+    def result(self) -> Dict[str, object]:
+        """Current scores in calculate_gmfm_scores format."""
+        return _build_result(self.plan, self._sums, self._counts, self.scale)
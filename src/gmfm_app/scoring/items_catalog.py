@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from functools import lru_cache
 import json
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 
 def _find_data_path() -> Path:
@@ -99,8 +99,22 @@ def _load_raw() -> Dict[str, Dict[str, object]]:
         return json.load(handle)
 
 
+SUPPORTED_SCALES = ("66", "88")
+
+
 def get_domains(scale: str = "88") -> List[GMFMDomain]:
-    """Return all GMFM-88 domains and items."""
+    """Return the domains and items for a scale.
+
+    GMFM-88 returns every catalog item; GMFM-66 keeps only the items flagged
+    ``gmfm66``. Tables are built once per scale and reused afterwards.
+    """
+    return list(_domains_for_scale(str(scale)))
+
+
+@lru_cache(maxsize=None)
+def _domains_for_scale(scale: str) -> Tuple[GMFMDomain, ...]:
+    if scale not in SUPPORTED_SCALES:
+        raise ValueError(f"Unsupported GMFM scale: {scale}")
     data = _load_raw()
     domains: List[GMFMDomain] = []
     for letter in sorted(data.keys()):
@@ -108,6 +122,8 @@ def get_domains(scale: str = "88") -> List[GMFMDomain]:
         raw_items: Iterable[Dict[str, object]] = payload.get("items", [])  # type: ignore[assignment]
         items: List[GMFMItem] = []
         for item in raw_items:
+            if scale == "66" and not item.get("gmfm66"):
+                continue
             items.append(
                 GMFMItem(
                     number=int(item["number"]),
@@ -124,7 +140,7 @@ def get_domains(scale: str = "88") -> List[GMFMDomain]:
                 items=tuple(items),
             )
         )
-    return domains
+    return tuple(domains)
 
 
 def build_item_number_map(scale: str = "88") -> Dict[str, List[int]]:
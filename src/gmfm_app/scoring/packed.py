@@ -0,0 +1,151 @@
+"""Compact fixed-size storage for GMFM item scores.
+
+PackedScores holds all 88 item scores in 2 bits each (22 bytes) followed by
+an 88-bit not-tested mask (11 bytes): 33 bytes per sheet instead of an
+88-entry dict. It behaves like a read-only ``Mapping[int, int]`` over the
+tested items, so existing ``.get()``/``dict()`` call sites keep working.
+"""
+from __future__ import annotations
+
+from itertools import product
+from typing import Iterator, Mapping, Optional
+
+from gmfm_app.scoring.constants import MAX_ITEM_SCORE, NOT_TESTED
+
+ITEM_COUNT = 88
+SCORE_BYTES = ITEM_COUNT // 4
+MASK_BYTES = ITEM_COUNT // 8
+PACKED_SIZE = SCORE_BYTES + MASK_BYTES
+
+# byte -> the four 2-bit scores it holds, one per output byte
+_EXPAND_SCORES = [bytes((b >> shift) & 0b11 for shift in (0, 2, 4, 6)) for b in range(256)]
+# byte -> eight mask bits, 0xFF for a set bit
+_EXPAND_MASK = [bytes(NOT_TESTED if (b >> bit) & 1 else 0 for bit in range(8)) for b in range(256)]
+_EMPTY = bytes(SCORE_BYTES) + b"\xff" * MASK_BYTES
+_ALL_NOT_TESTED = bytes((NOT_TESTED,)) * ITEM_COUNT
+_ITEM_NUMBERS = range(1, ITEM_COUNT + 1)
+_ITEM_SET = frozenset(_ITEM_NUMBERS)
+# clamps raw byte values to 0..MAX_ITEM_SCORE, keeping NOT_TESTED
+_CLAMP = bytes(b if b == NOT_TESTED else min(b, MAX_ITEM_SCORE) for b in range(256))
+
+
+def _pack4(values) -> tuple:
+    score = mask = 0
+    for position, value in enumerate(values):
+        if value == NOT_TESTED:
+            mask |= 1 << position
+        else:
+            score |= value << (position << 1)
+    return score, mask
+
+
+# four clean vector bytes -> (score byte, 4-bit mask nibble); 5**4 entries
+_PACK4 = {bytes(values): _pack4(values) for values in product((*range(MAX_ITEM_SCORE + 1), NOT_TESTED), repeat=4)}
+
+
+class PackedScores(Mapping[int, int]):
+    """Immutable 33-byte score sheet keyed by item number (1..88)."""
+
+    __slots__ = ("_buf",)
+
+    def __init__(self, buf: Optional[bytes] = None) -> None:
+        if buf is None:
+            buf = _EMPTY
+        if len(buf) != PACKED_SIZE:
+            raise ValueError(f"PackedScores needs {PACKED_SIZE} bytes, got {len(buf)}")
+        self._buf = bytes(buf)
+
+    @classmethod
+    def from_dict(cls, raw_scores: Mapping[object, object]) -> "PackedScores":
+        """Pack a raw_scores mapping; string keys (from JSON) are accepted."""
+        if isinstance(raw_scores, PackedScores):
+            return raw_scores
+        if raw_scores.keys() <= _ITEM_SET:
+            # Fast path for int-keyed sheets with small int scores
+            values = list(map(raw_scores.get, _ITEM_NUMBERS))
+            try:
+                vector = bytes([NOT_TESTED if v is None else v for v in values])
+            except (TypeError, ValueError):
+                pass
+            else:
+                if vector.count(NOT_TESTED) == values.count(None):  # no literal 255 scores
+                    return cls._pack(vector.translate(_CLAMP))
+        vector = bytearray(_ALL_NOT_TESTED)
+        for key, val in raw_scores.items():
+            if val is None:
+                continue
+            index = int(key) - 1
+            if not 0 <= index < ITEM_COUNT:
+                continue
+            val = int(val)
+            vector[index] = MAX_ITEM_SCORE if val > MAX_ITEM_SCORE else (val if val > 0 else 0)
+        return cls._pack(bytes(vector))
+
+    @classmethod
+    def from_vector(cls, vector: bytes) -> "PackedScores":
+        """Inverse of ``to_vector``: one byte per item, NOT_TESTED for NT."""
+        try:
+            return cls._pack(bytes(vector))
+        except (KeyError, ValueError):  # out-of-range scores or wrong length: clamp via from_dict
+            return cls.from_dict({i + 1: v for i, v in enumerate(vector) if v != NOT_TESTED})
+
+    @classmethod
+    def _pack(cls, vector: bytes) -> "PackedScores":
+        # 22 table lookups instead of 88 bit-twiddling steps
+        if len(vector) != ITEM_COUNT:
+            raise ValueError(f"Score vector needs {ITEM_COUNT} bytes, got {len(vector)}")
+        quads = [_PACK4[vector[i:i + 4]] for i in range(0, ITEM_COUNT, 4)]
+        scores = bytes(quad[0] for quad in quads)
+        mask = bytes(quads[i][1] | (quads[i + 1][1] << 4) for i in range(0, SCORE_BYTES, 2))
+        return cls(scores + mask)
+
+    def to_bytes(self) -> bytes:
+        return self._buf
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def to_vector(self) -> bytes:
+        """Expand to 88 bytes, item n at index n-1, NOT_TESTED for NT items."""
+        scores = b"".join(_EXPAND_SCORES[b] for b in self._buf[:SCORE_BYTES])
+        mask = b"".join(_EXPAND_MASK[b] for b in self._buf[SCORE_BYTES:])
+        # scores are 0..3, so OR-ing the 0xFF mask bytes yields NOT_TESTED
+        return (int.from_bytes(scores, "little") | int.from_bytes(mask, "little")).to_bytes(ITEM_COUNT, "little")
+
+    def is_tested(self, item_number: int) -> bool:
+        index = item_number - 1
+        if not 0 <= index < ITEM_COUNT:
+            return False
+        return not (self._buf[SCORE_BYTES + (index >> 3)] >> (index & 7)) & 1
+
+    def __getitem__(self, item_number: int) -> int:
+        if not isinstance(item_number, int) or not self.is_tested(item_number):
+            raise KeyError(item_number)
+        index = item_number - 1
+        return (self._buf[index >> 2] >> ((index & 3) << 1)) & 0b11
+
+    def __contains__(self, item_number: object) -> bool:
+        return isinstance(item_number, int) and self.is_tested(item_number)
+
+    def __iter__(self) -> Iterator[int]:
+        vector = self.to_vector()
+        return (i + 1 for i, v in enumerate(vector) if v != NOT_TESTED)
+
+    def __len__(self) -> int:
+        untested = sum(bin(b).count("1") for b in self._buf[SCORE_BYTES:])
+        return ITEM_COUNT - untested
+
+    def items(self):
+        vector = self.to_vector()
+        return [(i + 1, v) for i, v in enumerate(vector) if v != NOT_TESTED]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PackedScores):
+            return self._buf == other._buf
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash(self._buf)
+
+    def __repr__(self) -> str:
+        return f"PackedScores({self.to_dict()!r})"
@@ -0,0 +1,77 @@
+"""Precompiled per-scale scoring plans.
+
+A plan flattens the catalog domains into a single item order so scoring is one
+pass over at most 88 slots instead of walking every domain list per call.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+
+from gmfm_app.scoring.constants import MAX_ITEM_SCORE
+from gmfm_app.scoring.items_catalog import get_domains
+
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    scale: str
+    domain_names: Tuple[str, ...]  # result keys, e.g. "Lying & Rolling"
+    dimensions: Tuple[str, ...]  # catalog letters, e.g. "A"
+    item_numbers: Tuple[int, ...]  # flat item order, domain by domain
+    domain_offsets: Tuple[int, ...]  # slot range of domain d is offsets[d]:offsets[d + 1]
+    domain_max_scores: Tuple[int, ...]  # n_items * MAX_ITEM_SCORE per domain
+    item_slots: Mapping[int, int]  # item number -> flat slot
+    item_domains: Tuple[int, ...]  # flat slot -> domain index
+
+    @property
+    def n_items(self) -> int:
+        return len(self.item_numbers)
+
+    @property
+    def n_domains(self) -> int:
+        return len(self.domain_names)
+
+    @property
+    def max_score(self) -> int:
+        return self.n_items * MAX_ITEM_SCORE
+
+    def domain_size(self, domain_index: int) -> int:
+        return self.domain_offsets[domain_index + 1] - self.domain_offsets[domain_index]
+
+    def domain_items(self, domain_index: int) -> Tuple[int, ...]:
+        return self.item_numbers[self.domain_offsets[domain_index]:self.domain_offsets[domain_index + 1]]
+
+
+def build_scoring_plan(scale: str = "88") -> ScoringPlan:
+    names: List[str] = []
+    dimensions: List[str] = []
+    numbers: List[int] = []
+    offsets: List[int] = [0]
+    max_scores: List[int] = []
+    item_domains: List[int] = []
+    for index, domain in enumerate(get_domains(scale)):
+        names.append(domain.friendly_name)
+        dimensions.append(domain.dimension)
+        numbers.extend(item.number for item in domain.items)
+        item_domains.extend(index for _ in domain.items)
+        offsets.append(len(numbers))
+        max_scores.append(len(domain.items) * MAX_ITEM_SCORE)
+    slots: Dict[int, int] = {number: slot for slot, number in enumerate(numbers)}
+    return ScoringPlan(
+        scale=scale,
+        domain_names=tuple(names),
+        dimensions=tuple(dimensions),
+        item_numbers=tuple(numbers),
+        domain_offsets=tuple(offsets),
+        domain_max_scores=tuple(max_scores),
+        item_slots=MappingProxyType(slots),
+        item_domains=tuple(item_domains),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_scoring_plan(scale: str = "88") -> ScoringPlan:
+    """Return the cached plan for a scale, building it on first use."""
+    return build_scoring_plan(str(scale))
@@ -15,7 +15,8 @@ except ImportError:
     plt = None
 
 from gmfm_app.data.models import Session
-from gmfm_app.scoring.engine import calculate_gmfm88
+from gmfm_app.scoring.engine import calculate_gmfm_scores
+from gmfm_app.scoring.plan import get_scoring_plan
 
 
 def render_total_score_trend(sessions: Sequence[Session]) -> bytes:
@@ -44,6 +45,19 @@ def render_total_score_trend(sessions: Sequence[Session]) -> bytes:
     return buffer.getvalue()
 
 
+def _domain_percents(session: Session) -> Dict[str, float]:
+    """Domain name -> percent, from the stored columns when the row has them."""
+    if session.domain_scores:
+        plan = get_scoring_plan(session.scale)
+        return {
+            name: session.domain_scores[dimension]
+            for dimension, name in zip(plan.dimensions, plan.domain_names)
+            if dimension in session.domain_scores
+        }
+    result = calculate_gmfm_scores(session.raw_scores, scale=session.scale)
+    return {name: values["percent"] for name, values in result["domains"].items()}
+
+
 def render_score_dashboard(sessions: Sequence[Session]) -> bytes:
     """Render combined chart showing total score and per-domain trends."""
     if not MATPLOTLIB_AVAILABLE:
@@ -57,19 +71,16 @@ def render_score_dashboard(sessions: Sequence[Session]) -> bytes:
     totals = [s.total_score or 0.0 for s in sessions_sorted]
 
     all_domains = set()
-    session_results = []
+    session_percents = []
     for session in sessions_sorted:
-        result = calculate_gmfm88(session.raw_scores)
-        session_results.append(result)
-        all_domains.update(result["domains"].keys())
+        percents = _domain_percents(session)
+        session_percents.append(percents)
+        all_domains.update(percents.keys())
 
     domain_series: Dict[str, List[float]] = {domain: [] for domain in sorted(all_domains)}
-    for result in session_results:
+    for percents in session_percents:
         for domain, series in domain_series.items():
-            if domain in result["domains"]:
-                series.append(result["domains"][domain]["percent"])
-            else:
-                series.append(math.nan)
+            series.append(percents.get(domain, math.nan))
 
     fig, (ax_total, ax_domains) = plt.subplots(2, 1, figsize=(5, 4), sharex=True)
 
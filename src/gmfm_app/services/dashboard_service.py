@@ -0,0 +1,157 @@
+"""Dashboard query service.
+
+Loads everything the home screen shows from two SQL statements, independent
+of how many students there are:
+
+1. one page of students, each joined to its latest session through the
+   (student_id, created_at) index (further pages come from
+   ``load_student_page`` with the snapshot's keyset cursor);
+2. the most recent sessions across all students plus caseload totals as
+   scalar subqueries.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from gmfm_app.data.database import DatabaseContext
+from gmfm_app.data.models import Student
+from gmfm_app.data.repositories import StudentCursor, StudentRepository
+
+
+@dataclass(frozen=True)
+class LatestSession:
+    session_id: int
+    total_score: float
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class RecentActivity:
+    session_id: int
+    student_id: int
+    student_name: str
+    total_score: float
+    created_at: datetime
+
+
+@dataclass
+class DashboardSnapshot:
+    students: List[Student] = field(default_factory=list)
+    latest: Dict[int, LatestSession] = field(default_factory=dict)
+    recent: List[RecentActivity] = field(default_factory=list)
+    total_students: int = 0
+    total_sessions: int = 0
+    avg_score: Optional[float] = None
+    next_cursor: Optional[StudentCursor] = None
+
+
+_STUDENTS_SQL = """
+    SELECT st.*, ls.id AS latest_id, ls.total_score AS latest_score, ls.created_at AS latest_at
+    FROM students st
+    LEFT JOIN sessions ls ON ls.id = (
+        SELECT id FROM sessions WHERE student_id = st.id ORDER BY created_at DESC LIMIT 1
+    )
+    {where}
+    ORDER BY st.created_at DESC, st.id DESC
+    LIMIT ?
+"""
+
+_RECENT_SQL = """
+    SELECT r.id, r.student_id, r.total_score, r.created_at, r.given_name, r.family_name,
+           (SELECT COUNT(*) FROM students) AS student_count,
+           (SELECT COUNT(*) FROM sessions) AS session_count,
+           (SELECT AVG(total_score) FROM sessions) AS avg_score
+    FROM (SELECT 1) AS anchor
+    LEFT JOIN (
+        SELECT s.id, s.student_id, s.total_score, s.created_at, st.given_name, st.family_name
+        FROM sessions s
+        JOIN students st ON st.id = s.student_id
+        ORDER BY s.created_at DESC
+        LIMIT ?
+    ) AS r ON 1
+    ORDER BY r.created_at DESC, r.id DESC
+"""
+
+
+_LATEST_FOR_SQL = """
+    SELECT ls.student_id, ls.id, ls.total_score, ls.created_at
+    FROM students st
+    JOIN sessions ls ON ls.id = (
+        SELECT id FROM sessions WHERE student_id = st.id ORDER BY created_at DESC LIMIT 1
+    )
+    WHERE st.id IN ({placeholders})
+"""
+
+StudentPage = Tuple[List[Student], Dict[int, LatestSession], Optional[StudentCursor]]
+
+
+def _fetch_student_page(conn, students_repo: StudentRepository, after: Optional[StudentCursor], limit: int) -> StudentPage:
+    if after is None:
+        rows = conn.execute(_STUDENTS_SQL.format(where=""), (limit + 1,)).fetchall()
+    else:
+        sql = _STUDENTS_SQL.format(where="WHERE (st.created_at, st.id) < (?, ?)")
+        rows = conn.execute(sql, (after[0], after[1], limit + 1)).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    students = students_repo.from_rows(rows)
+    latest: Dict[int, LatestSession] = {}
+    for student, row in zip(students, rows):
+        if row["latest_id"] is not None:
+            latest[student.id] = LatestSession(
+                session_id=row["latest_id"],
+                total_score=row["latest_score"] or 0.0,
+                created_at=datetime.fromisoformat(row["latest_at"]),
+            )
+    next_cursor = StudentRepository.cursor_for(rows[-1]) if has_more else None
+    return students, latest, next_cursor
+
+
+def load_student_page(db_context: DatabaseContext, after: Optional[StudentCursor] = None, limit: int = 50) -> StudentPage:
+    """Load the next page of dashboard students with their latest sessions."""
+    with db_context.connect() as conn:
+        return _fetch_student_page(conn, StudentRepository(db_context), after, limit)
+
+
+def load_latest_sessions(db_context: DatabaseContext, student_ids: List[int]) -> Dict[int, LatestSession]:
+    """Latest session per student for an arbitrary set of students (e.g. search hits)."""
+    if not student_ids:
+        return {}
+    sql = _LATEST_FOR_SQL.format(placeholders=", ".join("?" for _ in student_ids))
+    with db_context.connect() as conn:
+        return {
+            row["student_id"]: LatestSession(
+                session_id=row["id"],
+                total_score=row["total_score"] or 0.0,
+                created_at=datetime.fromisoformat(row["created_at"]),
+            )
+            for row in conn.execute(sql, tuple(student_ids))
+        }
+
+
+def load_dashboard_snapshot(db_context: DatabaseContext, student_limit: int = 50, recent_limit: int = 3) -> DashboardSnapshot:
+    students_repo = StudentRepository(db_context)
+    snapshot = DashboardSnapshot()
+    with db_context.connect() as conn:
+        snapshot.students, snapshot.latest, snapshot.next_cursor = _fetch_student_page(
+            conn, students_repo, None, student_limit
+        )
+
+        for row in conn.execute(_RECENT_SQL, (recent_limit,)):
+            snapshot.total_students = row["student_count"] or 0
+            snapshot.total_sessions = row["session_count"] or 0
+            snapshot.avg_score = row["avg_score"]
+            if row["id"] is None:
+                continue
+            given = db_context.decrypt(row["given_name"]) or ""
+            family = db_context.decrypt(row["family_name"]) or ""
+            snapshot.recent.append(RecentActivity(
+                session_id=row["id"],
+                student_id=row["student_id"],
+                student_name=f"{given} {family}".strip(),
+                total_score=row["total_score"] or 0.0,
+                created_at=datetime.fromisoformat(row["created_at"]),
+            ))
+    return snapshot
@@ -5,16 +5,33 @@ Parses DOCX files formatted like GMFCS.docx and extracts:
 - Student information (name, assessment date, evaluator)
 - GMFM-88 scores from tables
 
-NOTE: python-docx is imported lazily inside parse_docx() to avoid
-import errors on Android where the library may not be available.
+parse_docx() streams word/document.xml straight out of the zip, so it has
+no third-party dependencies. The python-docx based parser is kept as
+parse_docx_with_python_docx() (imported lazily, since the library isn't
+available on Android) as the reference both must agree with.
+
+import_docx_batch() imports whole folders: files are parsed in a process
+pool (sequentially where one isn't available) and every parsed assessment
+is scored in one engine batch and stored in a single transaction, with
+per-file timing and errors.
 """
 from __future__ import annotations
 
+import glob
+import os
 import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from xml.etree import ElementTree
+
+from gmfm_app.data.import_ledger import ImportLedger, file_sha256
 
 
 @dataclass
@@ -50,37 +67,91 @@ def _parse_name(name_text: str) -> Tuple[str, str]:
         return (parts[0], " ".join(parts[1:]))
 
 
+# Date formats in priority order, each with a cheap regex that every string
+# the format can parse also matches (strptime is case-insensitive, its %d
+# also takes " 5", and a space in the format matches any whitespace run)
+_DAY, _MONTH, _YEAR, _MONTH_NAME = r"\s?\d{1,2}", r"\d{1,2}", r"\d{4}", r"[^\W\d_]+"
+_DATE_FORMATS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = tuple(
+    (fmt, re.compile(shape, re.IGNORECASE))
+    for fmt, shape in (
+        ("%Y-%m-%d", rf"{_YEAR}-{_MONTH}-{_DAY}"),
+        ("%d/%m/%Y", rf"{_DAY}/{_MONTH}/{_YEAR}"),
+        ("%m/%d/%Y", rf"{_MONTH}/{_DAY}/{_YEAR}"),
+        ("%d-%m-%Y", rf"{_DAY}-{_MONTH}-{_YEAR}"),
+        ("%B %d, %Y", rf"{_MONTH_NAME}\s+{_DAY},\s+{_YEAR}"),
+        ("%b %d, %Y", rf"{_MONTH_NAME}\s+{_DAY},\s+{_YEAR}"),
+        ("%d %B %Y", rf"{_DAY}\s+{_MONTH_NAME}\s+{_YEAR}"),
+        ("%d %b %Y", rf"{_DAY}\s+{_MONTH_NAME}\s+{_YEAR}"),
+    )
+)
+
+
+@lru_cache(maxsize=1024)
+def _strptime_date(date_text: str, fmt: str) -> Optional[date]:
+    # Cached: sheets from one intake day repeat the same date string
+    try:
+        return datetime.strptime(date_text, fmt).date()
+    except ValueError:
+        return None
+
+
+class DateParser:
+    """Parses dates with ``_DATE_FORMATS``, remembering the last format that worked.
+
+    Sheets from one clinic share a date style, so the remembered format is
+    tried first. It is only taken when no higher-priority format's shape fits
+    the text, so results always equal trying the formats in order; formats
+    whose shape doesn't fit are never handed to strptime.
+    """
+
+    def __init__(self) -> None:
+        self.last_index: Optional[int] = None
+
+    def parse(self, date_text: str) -> Optional[date]:
+        date_text = date_text.strip()
+        if not date_text:
+            return None
+        
+        tried = None
+        last = self.last_index
+        if last is not None and _DATE_FORMATS[last][1].fullmatch(date_text):
+            if not any(shape.fullmatch(date_text) for _, shape in _DATE_FORMATS[:last]):
+                tried = last
+                parsed = _strptime_date(date_text, _DATE_FORMATS[last][0])
+                if parsed is not None:
+                    return parsed
+        
+        for index, (fmt, shape) in enumerate(_DATE_FORMATS):
+            if index == tried or not shape.fullmatch(date_text):
+                continue
+            parsed = _strptime_date(date_text, fmt)
+            if parsed is not None:
+                self.last_index = index
+                return parsed
+        
+        return None
+
+
+# One per process: a batch worker keeps its remembered format across files
+_date_parser = DateParser()
+
+
 def _parse_date(date_text: str) -> Optional[date]:
     """Try to parse a date from various formats."""
-    date_text = date_text.strip()
-    if not date_text:
-        return None
-    
-    # Common date formats
-    formats = [
-        "%Y-%m-%d",
-        "%d/%m/%Y",
-        "%m/%d/%Y",
-        "%d-%m-%Y",
-        "%B %d, %Y",
-        "%b %d, %Y",
-        "%d %B %Y",
-        "%d %b %Y",
-    ]
-    
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_text, fmt).date()
-        except ValueError:
-            continue
-    
-    return None
+    return _date_parser.parse(date_text)
+
+
+_SCORES = {str(score): score for score in range(4)}
 
 
 def _parse_score(score_text: str) -> Optional[int]:
     """Parse a score value (0-3) or return None for NT/empty."""
-    score_text = score_text.strip().upper()
+    score_text = score_text.strip()
+    score = _SCORES.get(score_text)
+    if score is not None:
+        return score
     
+    score_text = score_text.upper()
     if not score_text or score_text == "NT":
         return None
     
@@ -94,43 +165,201 @@ def _parse_score(score_text: str) -> Optional[int]:
     return None
 
 
+# Patterns like "1.", "1", "10.", etc.
+_ITEM_NUMBER_RE = re.compile(r"(\d+)\.?")
+
+
 def _extract_item_number(item_text: str) -> Optional[int]:
     """Extract the item number from a table cell."""
-    item_text = item_text.strip()
-    if not item_text:
-        return None
-    
-    # Match patterns like "1.", "1", "10.", etc.
-    match = re.match(r"^(\d+)\.?$", item_text)
+    match = _ITEM_NUMBER_RE.fullmatch(item_text.strip())
     if match:
         return int(match.group(1))
     
     return None
 
 
-def _extract_paragraph_value(paragraph_text: str, prefix: str) -> str:
-    """Extract value after a prefix like 'Name:' or 'Assessment Date:'."""
-    if prefix.lower() in paragraph_text.lower():
+def _extract_paragraph_value(paragraph_text: str, prefix: str, lowered: Optional[str] = None) -> str:
+    """Extract value after a prefix like 'Name:' or 'Assessment Date:'.
+
+    *lowered* is ``paragraph_text.lower()`` when the caller already has it.
+    """
+    if lowered is None:
+        lowered = paragraph_text.lower()
+    idx = lowered.find(prefix.lower())
+    if idx >= 0:
         # Find the colon and get everything after
-        idx = paragraph_text.lower().find(prefix.lower())
-        if idx >= 0:
-            after = paragraph_text[idx + len(prefix):]
-            # Remove any leading colons or semicolons
-            after = after.lstrip(":;").strip()
-            return after
+        after = paragraph_text[idx + len(prefix):]
+        # Remove any leading colons or semicolons
+        after = after.lstrip(":;").strip()
+        return after
     return ""
 
 
-def parse_docx(file_path: str | Path) -> ImportedAssessment:
-    """
-    Parse a GMFM assessment DOCX file.
+def _apply_paragraph(result: ImportedAssessment, text: str) -> None:
+    """Pick the name/date/evaluator fields out of one body paragraph."""
+    text = text.strip()
+    if not text:
+        return
+    lowered = text.lower()
     
-    Args:
-        file_path: Path to the DOCX file
+    # Check for various fields
+    if "name" in lowered and "evaluator" not in lowered:
+        value = _extract_paragraph_value(text, "Name", lowered)
+        if value:
+            result.student_name = value
+            result.given_name, result.family_name = _parse_name(value)
+    
+    elif "assessment date" in lowered or "date" in lowered[:10]:
+        value = _extract_paragraph_value(text, "Assessment Date", lowered)
+        if not value:
+            value = _extract_paragraph_value(text, "Date", lowered)
+        if value:
+            result.assessment_date = _parse_date(value)
+    
+    elif "evaluator" in lowered:
+        # Handle "Evaluator's name:" format first (longer match)
+        value = _extract_paragraph_value(text, "Evaluator's name", lowered)
+        if not value:
+            value = _extract_paragraph_value(text, "Evaluator", lowered)
         
-    Returns:
-        ImportedAssessment with parsed data
+        if value:
+            result.evaluator_name = value
+
+
+def _apply_row(result: ImportedAssessment, cells: Sequence[str]) -> None:
+    """Record the score from a table row laid out as item | description | score."""
+    if len(cells) >= 3:
+        item_num = _extract_item_number(cells[0])
+        score = _parse_score(cells[2])
         
+        if item_num is not None and score is not None:
+            result.raw_scores[item_num] = score
+
+
+def _finish(result: ImportedAssessment) -> ImportedAssessment:
+    # Add evaluator to notes if present
+    if result.evaluator_name:
+        result.notes = f"Evaluator: {result.evaluator_name}"
+    return result
+
+
+# WordprocessingML tags, in ElementTree's {namespace}local form
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY, _P, _R, _HYPERLINK, _TBL, _TR, _TC = (_W + t for t in ("body", "p", "r", "hyperlink", "tbl", "tr", "tc"))
+_T, _VAL, _TYPE = _W + "t", _W + "val", _W + "type"
+_GRID_BEFORE, _GRID_SPAN, _V_MERGE = _W + "gridBefore", _W + "gridSpan", _W + "vMerge"
+# run children with fixed text; w:br only breaks a line when it's a text-wrapping break
+_RUN_SYMBOLS = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+# depth of each element in document > body > ... (document is depth 0)
+_BODY_PARAGRAPH_DEPTH = 2
+_TABLE_DEPTH, _ROW_DEPTH, _CELL_DEPTH, _CELL_PARAGRAPH_DEPTH = 2, 3, 4, 5
+
+
+def _iter_docx_blocks(source) -> Iterator[Tuple[str, object]]:
+    """Stream ``("p", text)`` for body paragraphs and ``("row", cells)`` for top-level table rows.
+
+    Text follows python-docx: a paragraph is the text of its runs (direct or
+    inside hyperlinks), a cell is its own paragraphs joined with newlines,
+    horizontally spanned cells repeat once per grid column, and vertically
+    merged continuation cells repeat the cell above. Elements are cleared
+    as soon as they are consumed, so memory stays flat for large files.
+    """
+    stack: List[str] = []
+    # one text buffer per open w:p: a text box (w:txbxContent) nests its own
+    # paragraphs inside a run, and their text must not leak into the outer one
+    paragraphs: List[List[str]] = []
+    cell_paragraphs: List[str] = []
+    row: List[str] = []
+    row_grid: Dict[int, str] = {}
+    above_grid: Dict[int, str] = {}
+    grid_col = span = 0
+    merged = False
+
+    for event, elem in ElementTree.iterparse(source, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            stack.append(tag)
+            depth = len(stack) - 1
+            if tag == _TBL and depth == _TABLE_DEPTH:
+                above_grid = {}
+            elif tag == _TR and depth == _ROW_DEPTH and stack[_TABLE_DEPTH] == _TBL:
+                row, row_grid, grid_col = [], {}, 0
+            elif tag == _TC and depth == _CELL_DEPTH and stack[_TABLE_DEPTH] == _TBL:
+                cell_paragraphs, span, merged = [], 1, False
+            elif tag == _P:
+                paragraphs.append([])
+            continue
+
+        depth = len(stack) - 1
+        parent = stack[-2] if depth else None
+        if parent == _R and (stack[-3] == _P or (stack[-3] == _HYPERLINK and stack[-4] == _P)):
+            # inner content of a run that belongs to the paragraph being read
+            if tag == _T:
+                paragraphs[-1].append(elem.text or "")
+            elif tag in _RUN_SYMBOLS:
+                paragraphs[-1].append(_RUN_SYMBOLS[tag])
+            elif tag == _W + "br" and elem.get(_TYPE, "textWrapping") == "textWrapping":
+                paragraphs[-1].append("\n")
+        elif tag == _P:
+            paragraph = paragraphs.pop()
+            if depth == _BODY_PARAGRAPH_DEPTH and parent == _BODY:
+                yield "p", "".join(paragraph)
+                elem.clear()
+            elif depth == _CELL_PARAGRAPH_DEPTH and parent == _TC and stack[_TABLE_DEPTH] == _TBL:
+                cell_paragraphs.append("".join(paragraph))
+        elif depth == _ROW_DEPTH + 2 and stack[_TABLE_DEPTH] == _TBL and stack[_ROW_DEPTH] == _TR:
+            # trPr/gridBefore: the row starts this many grid columns in
+            if tag == _GRID_BEFORE and parent == _W + "trPr":
+                grid_col = int(elem.get(_VAL, "0"))
+        elif depth == _CELL_DEPTH + 2 and stack[_TABLE_DEPTH] == _TBL and stack[_CELL_DEPTH] == _TC:
+            if tag == _GRID_SPAN:
+                span = int(elem.get(_VAL, "1"))
+            elif tag == _V_MERGE:
+                merged = elem.get(_VAL, "continue") == "continue"
+        elif tag == _TC and depth == _CELL_DEPTH and stack[_TABLE_DEPTH] == _TBL:
+            text = above_grid.get(grid_col, "") if merged else "\n".join(cell_paragraphs)
+            for offset in range(span):
+                row_grid[grid_col + offset] = text
+                row.append(text)
+            grid_col += span
+        elif tag == _TR and depth == _ROW_DEPTH and stack[_TABLE_DEPTH] == _TBL:
+            yield "row", row
+            above_grid = row_grid
+        elif tag == _TBL and depth == _TABLE_DEPTH:
+            elem.clear()
+        stack.pop()
+
+
+def parse_docx_stream(file_path: str | Path) -> ImportedAssessment:
+    """
+    Parse a GMFM assessment DOCX without python-docx.
+    
+    Reads ``word/document.xml`` straight out of the zip with a streaming XML
+    parser; the result is identical to ``parse_docx_with_python_docx``.
+    
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        zipfile.BadZipFile / KeyError / ElementTree.ParseError: If the file isn't a DOCX
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    result = ImportedAssessment()
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as document:
+        for kind, value in _iter_docx_blocks(document):
+            if kind == "p":
+                _apply_paragraph(result, value)  # type: ignore[arg-type]
+            else:
+                _apply_row(result, value)  # type: ignore[arg-type]
+    return _finish(result)
+
+
+def parse_docx_with_python_docx(file_path: str | Path) -> ImportedAssessment:
+    """
+    Parse a GMFM assessment DOCX through python-docx's document model.
+    
     Raises:
         FileNotFoundError: If file doesn't exist
         ImportError: If python-docx is not installed
@@ -151,49 +380,48 @@ def parse_docx(file_path: str | Path) -> ImportedAssessment:
     
     # Parse paragraphs for student info
     for para in document.paragraphs:
-        text = para.text.strip()
-        if not text:
-            continue
-        
-        # Check for various fields
-        if "name" in text.lower() and "evaluator" not in text.lower():
-            value = _extract_paragraph_value(text, "Name")
-            if value:
-                result.student_name = value
-                result.given_name, result.family_name = _parse_name(value)
-        
-        elif "assessment date" in text.lower() or "date" in text.lower()[:10]:
-            value = _extract_paragraph_value(text, "Assessment Date")
-            if not value:
-                value = _extract_paragraph_value(text, "Date")
-            if value:
-                result.assessment_date = _parse_date(value)
-        
-        elif "evaluator" in text.lower():
-            # Handle "Evaluator's name:" format first (longer match)
-            value = _extract_paragraph_value(text, "Evaluator's name")
-            if not value:
-                value = _extract_paragraph_value(text, "Evaluator")
-            
-            if value:
-                result.evaluator_name = value
+        _apply_paragraph(result, para.text)
     
     # Parse tables for scores
     for table in document.tables:
         for row in table.rows:
-            cells = row.cells
-            if len(cells) >= 3:
-                item_num = _extract_item_number(cells[0].text)
-                score = _parse_score(cells[2].text)
-                
-                if item_num is not None and score is not None:
-                    result.raw_scores[item_num] = score
+            _apply_row(result, [cell.text for cell in row.cells])
     
-    # Add evaluator to notes if present
-    if result.evaluator_name:
-        result.notes = f"Evaluator: {result.evaluator_name}"
+    return _finish(result)
+
+
+def parse_docx(file_path: str | Path) -> ImportedAssessment:
+    """
+    Parse a GMFM assessment DOCX file.
     
-    return result
+    Uses the streaming parser, which needs no third-party packages (so it
+    also works on Android) and gives the same result as python-docx.
+    
+    Args:
+        file_path: Path to the DOCX file
+        
+    Returns:
+        ImportedAssessment with parsed data
+        
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        Exception: If file can't be parsed as DOCX
+    """
+    return parse_docx_stream(file_path)
+
+
+def _resolve_student(students, assessment: ImportedAssessment) -> int:
+    """Id of the assessment's student, created if the name is new."""
+    from gmfm_app.data.models import Student
+
+    given = assessment.given_name or assessment.student_name.split()[0] if assessment.student_name else "Unknown"
+    family = assessment.family_name or (assessment.student_name.split()[-1] if len(assessment.student_name.split()) > 1 else "Student")
+
+    # Names are stored encrypted, so match through the blind search index
+    existing = students.find_student_by_name(given, family)
+    if existing is not None:
+        return existing.id
+    return students.create_student(Student(given_name=given, family_name=family)).id
 
 
 def import_assessment_to_db(
@@ -204,6 +432,9 @@ def import_assessment_to_db(
     """
     Import an assessment into the database.
     
+    The session is scored by the GMFM engine, so it carries the same total
+    and domain breakdown as one saved from the scoring screen.
+    
     Args:
         assessment: Parsed assessment data
         db_context: Database context for connections
@@ -212,49 +443,263 @@ def import_assessment_to_db(
     Returns:
         Tuple of (student_id, session_id)
     """
-    import json
-    from datetime import datetime
+    from gmfm_app.data.models import Session
+    from gmfm_app.data.repositories import SessionRepository, StudentRepository
     
-    with db_context.connect() as conn:
-        cursor = conn.cursor()
+    # Student and session land together; inside a batch's unit_of_work()
+    # this joins the outer transaction instead of committing
+    with db_context.unit_of_work():
+        student_id = _resolve_student(StudentRepository(db_context), assessment)
+        # total_score=None: bulk_create_sessions fills in the engine's total_percent
+        session = SessionRepository(db_context).bulk_create_sessions(
+            [Session(student_id=student_id, scale=scale, raw_scores=assessment.raw_scores, notes=assessment.notes)]
+        )[0]
         
-        # Check if student already exists
-        given = assessment.given_name or assessment.student_name.split()[0] if assessment.student_name else "Unknown"
-        family = assessment.family_name or (assessment.student_name.split()[-1] if len(assessment.student_name.split()) > 1 else "Student")
-        
-        cursor.execute(
-            "SELECT id FROM students WHERE given_name = ? AND family_name = ?",
-            (given, family)
-        )
-        row = cursor.fetchone()
-        
-        if row:
-            student_id = row[0]
+    return student_id, session.id
+
+
+# --- Batch import ------------------------------------------------------------
+
+BatchSource = Union[str, Path, Iterable[Union[str, Path]]]
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class FileImportResult:
+    """Outcome of importing one DOCX file."""
+    path: Path
+    parse_seconds: float = 0.0
+    assessment: Optional[ImportedAssessment] = None
+    error: Optional[str] = None
+    student_id: Optional[int] = None
+    session_id: Optional[int] = None
+    file_sha256: Optional[str] = None
+    duplicate_of: Optional[int] = None  # session id of an earlier import of the same sheet
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.session_id is not None
+
+    @property
+    def skipped(self) -> bool:
+        return self.duplicate_of is not None
+
+
+@dataclass
+class BatchImportReport:
+    results: List[FileImportResult] = field(default_factory=list)
+    workers: int = 1
+    hash_seconds: float = 0.0
+    parse_seconds: float = 0.0  # wall time for the parsing stage
+    store_seconds: float = 0.0
+
+    @property
+    def imported(self) -> List[FileImportResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def duplicates(self) -> List[FileImportResult]:
+        return [r for r in self.results if r.skipped]
+
+    @property
+    def failed(self) -> List[FileImportResult]:
+        return [r for r in self.results if not r.ok and not r.skipped]
+
+
+def collect_docx_files(source: BatchSource) -> List[Path]:
+    """Resolve a directory, a glob pattern or an iterable of paths to DOCX files.
+
+    Word's ``~$`` lock files are skipped; directory and glob results are
+    sorted so imports happen in a stable order.
+    """
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.is_dir():
+            candidates = sorted(path.glob("*.docx"))
+        elif glob.has_magic(str(source)):
+            candidates = sorted(Path(p) for p in glob.glob(str(source), recursive=True))
         else:
-            # Create new student
-            now = datetime.utcnow().isoformat()
-            cursor.execute(
-                """INSERT INTO students (given_name, family_name, dob, identifier, created_at)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (given, family, None, None, now)
+            candidates = [path]
+    else:
+        candidates = [Path(p) for p in source]
+    return [p for p in candidates if not p.name.startswith("~$")]
+
+
+def _parse_file(path: Path) -> FileImportResult:
+    # Module-level so it can be sent to worker processes
+    started = time.perf_counter()
+    result = FileImportResult(path=path)
+    try:
+        assessment = parse_docx(path)
+        if assessment.is_valid:
+            result.assessment = assessment
+        else:
+            result.error = "Could not extract student name from document"
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.parse_seconds = time.perf_counter() - started
+    return result
+
+
+def default_import_workers(file_count: int) -> int:
+    return max(1, min(file_count, os.cpu_count() or 1))
+
+
+def parse_docx_files(
+    files: Sequence[Path],
+    max_workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[List[FileImportResult], int]:
+    """Parse *files* in a process pool; returns (results in input order, workers used).
+
+    One worker, or a platform without working multiprocessing (Android),
+    parses in this process instead. The pool is meant for command-line and
+    batch entry points: under the spawn start method (Windows, macOS) each
+    worker re-imports ``__main__``, and the app's entry point starts the UI
+    at import time, so the app passes ``max_workers=1``.
+    """
+    workers = max_workers or default_import_workers(len(files))
+    results: List[FileImportResult] = []
+    if workers > 1 and len(files) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(files) // (workers * 4))
+                for result in pool.map(_parse_file, files, chunksize=chunksize):
+                    results.append(result)
+                    if progress is not None:
+                        progress(len(results), len(files))
+            return results, workers
+        except (ImportError, NotImplementedError, OSError, BrokenProcessPool):
+            results = []  # no usable process pool here: fall back below
+    for path in files:
+        results.append(_parse_file(path))
+        if progress is not None:
+            progress(len(results), len(files))
+    return results, 1
+
+
+def store_parsed_assessments(db_context, results: Sequence[FileImportResult], scale: str = "88") -> None:
+    """Insert every parsed assessment in one transaction.
+
+    Students are resolved file by file, each in a savepoint, so a file that
+    fails is rolled back on its own and recorded on its result without
+    losing the others. The sessions are then scored in one engine batch and
+    inserted together, with the same totals and domain columns as sessions
+    saved from the scoring screen. A sheet whose normalized scores were
+    imported before (from another file, or earlier in this batch) is marked
+    as a duplicate instead, and its file hash is added to the ledger so the
+    next run skips it without parsing.
+    """
+    from gmfm_app.data.models import Session
+    from gmfm_app.data.repositories import SessionRepository, StudentRepository
+
+    ledger = ImportLedger(db_context)
+    students = StudentRepository(db_context)
+    staged: List[Tuple[FileImportResult, str, Session]] = []
+    first_by_scores: Dict[str, FileImportResult] = {}
+    repeats: List[Tuple[FileImportResult, str]] = []
+    with db_context.unit_of_work() as conn:
+        for result in results:
+            assessment = result.assessment
+            if assessment is None:
+                continue
+            scores_hash = ledger.scores_sha256(
+                assessment.given_name, assessment.family_name, assessment.assessment_date, assessment.raw_scores
             )
-            student_id = cursor.lastrowid
-        
-        # Calculate total score
-        if assessment.raw_scores:
-            total = sum(assessment.raw_scores.values()) / (len(assessment.raw_scores) * 3) * 100
+            existing = ledger.find_scores(conn, scores_hash)
+            if existing is not None:
+                student_id, result.duplicate_of = existing
+                if result.file_sha256:
+                    ledger.record(conn, result.file_sha256, scores_hash, student_id, result.duplicate_of)
+                continue
+            if scores_hash in first_by_scores:
+                repeats.append((result, scores_hash))  # resolved once the first copy has a session
+                continue
+            conn.execute("SAVEPOINT import_file")
+            try:
+                result.student_id = _resolve_student(students, assessment)
+                session = Session(
+                    student_id=result.student_id, scale=scale, raw_scores=assessment.raw_scores, notes=assessment.notes
+                )
+            except Exception as exc:
+                conn.execute("ROLLBACK TO import_file")
+                result.student_id = None
+                result.error = f"{type(exc).__name__}: {exc}"
+            else:
+                first_by_scores[scores_hash] = result
+                staged.append((result, scores_hash, session))
+            conn.execute("RELEASE import_file")
+
+        # total_score=None: bulk_create_sessions fills in the engine's total_percent
+        sessions = SessionRepository(db_context).bulk_create_sessions([session for _, _, session in staged])
+        for (result, scores_hash, _), session in zip(staged, sessions):
+            result.session_id = session.id
+            if result.file_sha256:
+                ledger.record(conn, result.file_sha256, scores_hash, result.student_id, result.session_id)
+        for result, scores_hash in repeats:
+            original = first_by_scores[scores_hash]
+            result.duplicate_of = original.session_id
+            if result.file_sha256:
+                ledger.record(conn, result.file_sha256, scores_hash, original.student_id, original.session_id)
+
+
+def _hash_files(files: Sequence[Path]) -> List[FileImportResult]:
+    results = []
+    for path in files:
+        result = FileImportResult(path=path)
+        try:
+            result.file_sha256 = file_sha256(path)
+        except OSError as exc:
+            result.error = f"{type(exc).__name__}: {exc}"
+        results.append(result)
+    return results
+
+
+def import_docx_batch(
+    db_context,
+    source: BatchSource,
+    scale: str = "88",
+    max_workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> BatchImportReport:
+    """Import every DOCX in *source*, skipping sheets that were imported before.
+
+    Files are hashed and looked up in the import ledger first; only unseen
+    files are parsed (in parallel) and stored, all in one transaction.
+    *progress* is called as ``progress(files_parsed, files_to_parse)``.
+    """
+    report = BatchImportReport()
+    started = time.perf_counter()
+    report.results = _hash_files(collect_docx_files(source))
+    with db_context.connect() as conn:
+        known = ImportLedger(db_context).known_files(conn, (r.file_sha256 for r in report.results if r.file_sha256))
+    first_seen: Dict[str, FileImportResult] = {}
+    to_parse: List[FileImportResult] = []
+    copies: List[FileImportResult] = []
+    for result in report.results:
+        if result.file_sha256 is None:
+            continue
+        if result.file_sha256 in known:
+            result.duplicate_of = known[result.file_sha256]
+        elif result.file_sha256 in first_seen:
+            copies.append(result)  # same bytes twice in this batch: resolved once the first is stored
         else:
-            total = 0.0
-        
-        # Create session
-        now = datetime.utcnow().isoformat()
-        cursor.execute(
-            """INSERT INTO sessions (student_id, scale, raw_scores, total_score, notes, created_at)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (student_id, scale, json.dumps(assessment.raw_scores), total, assessment.notes, now)
-        )
-        session_id = cursor.lastrowid
-        
-        conn.commit()
-        
-    return student_id, session_id
+            first_seen[result.file_sha256] = result
+            to_parse.append(result)
+    report.hash_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parsed, report.workers = parse_docx_files([r.path for r in to_parse], max_workers, progress)
+    for result, outcome in zip(to_parse, parsed):
+        result.parse_seconds, result.assessment, result.error = outcome.parse_seconds, outcome.assessment, outcome.error
+    report.parse_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    store_parsed_assessments(db_context, to_parse, scale=scale)
+    for copy in copies:
+        original = first_seen[copy.file_sha256]
+        copy.duplicate_of = original.session_id or original.duplicate_of
+        if copy.duplicate_of is None:
+            copy.error = original.error
+    report.store_seconds = time.perf_counter() - started
+    return report
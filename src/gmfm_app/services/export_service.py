@@ -0,0 +1,391 @@
+"""Streaming data export.
+
+Every student and session is read through one ``students LEFT JOIN
+sessions`` cursor, fetched ``fetch_size`` rows at a time, and written out
+record by record, so memory stays flat no matter how large the caseload is.
+
+The JSON export is JSON Lines: one object per line, each tagged with a
+``type``. A ``student`` record is followed by that student's ``session``
+records, oldest first; sessions carry their item scores keyed by item number
+and the stored per-domain percentages.
+
+The CSV export has a ``wide`` layout (one row per session, a column per
+item) and a ``long`` layout (one row per tested item). Either export can run
+on an ``ExportJob`` thread and be cancelled between batches.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from gmfm_app.data.database import DatabaseContext
+from gmfm_app.data.score_codec import DOMAIN_COLUMNS, decode_scores
+from gmfm_app.scoring.constants import MAX_ITEM_SCORE, NOT_TESTED
+from gmfm_app.scoring.packed import ITEM_COUNT
+
+EXPORT_FETCH_SIZE = 500
+WRITE_BUFFER_SIZE = 1 << 16
+EXPORT_DIR_NAME = "GMFM_Reports"
+JSONL_FILE_NAME = "gmfm_export.jsonl"
+
+ProgressCallback = Callable[[int, int], None]
+
+# Ordered by the students rowid and the (student_id, created_at) index, so
+# rows stream out without a sort step
+_EXPORT_SQL = f"""
+    SELECT st.id, st.given_name, st.family_name, st.dob, st.identifier, st.created_at,
+           se.id, se.scale, se.raw_scores, se.total_score, se.notes, se.created_at,
+           {", ".join("se." + column for column in DOMAIN_COLUMNS)}, se.items_scored
+    FROM students st
+    LEFT JOIN sessions se ON se.student_id = st.id
+    ORDER BY st.id, se.created_at
+"""
+_SESSION_OFFSET = 6
+_DOMAIN_OFFSET = 12
+
+
+@dataclass
+class ExportReport:
+    path: Optional[Path] = None
+    students: int = 0
+    sessions: int = 0
+    rows: int = 0  # CSV data rows written
+
+
+def export_dir() -> Path:
+    """Folder exports are written to: app storage on Android, ~/Documents elsewhere."""
+    flet_storage = os.getenv("FLET_APP_STORAGE_DATA")
+    if flet_storage:
+        folder = Path(flet_storage) / EXPORT_DIR_NAME
+    else:
+        try:
+            folder = Path(os.path.expanduser("~")) / "Documents" / EXPORT_DIR_NAME
+        except Exception:
+            folder = Path(".") / EXPORT_DIR_NAME
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def _student_record(row, names: List[Optional[str]]) -> Dict[str, object]:
+    given_name, family_name, identifier = names
+    return {
+        "type": "student",
+        "id": row[0],
+        "given_name": given_name,
+        "family_name": family_name,
+        "dob": row[3],
+        "identifier": identifier,
+        "created_at": row[5],
+    }
+
+
+def _session_record(row) -> Dict[str, object]:
+    domains = {
+        column[-1].upper(): value
+        for column, value in zip(DOMAIN_COLUMNS, row[_DOMAIN_OFFSET:_DOMAIN_OFFSET + len(DOMAIN_COLUMNS)])
+        if value is not None
+    }
+    return {
+        "type": "session",
+        "id": row[_SESSION_OFFSET],
+        "student_id": row[0],
+        "scale": row[7],
+        "total_score": row[9],
+        "notes": row[10],
+        "created_at": row[11],
+        "domain_scores": domains or None,
+        "items_scored": row[-1],
+        "raw_scores": dict(decode_scores(row[8]).items()),
+    }
+
+
+def count_export_rows(db_context: DatabaseContext) -> Dict[str, int]:
+    with db_context.connect() as conn:
+        students, sessions = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM students), (SELECT COUNT(*) FROM sessions)"
+        ).fetchone()
+    return {"students": students, "sessions": sessions}
+
+
+def _iter_row_batches(db_context: DatabaseContext, fetch_size: int) -> Iterator[Tuple[list, Dict[int, list]]]:
+    """Yield (joined rows, decrypted names of students first seen in them)."""
+    with db_context.connect() as conn:
+        cursor = conn.execute(_EXPORT_SQL)
+        last_student = None
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            new_students = []
+            for row in rows:
+                if row[0] != last_student:
+                    new_students.append(row)
+                    last_student = row[0]
+            plain = db_context.decrypt_many([value for row in new_students for value in (row[1], row[2], row[4])])
+            yield rows, {row[0]: plain[i * 3:i * 3 + 3] for i, row in enumerate(new_students)}
+
+
+def iter_export_batches(
+    db_context: DatabaseContext, fetch_size: int = EXPORT_FETCH_SIZE
+) -> Iterator[List[Dict[str, object]]]:
+    """Yield export records in batches of at most one fetch.
+
+    Student names are decrypted once per batch with ``decrypt_many``. The
+    cursor stays open between batches, so the caller must drain (or close)
+    the generator before using the same connection for writes.
+    """
+    for rows, names in _iter_row_batches(db_context, fetch_size):
+        batch: List[Dict[str, object]] = []
+        for row in rows:
+            student_names = names.pop(row[0], None)
+            if student_names is not None:
+                batch.append(_student_record(row, student_names))
+            if row[_SESSION_OFFSET] is not None:
+                batch.append(_session_record(row))
+        yield batch
+
+
+def iter_export_records(db_context: DatabaseContext, fetch_size: int = EXPORT_FETCH_SIZE) -> Iterator[Dict[str, object]]:
+    for batch in iter_export_batches(db_context, fetch_size):
+        yield from batch
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export when its cancel event is set."""
+
+
+@contextmanager
+def _atomic_output(path: Path, newline: Optional[str] = None) -> Iterator[TextIO]:
+    # Written next to the destination and moved into place once complete, so
+    # a failed or cancelled export never leaves a truncated file behind
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline=newline, buffering=WRITE_BUFFER_SIZE) as handle:
+            yield handle
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _check_cancel(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled
+
+
+def export_jsonl(
+    db_context: DatabaseContext,
+    path: Union[str, Path, None] = None,
+    progress: Optional[ProgressCallback] = None,
+    fetch_size: int = EXPORT_FETCH_SIZE,
+    cancel: Optional[threading.Event] = None,
+) -> ExportReport:
+    """Write every student and session to *path* as JSON Lines.
+
+    *progress* is called as ``progress(sessions_written, total_sessions)``
+    after each fetched batch; setting *cancel* stops the export before the
+    next batch with ``ExportCancelled``.
+    """
+    path = Path(path) if path is not None else export_dir() / JSONL_FILE_NAME
+    total = count_export_rows(db_context)["sessions"]
+    report = ExportReport(path=path)
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with _atomic_output(path) as handle:
+        for batch in iter_export_batches(db_context, fetch_size):
+            _check_cancel(cancel)
+            for record in batch:
+                if record["type"] == "student":
+                    report.students += 1
+                else:
+                    report.sessions += 1
+            handle.write("".join(encode(record) + "\n" for record in batch))
+            if progress is not None:
+                progress(report.sessions, total)
+    return report
+
+
+# --- CSV -------------------------------------------------------------------
+
+WIDE_CSV_HEADER = [
+    "Session ID", "Student ID", "Given Name", "Family Name", "Identifier", "DOB",
+    "Scale", "Date", "Total %",
+    *(f"{column[-1].upper()} %" for column in DOMAIN_COLUMNS),
+    "Items Scored", "Notes",
+    *(f"Item {item}" for item in range(1, ITEM_COUNT + 1)),
+]
+LONG_CSV_HEADER = ["Session ID", "Student ID", "Identifier", "Scale", "Date", "Item", "Score"]
+CSV_FILE_NAMES = {"wide": "gmfm_sessions_wide.csv", "long": "gmfm_item_scores_long.csv"}
+
+_ITEM_CELLS = tuple("" if value == NOT_TESTED else value for value in range(256))
+# (item index, score) -> the fixed tail of a long-layout line
+_LONG_TAILS = [[f"{index + 1},{score}\r\n" for score in range(MAX_ITEM_SCORE + 1)] for index in range(ITEM_COUNT)]
+
+
+def _wide_chunk(writer, rows, names: Dict[int, list], current: list) -> int:
+    written = 0
+    domain_end = _DOMAIN_OFFSET + len(DOMAIN_COLUMNS)
+    for row in rows:
+        if row[0] in names:
+            current[:] = names[row[0]]
+        if row[_SESSION_OFFSET] is None:
+            continue
+        given_name, family_name, identifier = current
+        vector = decode_scores(row[8]).to_vector()
+        writer.writerow([
+            row[_SESSION_OFFSET], row[0], given_name, family_name, identifier, row[3],
+            row[7], row[11], row[9],
+            *row[_DOMAIN_OFFSET:domain_end],
+            row[-1], row[10],
+            *map(_ITEM_CELLS.__getitem__, vector),
+        ])
+        written += 1
+    return written
+
+
+def _long_chunk(writer, rows, names: Dict[int, list], current: list) -> int:
+    # The csv writer quotes the per-session prefix once; item/score tails are
+    # plain integers and come from a table
+    buffer = writer.buffer
+    written = 0
+    for row in rows:
+        if row[0] in names:
+            current[:] = names[row[0]]
+        if row[_SESSION_OFFSET] is None:
+            continue
+        mark = buffer.tell()
+        writer.writerow((row[_SESSION_OFFSET], row[0], current[2], row[7], row[11], ""))
+        buffer.seek(mark)
+        prefix = buffer.read()[:-2]  # drop the empty cell's line ending, keep its comma
+        buffer.seek(mark)
+        buffer.truncate()
+        vector = decode_scores(row[8]).to_vector()
+        lines = [prefix + _LONG_TAILS[index][value] for index, value in enumerate(vector) if value != NOT_TESTED]
+        buffer.write("".join(lines))
+        written += len(lines)
+    return written
+
+
+class _ChunkWriter:
+    """csv.writer over an in-memory buffer, drained once per fetched batch."""
+
+    def __init__(self) -> None:
+        self.buffer = io.StringIO()
+        self._writer = csv.writer(self.buffer)
+        self.writerow = self._writer.writerow
+
+    def drain(self) -> str:
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+
+_CSV_LAYOUTS = {"wide": (WIDE_CSV_HEADER, _wide_chunk), "long": (LONG_CSV_HEADER, _long_chunk)}
+CSV_LAYOUTS = tuple(_CSV_LAYOUTS)
+
+
+def _iter_csv_chunks(db_context: DatabaseContext, layout: str, fetch_size: int) -> Iterator[Tuple[str, int, int, int]]:
+    """Yield (csv text, data rows, new students, sessions) per fetched batch, header first."""
+    if layout not in _CSV_LAYOUTS:
+        raise ValueError(f"Unknown CSV layout {layout!r}; expected one of {CSV_LAYOUTS}")
+    header, build = _CSV_LAYOUTS[layout]
+    writer = _ChunkWriter()
+    writer.writerow(header)
+    yield writer.drain(), 0, 0, 0
+    current = [None, None, None]  # names of the student the cursor is on
+    for rows, names in _iter_row_batches(db_context, fetch_size):
+        students = len(names)
+        written = build(writer, rows, names, current)
+        yield writer.drain(), written, students, sum(1 for row in rows if row[_SESSION_OFFSET] is not None)
+
+
+def iter_csv_chunks(db_context: DatabaseContext, layout: str = "wide", fetch_size: int = EXPORT_FETCH_SIZE) -> Iterator[str]:
+    """Yield the CSV export as text chunks of one fetch each, the header first.
+
+    ``wide`` is one row per session with a column per item (blank when not
+    tested) and the stored domain percentages; ``long`` is one row per tested
+    item, for tools that want tidy data.
+    """
+    for text, _, _, _ in _iter_csv_chunks(db_context, layout, fetch_size):
+        yield text
+
+
+def export_csv(
+    db_context: DatabaseContext,
+    layout: str = "wide",
+    path: Union[str, Path, None] = None,
+    progress: Optional[ProgressCallback] = None,
+    fetch_size: int = EXPORT_FETCH_SIZE,
+    cancel: Optional[threading.Event] = None,
+) -> ExportReport:
+    """Write every session as CSV in the given *layout* ("wide" or "long").
+
+    Each fetched batch is formatted into one text chunk and written in a
+    single call; *progress* and *cancel* behave as in ``export_jsonl``.
+    """
+    if layout not in _CSV_LAYOUTS:
+        raise ValueError(f"Unknown CSV layout {layout!r}; expected one of {CSV_LAYOUTS}")
+    path = Path(path) if path is not None else export_dir() / CSV_FILE_NAMES[layout]
+    total = count_export_rows(db_context)["sessions"]
+    report = ExportReport(path=path)
+    with _atomic_output(path, newline="") as handle:
+        for text, written, students, sessions in _iter_csv_chunks(db_context, layout, fetch_size):
+            _check_cancel(cancel)
+            handle.write(text)
+            report.rows += written
+            report.students += students
+            report.sessions += sessions
+            if sessions and progress is not None:
+                progress(report.sessions, total)
+    return report
+
+
+class ExportJob:
+    """Runs one export on a background thread so the UI stays responsive.
+
+    *export* receives the job's cancel event; ``cancel()`` sets it and the
+    export stops before its next batch. *on_finished* is called from the
+    worker thread with the job once it has a ``report``, ``error`` or was
+    ``cancelled``.
+    """
+
+    def __init__(
+        self,
+        export: Callable[[threading.Event], ExportReport],
+        on_finished: Optional[Callable[["ExportJob"], None]] = None,
+    ) -> None:
+        self._export = export
+        self._on_finished = on_finished
+        self.cancel_event = threading.Event()
+        self.report: Optional[ExportReport] = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self._thread = threading.Thread(target=self._run, name="gmfm-export", daemon=True)
+
+    def start(self) -> "ExportJob":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self) -> None:
+        try:
+            self.report = self._export(self.cancel_event)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as exc:  # surfaced to the UI through on_finished
+            self.error = exc
+        if self._on_finished is not None:
+            self._on_finished(self)
@@ -0,0 +1,172 @@
+"""Online encryption key rotation for student records.
+
+Rotation runs in three phases:
+
+1. ``SecurityProvider.begin_rotation`` makes the new key primary and keeps the
+   old ones in the key ring (a ``MultiFernet``), so every row stays readable
+   while the table is half re-encrypted;
+2. students are re-encrypted in id order, ``batch_size`` rows per transaction.
+   Each batch is decrypted once, then re-encrypted and re-tokenized for the
+   blind search index from the same plaintext. The last finished id is
+   checkpointed in ``settings`` in the same transaction, so an interrupted
+   run picks up from the checkpoint;
+3. the search index is marked current, the checkpoint is removed and the old
+   keys are retired.
+
+Run ``python -m gmfm_app.services.key_rotation`` to rotate the app database.
+Keys read from ``GMFM_APP_SECRET`` can't be written back, so those rotations
+need the new key up front: put it first in the variable, then pass it with
+``--new-key`` (or as *new_key*).
+
+Each process keeps its keys in one shared provider (``get_security_provider``),
+so restart any running app after rotating its database from the command line.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from gmfm_app.data.database import DatabaseContext
+from gmfm_app.data.search_index import StudentSearchIndex, forget_ready
+from gmfm_app.services import security as security_module
+
+ROTATION_BATCH_SIZE = 500
+CHECKPOINT_SETTING = "key_rotation_checkpoint"
+ENCRYPTED_COLUMNS = ("given_name", "family_name", "identifier")
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class RotationReport:
+    rows: int = 0
+    batches: int = 0
+    unreadable: int = 0  # fields no key could decrypt; left untouched
+    resumed_from: int = 0
+    seconds: float = 0.0
+
+
+def _read_checkpoint(conn) -> Optional[int]:
+    row = conn.execute("SELECT value FROM settings WHERE key = ?", (CHECKPOINT_SETTING,)).fetchone()
+    return int(row[0]) if row else None
+
+
+def _write_checkpoint(conn, last_id: int) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (CHECKPOINT_SETTING, str(last_id))
+    )
+
+
+def rotate_student_keys(
+    db_context: DatabaseContext,
+    new_key: Optional[bytes] = None,
+    batch_size: int = ROTATION_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> RotationReport:
+    """Re-encrypt every student under a new primary key.
+
+    Without *new_key* an unfinished rotation is resumed, or a fresh key is
+    generated. *progress* is called as ``progress(done, total)`` after each
+    committed batch.
+
+    Keys from ``GMFM_APP_SECRET`` always need an explicit *new_key*: a key
+    generated here could not be saved, and rows encrypted under it would be
+    lost on the next start.
+    """
+    security = db_context.security
+    if security is None or security_module.Fernet is None:
+        raise RuntimeError("Key rotation needs a SecurityProvider with cryptography installed")
+    if new_key is None and security.key_source == "env":
+        raise RuntimeError(
+            f"Keys come from {security_module.ENV_KEY_VAR}: add the new key to it (newest first) "
+            "and pass it as new_key"
+        )
+
+    started = time.perf_counter()
+    report = RotationReport()
+    with db_context.connect() as conn:
+        checkpoint = _read_checkpoint(conn)
+        if new_key is not None and new_key != security.keys[0]:
+            checkpoint = None  # a different key: every row has to be redone
+        elif new_key is None and checkpoint is None:
+            new_key = security_module.Fernet.generate_key()
+        if checkpoint is None:
+            security.begin_rotation(new_key)
+            _write_checkpoint(conn, 0)
+            checkpoint = 0
+        report.resumed_from = checkpoint
+        total = conn.execute("SELECT COUNT(*) FROM students WHERE id > ?", (checkpoint,)).fetchone()[0]
+
+    search_index = StudentSearchIndex(db_context)  # keyed from the new primary key
+    columns = ", ".join(ENCRYPTED_COLUMNS)
+    assignments = ", ".join(f"{column} = ?" for column in ENCRYPTED_COLUMNS)
+    width = len(ENCRYPTED_COLUMNS)
+    last_id = checkpoint
+    while True:
+        with db_context.connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, {columns} FROM students WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            old = [row[1 + i] for row in rows for i in range(width)]
+            plain = security.decrypt_many(old)
+            new = security.encrypt_many(plain)
+            for index, (before, value) in enumerate(zip(old, plain)):
+                if value is None and before is not None:
+                    report.unreadable += 1
+                    new[index] = before  # unreadable under every key: leave it untouched
+            conn.executemany(
+                f"UPDATE students SET {assignments} WHERE id = ?",
+                [(*new[i * width:(i + 1) * width], row[0]) for i, row in enumerate(rows)],
+            )
+            conn.execute(
+                "DELETE FROM student_search_tokens WHERE student_id BETWEEN ? AND ?", (rows[0][0], rows[-1][0])
+            )
+            search_index.add_students(conn, ((row[0], plain[i * width], plain[i * width + 1]) for i, row in enumerate(rows)))
+            last_id = rows[-1][0]
+            _write_checkpoint(conn, last_id)
+        report.rows += len(rows)
+        report.batches += 1
+        if progress is not None:
+            progress(report.rows, total)
+
+    with db_context.connect() as conn:
+        search_index.mark_built(conn)
+        conn.execute("DELETE FROM settings WHERE key = ?", (CHECKPOINT_SETTING,))
+    forget_ready(db_context.path)
+    security.finish_rotation()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-encrypt student records under a new key.")
+    parser.add_argument("--db", help="database path (defaults to the app database)")
+    parser.add_argument("--batch-size", type=int, default=ROTATION_BATCH_SIZE)
+    parser.add_argument("--new-key", help=f"key to rotate to (required when keys come from {security_module.ENV_KEY_VAR})")
+    args = parser.parse_args(argv)
+
+    security = security_module.get_security_provider()
+    new_key = args.new_key.encode() if args.new_key else None
+    if new_key is None and security.key_source == "env":
+        suggested = security_module.Fernet.generate_key().decode()
+        ring = " ".join([suggested] + [key.decode() for key in security.keys])
+        print(f"Keys come from {security_module.ENV_KEY_VAR}, which this tool can't update. Set")
+        print(f"  {security_module.ENV_KEY_VAR}=\"{ring}\"")
+        print(f"then run again with --new-key {suggested}")
+        return 2
+    db_context = DatabaseContext(args.db, security=security)
+
+    def show(done: int, total: int) -> None:
+        print(f"\r{done}/{total} students re-encrypted", end="", flush=True)
+
+    report = rotate_student_keys(db_context, new_key=new_key, batch_size=args.batch_size, progress=show)
+    print(f"\nDone: {report.rows} rows in {report.seconds:.1f}s ({report.unreadable} unreadable fields left as-is)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 import base64
+import hashlib
+import hmac
+import importlib.util
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
-try:
-    from cryptography.fernet import Fernet
-    CRYPTO_AVAILABLE = True
-except Exception:
-    Fernet = None
-    CRYPTO_AVAILABLE = False
+# cryptography is imported on first use (or by SecurityProvider.warm_up()): the
+# import alone costs hundreds of milliseconds on Android
+CRYPTO_AVAILABLE = importlib.util.find_spec("cryptography") is not None
+_fernet_module = None
 try:
     import keyring  # type: ignore
 except ImportError:  # pragma: no cover
@@ -19,6 +24,37 @@ except ImportError:  # pragma: no cover
 ENV_KEY_VAR = "GMFM_APP_SECRET"
 KEY_FILE_NAME = ".gmfm_key"
 
+# Opt-in plaintext cache (see SecurityProvider.enable_decrypt_cache)
+DECRYPT_CACHE_SIZE = 4096
+DECRYPT_CACHE_TTL = 300.0  # seconds
+
+# Bulk encrypt/decrypt: values are split into chunks of this size and run on a
+# thread pool (Fernet's AES/HMAC work happens in OpenSSL with the GIL released)
+CRYPTO_CHUNK_SIZE = 256
+CRYPTO_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _crypto():
+    """Return ``cryptography.fernet``, importing it once; None when unavailable."""
+    global _fernet_module, CRYPTO_AVAILABLE
+    if _fernet_module is None and CRYPTO_AVAILABLE:
+        try:
+            from cryptography import fernet as module
+        except Exception:
+            CRYPTO_AVAILABLE = False
+            return None
+        _fernet_module = module
+    return _fernet_module
+
+
+def __getattr__(name: str):
+    # Lazy module attributes: security.Fernet / security.MultiFernet
+    if name in ("Fernet", "MultiFernet"):
+        module = _crypto()
+        return getattr(module, name) if module is not None else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_data_dir():
     # Attempt to find a writable data directory
     # On Android, we might need a specific path or just rely on CWD if writable.
@@ -26,66 +62,305 @@ def get_data_dir():
     return Path(".")
 
 
+def _split_keys(text: Optional[str]) -> List[bytes]:
+    """Parse a key ring: keys separated by newlines, commas or spaces."""
+    if not text:
+        return []
+    return [part.encode() for part in text.replace(",", " ").split()]
+
+
+class _DecryptCache:
+    """Bounded LRU of ciphertext token -> plaintext with a time-to-live per entry."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._clock = clock
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, plain = entry
+            if expires_at <= self._clock():
+                del self._data[token]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(token)
+            self.hits += 1
+            return plain
+
+    def put(self, token: str, plain: str) -> None:
+        with self._lock:
+            self._data[token] = (self._clock() + self.ttl, plain)
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def info(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "maxsize": self.maxsize,
+                "currsize": len(self._data),
+                "ttl": self.ttl,
+            }
+
+
 class SecurityProvider:
     """Loads/stores encryption keys and exposes helper methods."""
 
     def __init__(self) -> None:
-        if not CRYPTO_AVAILABLE:
-            self._key = None
-            self._fernet = None
-            return
-        self._key = self._load_key()
-        self._fernet = Fernet(self._key)
+        # Construction is free: keys are read and ciphers built on first use
+        # (or ahead of time by warm_up), once per provider
+        self._decrypt_cache: Optional[_DecryptCache] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._ready = False
+        self._keys: List[bytes] = []
+        self._key_source: Optional[str] = None
+        self._key: Optional[bytes] = None
+        self._fernet = None
+
+    def _ensure_ready(self, generate_key: bool = True) -> bool:
+        if self._ready:
+            return True
+        with self._init_lock:
+            if self._ready:
+                return True
+            if _crypto() is None:
+                self._ready = True
+                return True
+            keys, source = self._load_keys(generate_key)
+            if not keys:
+                return False
+            self._key_source = source
+            self._install(keys)
+            self._ready = True
+            return True
+
+    def warm_up(self, generate_key: bool = True) -> bool:
+        """Import cryptography, read the key ring and build the ciphers now.
+
+        With ``generate_key=False`` a missing key is left for the first real
+        use to create. Returns True once the provider is ready.
+        """
+        return self._ensure_ready(generate_key)
+
+    def use_key(self, key: bytes) -> None:
+        """Switch to *key*; cached plaintext from the previous key is dropped."""
+        self.use_keys([key])
+
+    def use_keys(self, keys: Sequence[bytes]) -> None:
+        """Install a key ring, newest first: encrypt with the first, decrypt with any."""
+        if not keys:
+            raise ValueError("At least one key is required")
+        with self._init_lock:
+            self._install(keys)
+            self._ready = True
+
+    def _install(self, keys: Sequence[bytes]) -> None:
+        fernet = _crypto()
+        self._keys = list(keys)
+        self._key = self._keys[0]
+        fernets = [fernet.Fernet(key) for key in self._keys]
+        self._fernet = fernets[0] if len(fernets) == 1 else fernet.MultiFernet(fernets)
+        self.clear_decrypt_cache()
+
+    @property
+    def keys(self) -> List[bytes]:
+        self._ensure_ready()
+        return list(self._keys)
+
+    @property
+    def key_source(self) -> Optional[str]:
+        """Where the key ring was loaded from: "env", "file", or None if installed in code."""
+        self._ensure_ready()
+        return self._key_source
 
     # key resolution order: env -> local file -> generate new key
-    def _load_key(self) -> bytes:
-        env_key = os.getenv(ENV_KEY_VAR)
-        if env_key:
-            return env_key.encode()
+    # (env and file may hold several keys, newest first, while a rotation is in progress)
+    def _load_keys(self, generate: bool = True) -> Tuple[List[bytes], Optional[str]]:
+        env_keys = _split_keys(os.getenv(ENV_KEY_VAR))
+        if env_keys:
+            return env_keys, "env"
         
         # Try local file in data dir
-        file_key = self._read_local_key()
-        if file_key:
-            return file_key
+        file_keys = self._read_local_keys()
+        if file_keys:
+            return file_keys, "file"
+        if not generate:
+            return [], None
             
         # Generate new
-        new_key = Fernet.generate_key()
-        self._persist_key(new_key)
-        return new_key
+        new_key = _crypto().Fernet.generate_key()
+        self._persist_keys([new_key])
+        return [new_key], "file"
 
     def _get_key_path(self) -> Path:
         return get_data_dir() / KEY_FILE_NAME
 
-    def _read_local_key(self) -> Optional[bytes]:
+    def _read_local_keys(self) -> List[bytes]:
         key_path = self._get_key_path()
         if key_path.exists():
             try:
-                content = key_path.read_text().strip()
-                # Basic validation
-                if len(content) > 0:
-                    return content.encode()
+                return _split_keys(key_path.read_text())
             except Exception:
                 pass
-        return None
+        return []
 
-    def _persist_key(self, key: bytes) -> None:
+    def _persist_keys(self, keys: Sequence[bytes]) -> None:
+        key_path = self._get_key_path()
         try:
-            self._get_key_path().write_text(key.decode())
+            # Write-then-rename so an interrupted rotation never leaves a torn key file
+            tmp_path = key_path.with_name(key_path.name + ".tmp")
+            tmp_path.write_text("\n".join(key.decode() for key in keys) + "\n")
+            os.replace(tmp_path, key_path)
         except Exception:
             # If we can't write, we might be on a read-only filesystem or strict permissions
             print("WARNING: Could not persist encryption key.")
 
+    def _save_keys(self) -> None:
+        if self._key_source == "env":
+            print(f"WARNING: keys come from {ENV_KEY_VAR}; update it to the new key ring (newest first).")
+            return
+        self._persist_keys(self._keys)
+
+    # rotation
+    def begin_rotation(self, new_key: bytes) -> None:
+        """Make *new_key* primary while older keys stay usable for decryption."""
+        self.use_keys([new_key] + [key for key in self.keys if key != new_key])
+        self._save_keys()
+
+    def finish_rotation(self) -> None:
+        """Retire every key but the primary once all data has been re-encrypted."""
+        self.use_keys(self.keys[:1])
+        self._save_keys()
+
     def encrypt(self, value: Optional[str]) -> Optional[str]:
+        if not self._ready:
+            self._ensure_ready()
         if value is None or self._fernet is None:
             return value
         token = self._fernet.encrypt(value.encode("utf-8"))
         return token.decode("utf-8")
 
+    def blind_index_key(self) -> Optional[bytes]:
+        """Key for search tokens, derived from (but not equal to) the encryption key."""
+        self._ensure_ready()
+        if self._key is None:
+            return None
+        return hmac.new(base64.urlsafe_b64decode(self._key), b"gmfm-blind-index", hashlib.sha256).digest()
+
     def decrypt(self, value: Optional[str]) -> Optional[str]:
+        if not self._ready:
+            self._ensure_ready()
         if value is None or self._fernet is None:
             return value
+        cache = self._decrypt_cache
+        if cache is not None:
+            cached = cache.get(value)
+            if cached is not None:
+                return cached
         try:
-            plain = self._fernet.decrypt(value.encode("utf-8"))
-            return plain.decode("utf-8")
+            plain = self._fernet.decrypt(value.encode("utf-8")).decode("utf-8")
         except Exception:
             return None
+        if cache is not None:
+            cache.put(value, plain)
+        return plain
+
+    # bulk helpers
+    def encrypt_many(self, values: Sequence[Optional[str]], chunk_size: int = CRYPTO_CHUNK_SIZE) -> List[Optional[str]]:
+        """Encrypt a batch of values, preserving order (None stays None)."""
+        return self._map_chunks(self.encrypt, values, chunk_size)
+
+    def decrypt_many(self, values: Sequence[Optional[str]], chunk_size: int = CRYPTO_CHUNK_SIZE) -> List[Optional[str]]:
+        """Decrypt a batch of tokens, preserving order; unreadable tokens become None."""
+        return self._map_chunks(self.decrypt, values, chunk_size)
+
+    def _map_chunks(self, func: Callable[[Optional[str]], Optional[str]], values: Sequence[Optional[str]], chunk_size: int) -> List[Optional[str]]:
+        values = list(values)
+        self._ensure_ready()
+        if self._fernet is None:
+            return values
+        chunk_size = max(1, chunk_size)
+        if len(values) <= chunk_size or CRYPTO_WORKERS < 2:
+            return [func(value) for value in values]
+        chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+        results: List[Optional[str]] = []
+        for chunk in self._executor().map(lambda part: [func(value) for value in part], chunks):
+            results.extend(chunk)
+        return results
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=CRYPTO_WORKERS, thread_name_prefix="gmfm-crypto")
+            return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the bulk worker threads (they are restarted on demand)."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # decrypt cache
+    def enable_decrypt_cache(self, maxsize: int = DECRYPT_CACHE_SIZE, ttl: float = DECRYPT_CACHE_TTL) -> None:
+        """Keep up to *maxsize* decrypted values for *ttl* seconds, keyed by ciphertext.
+
+        Fernet tokens embed a random IV, so a token maps to exactly one
+        plaintext and re-encrypting a value never hits a stale entry.
+        """
+        self._decrypt_cache = _DecryptCache(maxsize, ttl)
+
+    def disable_decrypt_cache(self) -> None:
+        self._decrypt_cache = None
+
+    def clear_decrypt_cache(self) -> None:
+        if self._decrypt_cache is not None:
+            self._decrypt_cache.clear()
+
+    def lock(self) -> None:
+        """Forget all cached plaintext, e.g. when the app is backgrounded or locked."""
+        self.clear_decrypt_cache()
+
+    def decrypt_cache_info(self) -> Optional[Dict[str, float]]:
+        """Hit/miss counters and size of the decrypt cache, or None when it is disabled."""
+        if self._decrypt_cache is None:
+            return None
+        return self._decrypt_cache.info()
+
+
+# Process-wide providers, one per key location, so keys are read and ciphers
+# built once rather than on every SecurityProvider() construction
+_providers: Dict[Tuple[Optional[str], str], SecurityProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_security_provider() -> SecurityProvider:
+    """Shared provider for the current key location (env keys or key file)."""
+    identity = (os.getenv(ENV_KEY_VAR), str((get_data_dir() / KEY_FILE_NAME).resolve()))
+    with _providers_lock:
+        provider = _providers.get(identity)
+        if provider is None:
+            provider = _providers[identity] = SecurityProvider()
+        return provider
@@ -1,12 +1,14 @@
 """
 Dashboard - With Recent Activity and Quick Actions
 """
+import threading
 import flet as ft
 from datetime import datetime
 from gmfm_app.data.database import DatabaseContext
 from gmfm_app.data.repositories import StudentRepository, SessionRepository
+from gmfm_app.services.dashboard_service import load_dashboard_snapshot, load_latest_sessions, load_student_page
 from gmfm_app.services.haptics import tap, select, success, warning
-from gmfm_app.services.docx_import_service import parse_docx, import_assessment_to_db
+from gmfm_app.services.docx_import_service import import_docx_batch
 
 
 def get_colors(is_dark):
@@ -28,6 +30,10 @@ WARNING = "#F59E0B"
 ERROR = "#EF4444"
 INFO = "#3B82F6"
 
+# Students are fetched a page at a time as the list scrolls
+STUDENT_PAGE_SIZE = 50
+LOAD_MORE_EXTENT = 800  # px from the bottom at which the next page is requested
+
 
 def get_greeting():
     """Return a time-appropriate greeting."""
@@ -50,6 +56,10 @@ class DashboardView(ft.View):
         self.session_repo = SessionRepository(db_context)
         self.c = c
         self.search_term = ""  # For search highlighting
+        self._row_cache = {}  # student id -> rendered (unhighlighted) row
+        self._loading_more = threading.Lock()  # held while the next page is fetched
+        self.on_scroll = self._on_scroll
+        self.on_scroll_interval = 100
 
         # Header with search
         self.search = ft.TextField(
@@ -165,25 +175,18 @@ class DashboardView(ft.View):
         self._load_recent_activity()
 
     def _load_recent_activity(self):
-        """Load last 3 sessions across all students."""
+        """Show the last 3 sessions across all students (from the dashboard snapshot)."""
         c = self.c
-        all_sessions = []
-        for s in self.all_students:
-            sessions = self.session_repo.list_sessions_for_student(s.id)
-            for sess in sessions:
-                all_sessions.append((s, sess))
-        
-        # Sort by date, most recent first
-        all_sessions.sort(key=lambda x: x[1].created_at, reverse=True)
+        recent = self.snapshot.recent
         
         self.recent_list.controls.clear()
         
-        if not all_sessions:
+        if not recent:
             self.recent_list.controls.append(
                 ft.Text("No recent activity", size=13, color=c["TEXT3"])
             )
         else:
-            for st, sess in all_sessions[:3]:
+            for sess in recent:
                 color = SUCCESS if sess.total_score >= 70 else WARNING if sess.total_score >= 40 else ERROR
                 self.recent_list.controls.append(
                     ft.Container(
@@ -197,7 +200,7 @@ class DashboardView(ft.View):
                             ),
                             ft.Container(width=10),
                             ft.Column([
-                                ft.Text(f"{st.given_name} {st.family_name}", size=13, weight=ft.FontWeight.W_600, color=c["TEXT1"], no_wrap=True, overflow=ft.TextOverflow.ELLIPSIS),
+                                ft.Text(sess.student_name, size=13, weight=ft.FontWeight.W_600, color=c["TEXT1"], no_wrap=True, overflow=ft.TextOverflow.ELLIPSIS),
                                 ft.Text(sess.created_at.strftime("%b %d, %H:%M"), size=11, color=c["TEXT3"], no_wrap=True),
                             ], spacing=2, expand=True),
                             ft.Icon("chevron_right", color=c["TEXT3"], size=18),
@@ -206,7 +209,7 @@ class DashboardView(ft.View):
                         bgcolor=c["CARD"],
                         border_radius=12,
                         border=ft.border.all(1, c["BORDER"]),
-                        on_click=lambda _, sid=sess.id: self._page_ref.go(f"/session?session_id={sid}"),
+                        on_click=lambda _, sid=sess.session_id: self._page_ref.go(f"/session?session_id={sid}"),
                         ink=True,
                     )
                 )
@@ -279,21 +282,44 @@ class DashboardView(ft.View):
         )
 
     def load_students(self):
-        self.all_students = self.repo.list_students(limit=100)
+        # First page of students, latest scores, totals and recent activity in two queries
+        self.snapshot = load_dashboard_snapshot(self.db_context, student_limit=STUDENT_PAGE_SIZE, recent_limit=3)
+        self.all_students = list(self.snapshot.students)
+        self._latest = dict(self.snapshot.latest)
+        self._next_cursor = self.snapshot.next_cursor
+        self._row_cache.clear()
         self._update_stats()
         self._render(self.all_students)
 
+    def _on_scroll(self, e: ft.OnScrollEvent):
+        if self.search_term or self._next_cursor is None or self._loading_more.locked():
+            return
+        if e.pixels >= e.max_scroll_extent - LOAD_MORE_EXTENT:
+            self._load_more_students()
+
+    def _load_more_students(self):
+        """Fetch the next keyset page and append only its rows to the list."""
+        # Scroll events arrive on several threads: only one may fetch a page
+        if not self._loading_more.acquire(blocking=False):
+            return
+        try:
+            if self._next_cursor is None:
+                return  # the last page arrived while this event was queued
+            students, latest, self._next_cursor = load_student_page(
+                self.db_context, after=self._next_cursor, limit=STUDENT_PAGE_SIZE
+            )
+            self.all_students.extend(students)
+            self._latest.update(latest)
+            self.student_list.controls.extend(self._student_row(s) for s in students)
+            self.student_list.update()
+        finally:
+            self._loading_more.release()
+
     def _update_stats(self):
-        self.stat_students.value = str(len(self.all_students))
-        total_sessions = 0
-        total_score = 0
-        for s in self.all_students:
-            sessions = self.session_repo.list_sessions_for_student(s.id)
-            total_sessions += len(sessions)
-            for sess in sessions:
-                total_score += sess.total_score or 0
-        self.stat_sessions.value = str(total_sessions)
-        self.stat_avg.value = f"{total_score / total_sessions:.0f}%" if total_sessions > 0 else "N/A"
+        snapshot = self.snapshot
+        self.stat_students.value = str(snapshot.total_students)
+        self.stat_sessions.value = str(snapshot.total_sessions)
+        self.stat_avg.value = f"{snapshot.avg_score:.0f}%" if snapshot.total_sessions > 0 else "N/A"
 
     def filter_students(self, e):
         term = self.search.value.lower()
@@ -305,8 +331,10 @@ class DashboardView(ft.View):
         if not term:
             self._render(self.all_students)
         else:
-            filtered = [s for s in self.all_students if term in f"{s.given_name} {s.family_name}".lower()]
-            self._render(filtered)
+            # Searches the whole caseload through the blind token index, not just loaded pages
+            found = self.repo.search_students(term, limit=STUDENT_PAGE_SIZE)
+            self._latest.update(load_latest_sessions(self.db_context, [s.id for s in found if s.id not in self._latest]))
+            self._render(found)
 
     def _clear_search(self, e):
         """Clear the search field and show all students."""
@@ -360,65 +388,75 @@ class DashboardView(ft.View):
                 )
             )
         else:
-            for s in students:
-                latest = self.session_repo.get_latest_session_for_student(s.id)
-                has_session = latest is not None
-                last_score = f"{latest.total_score:.0f}%" if latest else "New"
-                
-                # Determine score color
-                score_color = c["TEXT2"]
-                if latest:
-                    score_color = SUCCESS if latest.total_score >= 70 else WARNING if latest.total_score >= 40 else ERROR
-                
-                self.student_list.controls.append(
-                    ft.Container(
-                        content=ft.Row([
-                            ft.Container(
-                                content=ft.Text(f"{s.given_name[0]}{s.family_name[0]}".upper(), size=14, weight=ft.FontWeight.BOLD, color="white"),
-                                width=42, height=42,
-                                bgcolor=PRIMARY,
-                                border_radius=12,
-                                alignment=ft.alignment.center,
-                            ),
-                            ft.Container(width=8),
-                            ft.Column([
-                                self._highlight_text(f"{s.given_name} {s.family_name}", self.search_term, c),
-                                ft.Row([
-                                    ft.Text("Last:", size=10, color=c["TEXT2"]),
-                                    ft.Text(last_score, size=10, weight=ft.FontWeight.BOLD, color=score_color),
-                                ], spacing=3),
-                            ], expand=True, spacing=1),
-                            ft.Container(
-                                content=ft.Icon("play_arrow", color="white", size=18),
-                                width=36, height=36,
-                                bgcolor=SUCCESS if has_session else PRIMARY,
-                                border_radius=10,
-                                alignment=ft.alignment.center,
-                                on_click=lambda _, sid=s.id, sess_id=latest.id if latest else None: self._start_scoring(sid, sess_id),
-                            ),
-                            ft.Container(
-                                content=ft.Icon("edit", color=c["TEXT3"], size=18),
-                                width=36, height=36,
-                                border_radius=10,
-                                alignment=ft.alignment.center,
-                                on_click=lambda _, sid=s.id: self._page_ref.go(f"/student?id={sid}"),
-                            ),
-                            ft.Container(
-                                content=ft.Icon("history", color=c["TEXT2"], size=18),
-                                width=36, height=36,
-                                border_radius=10,
-                                alignment=ft.alignment.center,
-                                on_click=lambda _, sid=s.id: self._page_ref.go(f"/history?student_id={sid}"),
-                            ),
-                        ], spacing=4),
-                        padding=10,
-                        bgcolor=c["CARD"],
-                        border_radius=12,
-                        border=ft.border.all(1, c["BORDER"]),
-                        on_click=lambda _, sid=s.id: self._page_ref.go(f"/history?student_id={sid}"),
-                        ink=True,
-                    )
-                )
+            self.student_list.controls.extend(self._student_row(s) for s in students)
+
+    def _student_row(self, s):
+        # Plain rows are reused across searches and re-renders; highlighted ones are rebuilt
+        if self.search_term:
+            return self._build_student_row(s)
+        row = self._row_cache.get(s.id)
+        if row is None:
+            row = self._row_cache[s.id] = self._build_student_row(s)
+        return row
+
+    def _build_student_row(self, s):
+        c = self.c
+        latest = self._latest.get(s.id)
+        has_session = latest is not None
+        last_score = f"{latest.total_score:.0f}%" if latest else "New"
+
+        # Determine score color
+        score_color = c["TEXT2"]
+        if latest:
+            score_color = SUCCESS if latest.total_score >= 70 else WARNING if latest.total_score >= 40 else ERROR
+
+        return ft.Container(
+            content=ft.Row([
+                ft.Container(
+                    content=ft.Text(f"{s.given_name[0]}{s.family_name[0]}".upper(), size=14, weight=ft.FontWeight.BOLD, color="white"),
+                    width=42, height=42,
+                    bgcolor=PRIMARY,
+                    border_radius=12,
+                    alignment=ft.alignment.center,
+                ),
+                ft.Container(width=8),
+                ft.Column([
+                    self._highlight_text(f"{s.given_name} {s.family_name}", self.search_term, c),
+                    ft.Row([
+                        ft.Text("Last:", size=10, color=c["TEXT2"]),
+                        ft.Text(last_score, size=10, weight=ft.FontWeight.BOLD, color=score_color),
+                    ], spacing=3),
+                ], expand=True, spacing=1),
+                ft.Container(
+                    content=ft.Icon("play_arrow", color="white", size=18),
+                    width=36, height=36,
+                    bgcolor=SUCCESS if has_session else PRIMARY,
+                    border_radius=10,
+                    alignment=ft.alignment.center,
+                    on_click=lambda _, sid=s.id, sess_id=latest.session_id if latest else None: self._start_scoring(sid, sess_id),
+                ),
+                ft.Container(
+                    content=ft.Icon("edit", color=c["TEXT3"], size=18),
+                    width=36, height=36,
+                    border_radius=10,
+                    alignment=ft.alignment.center,
+                    on_click=lambda _, sid=s.id: self._page_ref.go(f"/student?id={sid}"),
+                ),
+                ft.Container(
+                    content=ft.Icon("history", color=c["TEXT2"], size=18),
+                    width=36, height=36,
+                    border_radius=10,
+                    alignment=ft.alignment.center,
+                    on_click=lambda _, sid=s.id: self._page_ref.go(f"/history?student_id={sid}"),
+                ),
+            ], spacing=4),
+            padding=10,
+            bgcolor=c["CARD"],
+            border_radius=12,
+            border=ft.border.all(1, c["BORDER"]),
+            on_click=lambda _, sid=s.id: self._page_ref.go(f"/history?student_id={sid}"),
+            ink=True,
+        )
 
     def _start_scoring(self, student_id, session_id=None):
         tap(self.page)  # Haptic feedback
@@ -493,65 +531,55 @@ class DashboardView(ft.View):
         self._page_ref.update()
 
     def _import_docx(self, e):
-        """Import student data from a DOCX file."""
+        """Import assessments from one or more picked DOCX files."""
         tap(self.page)
         
         def on_file_picked(e: ft.FilePickerResultEvent):
             if not e.files:
                 return
-            
-            file_path = e.files[0].path
-            try:
-                # Parse the DOCX file
-                assessment = parse_docx(file_path)
-                
-                if not assessment.is_valid:
-                    self._page_ref.snack_bar = ft.SnackBar(
-                        ft.Text("Could not extract student name from document"),
-                        bgcolor=ERROR
-                    )
-                    self._page_ref.snack_bar.open = True
-                    self._page_ref.update()
-                    return
-                
-                # Import to database
-                student_id, session_id = import_assessment_to_db(
-                    assessment, self.db_context, scale="88"
-                )
-                
-                # Refresh list
-                self.load_students()
-                self._page_ref.update()
-                
-                scores_count = len(assessment.raw_scores)
-                self._page_ref.snack_bar = ft.SnackBar(
-                    ft.Text(f"Imported {assessment.student_name or assessment.given_name} with {scores_count} scores"),
-                    bgcolor=SUCCESS
-                )
-                self._page_ref.snack_bar.open = True
-                self._page_ref.update()
-                
-            except FileNotFoundError:
-                self._page_ref.snack_bar = ft.SnackBar(
-                    ft.Text("File not found"),
-                    bgcolor=ERROR
-                )
-                self._page_ref.snack_bar.open = True
-                self._page_ref.update()
-            except Exception as ex:
-                self._page_ref.snack_bar = ft.SnackBar(
-                    ft.Text(f"Import failed: {str(ex)}"),
-                    bgcolor=ERROR
-                )
-                self._page_ref.snack_bar.open = True
-                self._page_ref.update()
+            paths = [f.path for f in e.files]
+            self._show_snack(ft.SnackBar(ft.Text(f"Importing {len(paths)} file(s)..."), duration=60_000))
+            # Import on a background thread, parsing in a single worker; keep the UI thread free
+            threading.Thread(target=self._run_docx_import, args=(paths,), daemon=True).start()
         
         # Create and open file picker
         file_picker = ft.FilePicker(on_result=on_file_picked)
         self._page_ref.overlay.append(file_picker)
         self._page_ref.update()
         file_picker.pick_files(
-            dialog_title="Select GMFM Assessment DOCX",
+            dialog_title="Select GMFM Assessment DOCX files",
             allowed_extensions=["docx"],
-            allow_multiple=False,
+            allow_multiple=True,
         )
+
+    def _run_docx_import(self, paths):
+        try:
+            # Parse in-process on this thread (a few ms per sheet): a process
+            # pool's spawned workers would re-import src/main.py, which starts the app
+            report = import_docx_batch(self.db_context, paths, scale="88", max_workers=1)
+        except Exception as ex:
+            self._show_snack(ft.SnackBar(ft.Text(f"Import failed: {str(ex)}"), bgcolor=ERROR))
+            return
+        
+        imported, duplicates, failed = report.imported, report.duplicates, report.failed
+        if imported:
+            self.load_students()
+            self._page_ref.update()
+        if len(paths) == 1 and imported:
+            assessment = imported[0].assessment
+            message = f"Imported {assessment.student_name or assessment.given_name} with {len(assessment.raw_scores)} scores"
+        elif len(paths) == 1 and duplicates:
+            message = "This scoresheet was already imported"
+        else:
+            message = f"Imported {len(imported)} of {len(report.results)} files"
+            if duplicates:
+                message += f", {len(duplicates)} already imported"
+        if failed:
+            first = failed[0]
+            message += f" ({len(failed)} failed; {first.path.name}: {first.error})"
+        self._show_snack(ft.SnackBar(ft.Text(message), bgcolor=ERROR if failed and not imported else SUCCESS))
+
+    def _show_snack(self, snack_bar):
+        self._page_ref.snack_bar = snack_bar
+        self._page_ref.snack_bar.open = True
+        self._page_ref.update()
@@ -7,8 +7,9 @@ import threading
 from gmfm_app.data.database import DatabaseContext
 from gmfm_app.data.repositories import StudentRepository, SessionRepository
 from gmfm_app.data.models import Session
-from gmfm_app.scoring.items_catalog import get_domains
-from gmfm_app.scoring.engine import calculate_gmfm_scores
+from gmfm_app.scoring.items_catalog import SUPPORTED_SCALES, get_domains
+from gmfm_app.scoring.incremental import IncrementalScorer
+from gmfm_app.scoring.plan import get_scoring_plan
 from gmfm_app.services.haptics import select, success, heavy, warning
 from gmfm_app.services.instructions_service import get_instruction
 
@@ -42,7 +43,7 @@ class ScoringView(ft.View):
         self.db_context = db_context
         self.student_id = student_id
         self.session_id = session_id
-        self.scale = "88"  # Always GMFM-88
+        self.scale = scale if scale in SUPPORTED_SCALES else "88"
         self.student_repo = StudentRepository(db_context)
         self.session_repo = SessionRepository(db_context)
         self.scores = {}
@@ -57,10 +58,6 @@ class ScoringView(ft.View):
         student = self.student_repo.get_student(student_id)
         self.student_name = f"{student.given_name} {student.family_name}" if student else "Student"
         
-        # Get total items for this scale
-        domains = get_domains(self.scale)
-        self.total_items = sum(len(d.items) for d in domains)
-
         # Load existing scores
         if session_id:
             existing = self.session_repo.get_session(session_id)
@@ -68,10 +65,19 @@ class ScoringView(ft.View):
                 self.scale = existing.scale  # Use session's scale
                 self.scores = dict(existing.raw_scores)
 
+        # Precompiled item layout for this scale
+        self.plan = get_scoring_plan(self.scale)
+        self.total_items = self.plan.n_items
+        # Running domain sums so every tap updates live percentages in O(1)
+        self.scorer = IncrementalScorer(self.scale, self.scores)
+        self.domain_count_texts = {}
+        self.domain_percent_texts = {}
+
         # Header
-        self.score_text = ft.Text(f"{len(self.scores)} / {self.total_items}", size=14, weight=ft.FontWeight.BOLD, color=PRIMARY)
+        self.score_text = ft.Text(f"{self.scorer.items_scored} / {self.total_items}", size=14, weight=ft.FontWeight.BOLD, color=PRIMARY)
         self.timer_text = ft.Text("0:00", size=12, color=c["TEXT2"])
-        self.progress = ft.ProgressBar(value=len(self.scores) / self.total_items if self.total_items > 0 else 0, color=PRIMARY, bgcolor=c["BORDER"], bar_height=4)
+        self.total_text = ft.Text(f"{self.scorer.total_percent:.1f}%", size=12, weight=ft.FontWeight.BOLD, color=c["TEXT2"])
+        self.progress = ft.ProgressBar(value=self.scorer.items_scored / self.total_items if self.total_items > 0 else 0, color=PRIMARY, bgcolor=c["BORDER"], bar_height=4)
         
         header = ft.SafeArea(
             content=ft.Container(
@@ -80,7 +86,11 @@ class ScoringView(ft.View):
                         ft.IconButton("arrow_back", icon_color=c["TEXT1"], on_click=self._go_back),
                         ft.Column([
                             ft.Text(self.student_name, size=16, weight=ft.FontWeight.BOLD, color=c["TEXT1"]),
-                            ft.Row([ft.Icon("timer", size=14, color=c["TEXT3"]), self.timer_text], spacing=4),
+                            ft.Row([
+                                ft.Icon("timer", size=14, color=c["TEXT3"]), self.timer_text,
+                                ft.Container(width=8),
+                                ft.Icon("insights", size=14, color=c["TEXT3"]), self.total_text,
+                            ], spacing=4),
                         ], spacing=2, expand=True),
                         ft.PopupMenuButton(
                             icon="more_vert",
@@ -171,19 +181,20 @@ class ScoringView(ft.View):
         thread.start()
 
     def _bulk_score(self, value):
-        domains = get_domains(self.scale)
-        for domain in domains:
-            for item in domain.items:
-                self.scores[item.number] = value
-                if item.number in self.score_buttons:
-                    color = DOMAIN_COLORS.get(domain.dimension, PRIMARY)
-                    for v, btn in self.score_buttons[item.number].items():
+        plan = self.plan
+        for d, dimension in enumerate(plan.dimensions):
+            color = DOMAIN_COLORS.get(dimension, PRIMARY)
+            for item_number in plan.domain_items(d):
+                self.scores[item_number] = value
+                if item_number in self.score_buttons:
+                    for v, btn in self.score_buttons[item_number].items():
                         if v == "NT":
                             btn.bgcolor = self.c["CARD"]
                         else:
                             is_sel = str(value) == v
                             btn.bgcolor = color if is_sel else self.c["CARD"]
                             btn.content.color = "white" if is_sel else self.c["TEXT1"]
+        self.scorer.fill(value)
         self._update_progress()
         self._page_ref.snack_bar = ft.SnackBar(ft.Text(f"All items scored as {value}"), bgcolor=SUCCESS)
         self._page_ref.snack_bar.open = True
@@ -191,6 +202,7 @@ class ScoringView(ft.View):
 
     def _clear_all(self, e):
         self.scores.clear()
+        self.scorer.clear()
         for item_id, buttons in self.score_buttons.items():
             for v, btn in buttons.items():
                 if v == "NT":
@@ -204,10 +216,10 @@ class ScoringView(ft.View):
         self._page_ref.update()
 
     def _copy_summary(self, e):
-        result = calculate_gmfm_scores(self.scores, scale=self.scale)
+        result = self.scorer.result()
         summary = f"GMFM-{self.scale} Assessment - {self.student_name}\n"
         summary += f"Total: {result['total_percent']:.1f}%\n"
-        summary += f"Items scored: {len(self.scores)}/{self.total_items}\n\n"
+        summary += f"Items scored: {result['items_scored']}/{self.total_items}\n\n"
         for d, vals in result["domains"].items():
             summary += f"{DOMAIN_NAMES.get(d, d)}: {vals['percent']:.1f}%\n"
         self._page_ref.set_clipboard(summary)
@@ -216,13 +228,13 @@ class ScoringView(ft.View):
         self._page_ref.update()
 
     def _jump_to_unscored(self, e):
-        domains = get_domains(self.scale)
-        for i, domain in enumerate(domains):
-            for item in domain.items:
-                if item.number not in self.scores:
+        plan = self.plan
+        for i in range(plan.n_domains):
+            for item_number in plan.domain_items(i):
+                if item_number not in self.scores:
                     self.tabs.selected_index = i
                     self.tabs.update()
-                    self._page_ref.snack_bar = ft.SnackBar(ft.Text(f"Jumped to item {item.number}"), bgcolor=PRIMARY)
+                    self._page_ref.snack_bar = ft.SnackBar(ft.Text(f"Jumped to item {item_number}"), bgcolor=PRIMARY)
                     self._page_ref.snack_bar.open = True
                     self._page_ref.update()
                     return
@@ -244,25 +256,43 @@ class ScoringView(ft.View):
         self._page_ref.snack_bar.open = True
         self._page_ref.update()
 
-    def _update_progress(self):
-        self.score_text.value = f"{len(self.scores)} / {self.total_items}"
-        self.progress.value = len(self.scores) / self.total_items if self.total_items > 0 else 0
+    def _update_progress(self, domain_index=None):
+        scored = self.scorer.items_scored
+        self.score_text.value = f"{scored} / {self.total_items}"
+        self.progress.value = scored / self.total_items if self.total_items > 0 else 0
+        self.total_text.value = f"{self.scorer.total_percent:.1f}%"
         self.score_text.update()
         self.progress.update()
+        self.total_text.update()
+        self._refresh_domain_stats(domain_index)
         
         # Check if all scored
-        if len(self.scores) == self.total_items:
+        if scored == self.total_items:
             self._show_celebration()
 
+    def _refresh_domain_stats(self, domain_index=None):
+        """Update live domain headers; only the tapped domain unless bulk-changed."""
+        indexes = range(self.plan.n_domains) if domain_index is None else [domain_index]
+        for d in indexes:
+            count_text = self.domain_count_texts.get(d)
+            percent_text = self.domain_percent_texts.get(d)
+            if count_text is None or percent_text is None:
+                continue
+            count_text.value = f"{self.scorer.domain_count(d)}/{self.plan.domain_size(d)} items scored"
+            percent_text.value = f"{self.scorer.domain_percent(d):.0f}%"
+            count_text.update()
+            percent_text.update()
+
     def _load_domains(self):
         domains = get_domains(self.scale)
         c = self.c
         self.tabs.tabs.clear()
 
-        for domain in domains:
+        for d, domain in enumerate(domains):
             color = DOMAIN_COLORS.get(domain.dimension, PRIMARY)
             icon = DOMAIN_ICONS.get(domain.dimension, "category")
-            scored = sum(1 for item in domain.items if item.number in self.scores)
+            self.domain_count_texts[d] = ft.Text(f"{self.scorer.domain_count(d)}/{len(domain.items)} items scored", size=12, color=c["TEXT2"])
+            self.domain_percent_texts[d] = ft.Text(f"{self.scorer.domain_percent(d):.0f}%", size=16, weight=ft.FontWeight.BOLD, color=color)
             
             items_list = ft.Column(spacing=8, scroll=ft.ScrollMode.ADAPTIVE, expand=True)
 
@@ -280,10 +310,10 @@ class ScoringView(ft.View):
                         ft.Container(width=12),
                         ft.Column([
                             ft.Text(DOMAIN_NAMES.get(domain.dimension, domain.title), size=16, weight=ft.FontWeight.BOLD, color=c["TEXT1"]),
-                            ft.Text(f"{scored}/{len(domain.items)} items scored", size=12, color=c["TEXT2"]),
+                            self.domain_count_texts[d],
                         ], spacing=2, expand=True),
                         ft.Container(
-                            content=ft.Text(f"{int(scored/len(domain.items)*100)}%", size=16, weight=ft.FontWeight.BOLD, color=color),
+                            content=self.domain_percent_texts[d],
                             padding=ft.padding.symmetric(horizontal=12, vertical=6),
                             bgcolor=f"{color}20",
                             border_radius=10,
@@ -519,8 +549,10 @@ class ScoringView(ft.View):
         
         if value == "NT":
             self.scores.pop(item_id, None)
+            self.scorer.clear_item(item_id)
         else:
             self.scores[item_id] = int(value)
+            self.scorer.set(item_id, int(value))
         
         if item_id in self.score_buttons:
             for v, btn in self.score_buttons[item_id].items():
@@ -533,7 +565,7 @@ class ScoringView(ft.View):
                     btn.content.color = "white" if is_sel else c["TEXT1"]
                 btn.update()
         
-        self._update_progress()
+        self._update_progress(self.scorer.domain_index(item_id))
 
     def _save(self, e):
         try:
@@ -544,7 +576,7 @@ class ScoringView(ft.View):
             # Success haptic for Nothing Phone 2a
             success(self._page_ref)
 
-            result = calculate_gmfm_scores(self.scores, scale=self.scale)
+            result = self.scorer.result()
             total = result["total_percent"]
 
             notes = self.notes_field.value or ""
@@ -30,6 +30,7 @@ class SettingsView(ft.View):
         super().__init__(route="/settings", padding=0, bgcolor=c["BG"])
         self._page_ref = page
         self.db_context = db_context
+        self._export_job = None
 
         # Header
         header = ft.SafeArea(
@@ -64,8 +65,8 @@ class SettingsView(ft.View):
         data_card = self._settings_card(
             "Data Management",
             [
-                self._action_row("Export as JSON", "Download all data as JSON", "code", self._export_data),
-                self._action_row("Export as CSV", "Download for Excel/Sheets", "table_chart", self._export_csv),
+                self._action_row("Export as JSON", "All students, sessions and item scores (JSON Lines)", "code", self._export_data),
+                self._action_row("Export as CSV", "Per-item sessions for Excel/Sheets", "table_chart", self._export_csv),
                 self._action_row("Clear All Data", "Delete all students and sessions", "delete_forever", self._clear_data, danger=True),
             ]
         )
@@ -75,7 +76,7 @@ class SettingsView(ft.View):
             "About",
             [
                 self._info_row("Version", "1.0.0"),
-                self._info_row("GMFM Scale", "GMFM-88"),
+                self._info_row("GMFM Scale", "GMFM-66 / GMFM-88"),
                 self._info_row("Developer", "MotorMeasure Team"),
             ]
         )
@@ -164,107 +165,88 @@ class SettingsView(ft.View):
         self._page_ref.update()
 
     def _export_data(self, e):
+        """Export everything as JSON Lines on a background thread, showing progress."""
+        if self._export_job is not None:
+            return  # one export at a time
         success(self._page_ref)  # Haptic feedback
-        import json
-        from pathlib import Path
-        from gmfm_app.data.repositories import StudentRepository, SessionRepository
-        
-        student_repo = StudentRepository(self.db_context)
-        session_repo = SessionRepository(self.db_context)
-        
-        students = student_repo.list_students(limit=1000)
-        export = {"students": [], "sessions": []}
-        
-        for s in students:
-            export["students"].append({
-                "id": s.id,
-                "given_name": s.given_name,
-                "family_name": s.family_name,
-                "dob": str(s.dob) if s.dob else None,
-                "identifier": s.identifier,
-            })
-            sessions = session_repo.list_sessions_for_student(s.id)
-            for sess in sessions:
-                export["sessions"].append({
-                    "id": sess.id,
-                    "student_id": sess.student_id,
-                    "scale": sess.scale,
-                    "total_score": sess.total_score,
-                    "notes": sess.notes,
-                    "created_at": sess.created_at.isoformat(),
-                })
-        
-        import os
-        import sys
-        # Use Android-safe path
-        flet_storage = os.getenv("FLET_APP_STORAGE_DATA")
-        if flet_storage:
-            export_dir = Path(flet_storage) / "GMFM_Reports"
-        else:
-            try:
-                export_dir = Path(os.path.expanduser("~")) / "Documents" / "GMFM_Reports"
-            except Exception:
-                export_dir = Path(".") / "GMFM_Reports"
-        export_dir.mkdir(parents=True, exist_ok=True)
-        export_path = export_dir / "gmfm_export.json"
-        export_path.write_text(json.dumps(export, indent=2))
-        
-        self._page_ref.snack_bar = ft.SnackBar(ft.Text(f"Data exported to {export_path}"), bgcolor=SUCCESS)
-        self._page_ref.snack_bar.open = True
-        self._page_ref.update()
+        from gmfm_app.services.export_service import ExportJob, export_jsonl
+
+        status = ft.Text("Exporting JSON...")
+
+        def progress(done, total):
+            status.value = f"Exporting JSON... {done}/{total} sessions"
+            self._page_ref.update()
+
+        self._export_job = ExportJob(
+            lambda cancel: export_jsonl(self.db_context, progress=progress, cancel=cancel),
+            on_finished=self._export_data_finished,
+        )
+        self._export_job.start()
+        self._show_snack(
+            ft.SnackBar(
+                status,
+                action="Cancel",
+                on_action=lambda _: self._export_job and self._export_job.cancel(),
+                duration=60_000,
+            )
+        )
+
+    def _export_data_finished(self, job):
+        self._export_job = None
+        if job.cancelled:
+            self._show_snack(ft.SnackBar(ft.Text("JSON export cancelled")))
+            return
+        if job.error is not None:
+            self._show_snack(ft.SnackBar(ft.Text(f"JSON export failed: {job.error}"), bgcolor=ERROR))
+            return
+        report = job.report
+        self._show_snack(
+            ft.SnackBar(
+                ft.Text(f"Exported {report.students} students and {report.sessions} sessions to {report.path}"),
+                bgcolor=SUCCESS,
+            )
+        )
 
     def _export_csv(self, e):
-        """Export data as CSV for Excel/Sheets."""
+        """Export sessions as CSV for Excel/Sheets on a background thread."""
+        if self._export_job is not None:
+            return  # one export at a time
         success(self._page_ref)  # Haptic feedback
-        import csv
-        from pathlib import Path
-        from gmfm_app.data.repositories import StudentRepository, SessionRepository
-        
-        student_repo = StudentRepository(self.db_context)
-        session_repo = SessionRepository(self.db_context)
-        
-        students = student_repo.list_students(limit=1000)
-        
-        import os
-        import sys
-        # Use Android-safe path
-        flet_storage = os.getenv("FLET_APP_STORAGE_DATA")
-        if flet_storage:
-            export_dir = Path(flet_storage) / "GMFM_Reports"
-        else:
-            try:
-                export_dir = Path(os.path.expanduser("~")) / "Documents" / "GMFM_Reports"
-            except Exception:
-                export_dir = Path(".") / "GMFM_Reports"
-        export_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Export students CSV
-        students_path = export_dir / "students.csv"
-        with open(students_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "First Name", "Last Name", "DOB", "Identifier"])
-            for s in students:
-                writer.writerow([s.id, s.given_name, s.family_name, str(s.dob) if s.dob else "", s.identifier or ""])
-        
-        # Export sessions CSV
-        sessions_path = export_dir / "sessions.csv"
-        with open(sessions_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "Student ID", "Student Name", "Scale", "Total Score", "Notes", "Date"])
-            for s in students:
-                sessions = session_repo.list_sessions_for_student(s.id)
-                for sess in sessions:
-                    writer.writerow([
-                        sess.id, sess.student_id, f"{s.given_name} {s.family_name}",
-                        sess.scale, f"{sess.total_score:.1f}%", sess.notes or "",
-                        sess.created_at.strftime("%Y-%m-%d %H:%M")
-                    ])
-        
-        self._page_ref.snack_bar = ft.SnackBar(ft.Text(f"CSV files saved to {export_dir}!"), bgcolor=SUCCESS)
-        self._page_ref.snack_bar.open = True
-        self._page_ref.update()
-        
+        from gmfm_app.services.export_service import ExportJob, export_csv
+
+        def run(cancel):
+            # wide: one row per session; long: one row per tested item
+            wide = export_csv(self.db_context, "wide", cancel=cancel)
+            export_csv(self.db_context, "long", cancel=cancel)
+            return wide
+
+        # Assigned before start(): a fast export may finish (and clear it) right away
+        self._export_job = ExportJob(run, on_finished=self._export_csv_finished)
+        self._export_job.start()
+        self._show_snack(
+            ft.SnackBar(
+                ft.Text("Exporting CSV..."),
+                action="Cancel",
+                on_action=lambda _: self._export_job and self._export_job.cancel(),
+                duration=60_000,
+            )
+        )
+
+    def _export_csv_finished(self, job):
+        self._export_job = None
+        if job.cancelled:
+            self._show_snack(ft.SnackBar(ft.Text("CSV export cancelled")))
+            return
+        if job.error is not None:
+            self._show_snack(ft.SnackBar(ft.Text(f"CSV export failed: {job.error}"), bgcolor=ERROR))
+            return
+        export_dir = job.report.path.parent
+        self._show_snack(
+            ft.SnackBar(ft.Text(f"{job.report.sessions} sessions saved as CSV to {export_dir}"), bgcolor=SUCCESS)
+        )
+
         # Only open explorer on desktop
+        import sys
         if sys.platform == "win32":
             try:
                 import subprocess
@@ -272,16 +254,24 @@ class SettingsView(ft.View):
             except Exception:
                 pass
 
+    def _show_snack(self, snack_bar):
+        self._page_ref.snack_bar = snack_bar
+        self._page_ref.snack_bar.open = True
+        self._page_ref.update()
+
     def _clear_data(self, e):
 
         warning(self._page_ref)  # Warning haptic for dangerous action
         def confirm_clear(e):
             warning(self._page_ref)  # Another warning haptic on confirm
-            from gmfm_app.data.database import resolve_db_path
             import os
-            db_path = resolve_db_path()
-            if db_path.exists():
-                os.remove(db_path)
+            db_path = self.db_context.path
+            # Release pooled connections before removing the file (and its WAL)
+            self.db_context.close()
+            for suffix in ("", "-wal", "-shm"):
+                target = db_path.with_name(db_path.name + suffix)
+                if target.exists():
+                    os.remove(target)
             dlg.open = False
             self._page_ref.update()
             self._page_ref.snack_bar = ft.SnackBar(ft.Text("All data cleared"), bgcolor=SUCCESS)
@@ -4,7 +4,7 @@ Student Form - With Edit and Delete Support
 import flet as ft
 from datetime import datetime
 from gmfm_app.data.database import DatabaseContext
-from gmfm_app.data.repositories import StudentRepository, SessionRepository
+from gmfm_app.data.repositories import StudentRepository
 from gmfm_app.data.models import Student
 from gmfm_app.services.haptics import tap, success, warning
 
@@ -35,7 +35,6 @@ class StudentView(ft.View):
         self.page = page
         self.db_context = db_context
         self.repo = StudentRepository(db_context)
-        self.session_repo = SessionRepository(db_context)
         self.student_id = student_id
         self.c = c
         self.is_edit = student_id is not None
@@ -154,12 +153,8 @@ class StudentView(ft.View):
         c = self.c
         
         def do_delete(e):
-            # Delete all sessions first
-            sessions = self.session_repo.list_sessions_for_student(self.student_id)
-            for s in sessions:
-                self.session_repo.delete_session(s.id)
-            # Delete student
-            self.repo.delete_student(self.student_id)
+            # Student and all their sessions in one transaction
+            self.repo.delete_student_cascade(self.student_id)
             dlg.open = False
             if dlg in self.page.overlay:
                 self.page.overlay.remove(dlg)
@@ -0,0 +1,179 @@
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.data.database import DatabaseContext
+from gmfm_app.data.models import Session
+from gmfm_app.data.repositories import SessionRepository, StudentRepository
+from gmfm_app.scoring.engine import calculate_gmfm_scores
+from gmfm_app.services import docx_import_service
+from gmfm_app.services.docx_import_service import (
+    FileImportResult,
+    ImportedAssessment,
+    collect_docx_files,
+    import_docx_batch,
+    parse_docx_files,
+    store_parsed_assessments,
+)
+
+
+class BatchImportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.db_context = DatabaseContext(str(self.folder / "import.sqlite"))
+
+    def tearDown(self):
+        self.db_context.close()
+        self.temp_dir.cleanup()
+
+    def _touch(self, *names):
+        for name in names:
+            (self.folder / name).write_bytes(b"not a zip")
+        return [self.folder / name for name in names]
+
+
+class TestCollectFiles(BatchImportTestCase):
+    def test_directory_glob_and_list_sources(self):
+        self._touch("b.docx", "a.docx", "~$a.docx", "notes.txt")
+        self.assertEqual([p.name for p in collect_docx_files(self.folder)], ["a.docx", "b.docx"])
+        self.assertEqual([p.name for p in collect_docx_files(str(self.folder / "b*.docx"))], ["b.docx"])
+        self.assertEqual(collect_docx_files([self.folder / "b.docx"]), [self.folder / "b.docx"])
+
+
+class TestParseFiles(BatchImportTestCase):
+    def test_unreadable_files_report_errors_in_input_order(self):
+        files = self._touch("one.docx", "two.docx", "three.docx")
+        for workers in (1, 2):
+            seen = []
+            results, used = parse_docx_files(files, max_workers=workers, progress=lambda done, total: seen.append(done))
+            self.assertEqual([r.path for r in results], files)
+            self.assertTrue(all(r.error and r.assessment is None for r in results))
+            self.assertTrue(all(r.parse_seconds >= 0 for r in results))
+            self.assertEqual(seen, [1, 2, 3])
+
+
+def write_sheet(path, name):
+    """GMFCS.docx with the student name replaced."""
+    with zipfile.ZipFile(PROJECT_ROOT / "GMFCS.docx") as source, zipfile.ZipFile(path, "w") as target:
+        for item in source.infolist():
+            data = source.read(item)
+            if item.filename == "word/document.xml":
+                data = data.replace(b"<w:t>xyz</w:t>", f"<w:t>{name}</w:t>".encode())
+            target.writestr(item.filename, data)  # stored: recompressing the fonts is slow
+
+
+class TestImportSheets(BatchImportTestCase):
+    def test_pool_imports_every_sheet(self):
+        for name in ("Ada", "Grace", "Edsger"):
+            write_sheet(self.folder / f"{name}.docx", name)
+        report = import_docx_batch(self.db_context, self.folder, max_workers=2)
+        self.assertEqual((len(report.imported), len(report.failed)), (3, 0))
+        self.assertEqual(len({r.student_id for r in report.imported}), 3)
+
+
+class TestImportLedger(BatchImportTestCase):
+    def test_rerun_skips_known_files_before_parsing(self):
+        write_sheet(self.folder / "ada.docx", "Ada")
+        (self.folder / "ada copy.docx").write_bytes((self.folder / "ada.docx").read_bytes())
+        first = import_docx_batch(self.db_context, self.folder, max_workers=1)
+        self.assertEqual((len(first.imported), len(first.duplicates)), (1, 1))
+        session_id = first.imported[0].session_id
+        self.assertEqual(first.duplicates[0].duplicate_of, session_id)
+
+        write_sheet(self.folder / "grace.docx", "Grace")
+        with mock.patch.object(docx_import_service, "parse_docx", wraps=docx_import_service.parse_docx) as parse:
+            second = import_docx_batch(self.db_context, self.folder, max_workers=1)
+        self.assertEqual([c.args[0].name for c in parse.call_args_list], ["grace.docx"])
+        self.assertEqual((len(second.imported), len(second.duplicates)), (1, 2))
+        self.assertEqual(len(SessionRepository(self.db_context).list_sessions_for_student(first.imported[0].student_id)), 1)
+
+    def test_same_scores_in_new_file_is_a_duplicate(self):
+        write_sheet(self.folder / "ada.docx", "Ada")
+        first = import_docx_batch(self.db_context, self.folder / "ada.docx")
+        # Re-saved by Word: different bytes, same sheet
+        with zipfile.ZipFile(self.folder / "ada.docx") as source, zipfile.ZipFile(self.folder / "resaved.docx", "w") as target:
+            for item in source.infolist():
+                compression = zipfile.ZIP_DEFLATED if item.filename == "word/document.xml" else zipfile.ZIP_STORED
+                target.writestr(item.filename, source.read(item), compress_type=compression)
+        second = import_docx_batch(self.db_context, self.folder / "resaved.docx")
+        self.assertEqual(second.duplicates[0].duplicate_of, first.imported[0].session_id)
+
+        third = import_docx_batch(self.db_context, self.folder / "resaved.docx")  # now known by file hash
+        self.assertEqual(third.duplicates[0].duplicate_of, first.imported[0].session_id)
+
+    def test_deleting_the_session_allows_reimport(self):
+        write_sheet(self.folder / "ada.docx", "Ada")
+        first = import_docx_batch(self.db_context, self.folder)
+        StudentRepository(self.db_context).delete_student_cascade(first.imported[0].student_id)
+        again = import_docx_batch(self.db_context, self.folder)
+        self.assertEqual(len(again.imported), 1)
+
+
+    def test_reused_session_id_does_not_revive_a_deleted_import(self):
+        write_sheet(self.folder / "ada.docx", "Ada")
+        first = import_docx_batch(self.db_context, self.folder)
+        sessions = SessionRepository(self.db_context)
+        sessions.delete_session(first.imported[0].session_id)
+        # An unrelated session inherits the freed id
+        other = sessions.bulk_create_sessions([Session(student_id=first.imported[0].student_id, raw_scores={1: 1})])[0]
+        self.assertEqual(other.id, first.imported[0].session_id)
+        again = import_docx_batch(self.db_context, self.folder)
+        self.assertEqual((len(again.imported), len(again.duplicates)), (1, 0))
+
+class TestStoreParsed(BatchImportTestCase):
+    def _result(self, name, scores):
+        given, family = name.split()
+        return FileImportResult(
+            path=self.folder / f"{given}.docx",
+            assessment=ImportedAssessment(student_name=name, given_name=given, family_name=family, raw_scores=scores),
+        )
+
+    def test_assessments_land_in_one_transaction(self):
+        results = [
+            self._result("Ada Lovelace", {1: 3, 2: 3}),
+            FileImportResult(path=self.folder / "broken.docx", error="BadZipFile: not a zip"),
+            self._result("Ada Lovelace", {1: 1}),  # second sheet for the same student
+            self._result("Grace Hopper", {88: 2}),
+        ]
+        commits = self.db_context.pool_stats()["commits"]
+        store_parsed_assessments(self.db_context, results)
+        self.assertEqual(self.db_context.pool_stats()["commits"], commits + 1)
+
+        self.assertEqual([r.ok for r in results], [True, False, True, True])
+        self.assertEqual(results[0].student_id, results[2].student_id)
+        self.assertEqual(len(StudentRepository(self.db_context).list_students(limit=10)), 2)
+        sessions = SessionRepository(self.db_context).list_sessions_for_student(results[0].student_id)
+        self.assertEqual(len(sessions), 2)
+
+    def test_sessions_are_scored_like_the_scoring_screen(self):
+        scores = {1: 3, 2: 3, 18: 1, 88: 2}
+        results = [self._result("Ada Lovelace", scores), self._result("Ada Lovelace", scores)]
+        store_parsed_assessments(self.db_context, results)
+
+        session = SessionRepository(self.db_context).get_session(results[0].session_id)
+        expected = calculate_gmfm_scores(scores, scale="88")
+        self.assertEqual(session.total_score, expected["total_percent"])
+        self.assertNotEqual(session.total_score, sum(scores.values()) / (len(scores) * 3) * 100)
+        self.assertEqual(session.items_scored, expected["items_scored"])
+        self.assertEqual(sorted(session.domain_scores), ["A", "B", "C", "D", "E"])
+        # The same sheet twice in one batch becomes a duplicate of the first
+        self.assertEqual((results[1].session_id, results[1].duplicate_of), (None, results[0].session_id))
+
+    def test_batch_report_separates_failures(self):
+        self._touch("bad.docx")
+        report = import_docx_batch(self.db_context, self.folder, max_workers=1)
+        self.assertEqual((len(report.imported), len(report.failed), report.workers), (0, 1, 1))
+        self.assertEqual(report.failed[0].path.name, "bad.docx")
+
+
+if __name__ == "__main__":
+    unittest.main()
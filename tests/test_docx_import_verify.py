@@ -15,7 +15,8 @@ if str(SRC_PATH) not in sys.path:
 
 from gmfm_app.services.docx_import_service import parse_docx, import_assessment_to_db, ImportedAssessment
 from gmfm_app.data.database import DatabaseContext, init_db
-import sqlite3
+from gmfm_app.data.repositories import SessionRepository, StudentRepository
+from gmfm_app.scoring.engine import calculate_gmfm_scores
 
 class TestDocxImport(unittest.TestCase):
     def setUp(self):
@@ -64,7 +65,7 @@ class TestDocxImport(unittest.TestCase):
     def test_parse_docx(self):
         assessment = parse_docx(self.docx_path)
         
-        self.assertEqual(assessment.patient_name, "John Doe")
+        self.assertEqual(assessment.student_name, "John Doe")
         self.assertEqual(assessment.given_name, "John")
         self.assertEqual(assessment.family_name, "Doe")
         self.assertEqual(assessment.assessment_date, date(2023, 10, 25))
@@ -81,27 +82,23 @@ class TestDocxImport(unittest.TestCase):
 
     def test_import_to_db(self):
         assessment = parse_docx(self.docx_path)
-        patient_id, session_id = import_assessment_to_db(assessment, self.db_context)
+        student_id, session_id = import_assessment_to_db(assessment, self.db_context)
         
-        with self.db_context.connect() as conn:
-            cursor = conn.cursor()
-            
-            # Verify Patient
-            cursor.execute("SELECT given_name, family_name FROM patients WHERE id = ?", (patient_id,))
-            p_row = cursor.fetchone()
-            self.assertEqual(p_row[0], "John")
-            self.assertEqual(p_row[1], "Doe")
-            
-            # Verify Session
-            cursor.execute("SELECT scale, total_score, notes, raw_scores FROM sessions WHERE id = ?", (session_id,))
-            s_row = cursor.fetchone()
-            self.assertEqual(s_row[0], "88")
-            self.assertIn("Evaluator: Dr. Smith", s_row[2])
-            
-            # 4 items * 3 max = 12 total max.
-            # Scores: 3+2+1+0 = 6.
-            # 6 / 12 * 100 = 50.0%
-            self.assertEqual(s_row[1], 50.0)
+        # Verify Student (names are encrypted at rest, so read back through the repository)
+        student = StudentRepository(self.db_context).get_student(student_id)
+        self.assertEqual((student.given_name, student.family_name), ("John", "Doe"))
+        
+        # Verify Session
+        session = SessionRepository(self.db_context).get_session(session_id)
+        self.assertEqual(session.scale, "88")
+        self.assertIn("Evaluator: Dr. Smith", session.notes)
+        
+        # Scored like a session saved from the scoring screen: domain
+        # averages, not sum / (items * 3)
+        expected = calculate_gmfm_scores(assessment.raw_scores, scale="88")
+        self.assertEqual(session.total_score, expected["total_percent"])
+        self.assertEqual(session.items_scored, 4)
+        self.assertEqual(len(session.domain_scores), 5)
 
 if __name__ == "__main__":
     unittest.main()
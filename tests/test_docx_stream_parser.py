@@ -0,0 +1,175 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+from datetime import date, datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.services import docx_import_service
+from gmfm_app.services.docx_import_service import (
+    DateParser,
+    ImportedAssessment,
+    parse_docx,
+    parse_docx_stream,
+    parse_docx_with_python_docx,
+)
+
+GMFCS_DOCX = PROJECT_ROOT / "GMFCS.docx"
+DOCX_AVAILABLE = importlib.util.find_spec("docx") is not None
+BENCHMARK = os.getenv("GMFM_BENCHMARK") == "1"
+
+_DOCUMENT = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>
+<w:p><w:r><w:t>Name: Jane </w:t></w:r><w:hyperlink><w:r><w:t>Q Public</w:t></w:r></w:hyperlink></w:p>
+<w:p><w:r><w:t xml:space="preserve">Assessment Date: </w:t><w:t>2024-02-03</w:t></w:r></w:p>
+<w:tbl>
+  <w:tr><w:tc><w:p><w:r><w:t>1.</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Lifts head</w:t></w:r></w:p></w:tc>
+        <w:tc><w:p><w:r><w:t>3</w:t></w:r></w:p></w:tc></w:tr>
+  <w:tr><w:tc><w:tcPr><w:gridSpan w:val="2"/></w:tcPr><w:p><w:r><w:t>2.</w:t></w:r></w:p></w:tc>
+        <w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p/></w:tc></w:tr>
+  <w:tr><w:tc><w:p><w:r><w:t>4.</w:t></w:r></w:p>
+        <w:tbl><w:tr><w:tc><w:p><w:r><w:t>9.</w:t></w:r></w:p></w:tc></w:tr></w:tbl></w:tc>
+        <w:tc><w:p><w:r><w:t>Nested</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>NT</w:t></w:r></w:p></w:tc></w:tr>
+</w:tbl>
+<w:p><w:r><w:t>Evaluator: Dr X</w:t></w:r></w:p>
+</w:body></w:document>"""
+
+
+class TestStreamParser(unittest.TestCase):
+    def test_gmfcs_sheet(self):
+        assessment = parse_docx_stream(GMFCS_DOCX)
+        self.assertEqual(assessment.student_name, "xyz")
+        self.assertEqual(assessment.raw_scores, {1: 2, 2: 1, 3: 2, 6: 3, 9: 2, 12: 3})
+        self.assertEqual(parse_docx(GMFCS_DOCX), assessment)
+
+    def test_spans_merges_and_nested_tables(self):
+        with tempfile.TemporaryDirectory() as temp:
+            path = Path(temp) / "sheet.docx"
+            with zipfile.ZipFile(path, "w") as archive:
+                archive.writestr("word/document.xml", _DOCUMENT)
+            assessment = parse_docx_stream(path)
+        self.assertEqual(assessment, ImportedAssessment(
+            student_name="Jane Q Public", given_name="Jane", family_name="Q Public",
+            assessment_date=date(2024, 2, 3), evaluator_name="Dr X",
+            raw_scores={1: 3, 2: 3},  # row 2's score cell continues the merged "3" above
+            notes="Evaluator: Dr X",
+        ))
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            parse_docx_stream(PROJECT_ROOT / "missing.docx")
+
+    @unittest.skipUnless(DOCX_AVAILABLE, "python-docx not installed")
+    def test_matches_python_docx(self):
+        self.assertEqual(parse_docx_stream(GMFCS_DOCX), parse_docx_with_python_docx(GMFCS_DOCX))
+
+    def test_text_box_paragraphs_stay_out_of_their_host(self):
+        with tempfile.TemporaryDirectory() as temp:
+            path = Path(temp) / "text_box.docx"
+            with zipfile.ZipFile(GMFCS_DOCX) as source, zipfile.ZipFile(path, "w") as target:
+                for item in source.infolist():
+                    data = _TEXT_BOX_DOCUMENT.encode() if item.filename == "word/document.xml" else source.read(item)
+                    target.writestr(item.filename, data)
+            assessment = parse_docx_stream(path)
+            self.assertEqual((assessment.given_name, assessment.family_name), ("Jane", "Roe"))
+            self.assertEqual(assessment.raw_scores, {1: 2})
+            if DOCX_AVAILABLE:
+                self.assertEqual(assessment, parse_docx_with_python_docx(path))
+
+
+# A body paragraph hosting a text box, whose own paragraph is nested inside a run
+_TEXT_BOX_DOCUMENT = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+            xmlns:v="urn:schemas-microsoft-com:vml"><w:body>
+<w:p><w:r><w:t xml:space="preserve">Name: Jane </w:t></w:r>
+     <w:r><w:pict><v:shape><v:textbox><w:txbxContent><w:p><w:r><w:t>Logo</w:t></w:r></w:p></w:txbxContent></v:textbox></v:shape></w:pict></w:r>
+     <w:r><w:t>Roe</w:t></w:r></w:p>
+<w:tbl><w:tr><w:tc><w:p><w:r><w:t>1.</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Lifts head</w:t></w:r></w:p></w:tc>
+  <w:tc><w:p><w:r><w:pict><v:shape><v:textbox><w:txbxContent><w:p><w:r><w:t>9</w:t></w:r></w:p></w:txbxContent></v:textbox></v:shape></w:pict></w:r><w:r><w:t>2</w:t></w:r></w:p></w:tc></w:tr></w:tbl>
+</w:body></w:document>"""
+
+_REFERENCE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y"]
+
+
+def reference_parse_date(text):
+    """The original format-by-format strptime loop."""
+    text = text.strip()
+    for fmt in _REFERENCE_FORMATS if text else ():
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class TestParsingHelpers(unittest.TestCase):
+    def test_remembered_format_never_changes_results(self):
+        parser = DateParser()
+        self.assertEqual(parser.parse("12/25/2024"), date(2024, 12, 25))  # only %m/%d/%Y fits
+        # Ambiguous: %d/%m/%Y still wins over the remembered US format
+        self.assertEqual(parser.parse("03/04/2024"), date(2024, 4, 3))
+        self.assertEqual(parser.parse("5 March 2024"), date(2024, 3, 5))
+        self.assertEqual(parser.parse("March 5, 2024"), date(2024, 3, 5))
+        self.assertIsNone(parser.parse("31/31/2024"))
+        self.assertIsNone(parser.parse("  "))
+        samples = ["2024-02-30", "1/2/2024", "13/12/2024", "Sept 3, 2024", "3 sep 2024", "2024-2-3", "04/ 5/2024"]
+        for text in samples * 2:
+            self.assertEqual(parser.parse(text), reference_parse_date(text), text)
+
+    def test_cells(self):
+        self.assertEqual([docx_import_service._parse_score(t) for t in (" 2 ", "nt", "", "4", "03", "x")], [2, None, None, None, 3, None])
+        self.assertEqual([docx_import_service._extract_item_number(t) for t in ("12.", " 7 ", "1.2", "", "A1")], [12, 7, None, None, None])
+
+
+@unittest.skipUnless(BENCHMARK, "set GMFM_BENCHMARK=1 to run benchmarks")
+class TestParsingHelpersBenchmark(unittest.TestCase):
+    def test_date_parser_against_strptime_loop(self):
+        # A late-listed house style ("5 March 2024") across a month of intake
+        texts = [f"{day} March 2024" for day in range(1, 32)] * 100
+        parser = DateParser()
+        timings = {}
+        for name, parse in (("strptime loop", reference_parse_date), ("DateParser", parser.parse)):
+            started = time.perf_counter()
+            results = [parse(text) for text in texts]
+            timings[name] = time.perf_counter() - started
+            self.assertEqual(results[0], date(2024, 3, 1))
+        print("\n" + ", ".join(f"{name}: {seconds * 1e6 / len(texts):.1f} us/date" for name, seconds in timings.items()))
+        self.assertLess(timings["DateParser"], timings["strptime loop"] / 3)
+
+    def test_row_helpers_throughput(self):
+        rows = [[f"{item}.", "Description of the item", str(item % 4)] for item in range(1, 89)] * 200
+        result = ImportedAssessment()
+        started = time.perf_counter()
+        for cells in rows:
+            docx_import_service._apply_row(result, cells)
+        elapsed = time.perf_counter() - started
+        print(f"\n{len(rows)} rows in {elapsed * 1000:.1f} ms ({elapsed * 1e6 / len(rows):.2f} us/row)")
+        self.assertEqual(len(result.raw_scores), 88)
+        self.assertLess(elapsed / len(rows), 5e-6)
+
+
+@unittest.skipUnless(BENCHMARK and DOCX_AVAILABLE, "set GMFM_BENCHMARK=1 (needs python-docx)")
+class TestStreamParserBenchmark(unittest.TestCase):
+    ROUNDS = 20
+
+    def test_stream_parser_beats_python_docx(self):
+        timings = {}
+        for parser in (parse_docx_with_python_docx, parse_docx_stream):
+            started = time.perf_counter()
+            for _ in range(self.ROUNDS):
+                parser(GMFCS_DOCX)
+            timings[parser.__name__] = (time.perf_counter() - started) / self.ROUNDS
+        print("\n" + ", ".join(f"{name}: {seconds * 1000:.1f} ms" for name, seconds in timings.items()))
+        self.assertLess(timings["parse_docx_stream"], timings["parse_docx_with_python_docx"])
+
+
+if __name__ == "__main__":
+    unittest.main()
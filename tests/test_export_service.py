@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.data.database import DatabaseContext
+from gmfm_app.data.models import Session, Student
+from gmfm_app.data.repositories import SessionRepository, StudentRepository
+from gmfm_app.services.export_service import (
+    LONG_CSV_HEADER,
+    WIDE_CSV_HEADER,
+    ExportCancelled,
+    ExportJob,
+    export_csv,
+    export_jsonl,
+)
+
+BENCHMARK = os.getenv("GMFM_BENCHMARK") == "1"
+
+
+class ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.out_dir = Path(self.temp_dir.name)
+        self.db_context = DatabaseContext(str(self.out_dir / "export.sqlite"))
+        self.students = StudentRepository(self.db_context)
+        self.sessions = SessionRepository(self.db_context)
+
+    def tearDown(self):
+        self.db_context.close()
+        self.temp_dir.cleanup()
+
+    def _read(self, path):
+        with open(path, encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle]
+
+
+class TestJsonlExport(ExportTestCase):
+    def test_records_group_sessions_under_their_student(self):
+        start = datetime(2024, 1, 1)
+        ada = self.students.create_student(Student(given_name="Ada", family_name="Lovelace", identifier="A1"))
+        self.students.create_student(Student(given_name="Émile", family_name="Borel"))  # no sessions
+        for day, scores in ((2, {1: 3, 88: 0}), (1, {40: 2})):
+            self.sessions.create_session(Session(
+                student_id=ada.id, raw_scores=scores, total_score=1.0, notes=f"day {day}",
+                created_at=start + timedelta(days=day),
+            ))
+
+        seen = []
+        report = export_jsonl(self.db_context, self.out_dir / "out.jsonl", progress=lambda done, total: seen.append((done, total)), fetch_size=2)
+
+        self.assertEqual((report.students, report.sessions), (2, 2))
+        self.assertEqual(seen[-1], (2, 2))
+        self.assertFalse((self.out_dir / "out.jsonl.tmp").exists())
+        records = self._read(report.path)
+        self.assertEqual([r["type"] for r in records], ["student", "session", "session", "student"])
+        self.assertEqual((records[0]["given_name"], records[0]["identifier"]), ("Ada", "A1"))
+        self.assertEqual(records[3]["given_name"], "Émile")
+        self.assertEqual([r["notes"] for r in records[1:3]], ["day 1", "day 2"])  # oldest first
+        self.assertEqual(records[2]["raw_scores"], {"1": 3, "88": 0})
+        self.assertEqual(records[2]["items_scored"], 2)
+        self.assertIn("A", records[2]["domain_scores"])
+
+    def test_empty_database_writes_empty_file(self):
+        report = export_jsonl(self.db_context, self.out_dir / "empty.jsonl")
+        self.assertEqual((report.students, report.sessions), (0, 0))
+        self.assertEqual(report.path.read_text(), "")
+
+
+class TestCsvExport(ExportTestCase):
+    def setUp(self):
+        super().setUp()
+        ada = self.students.create_student(Student(given_name="Ada", family_name="Lovelace", identifier="A1, west"))
+        self.students.create_student(Student(given_name="Grace", family_name="Hopper"))  # no sessions
+        self.session = self.sessions.create_session(
+            Session(student_id=ada.id, raw_scores={1: 3, 2: 1, 88: 0}, total_score=12.5, notes="first")
+        )
+
+    def _read_csv(self, path):
+        with open(path, newline="", encoding="utf-8") as handle:
+            return list(csv.reader(handle))
+
+    def test_wide_layout_has_a_column_per_item(self):
+        report = export_csv(self.db_context, "wide", self.out_dir / "wide.csv", fetch_size=1)
+        header, row = self._read_csv(report.path)
+        self.assertEqual(header, WIDE_CSV_HEADER)
+        self.assertEqual(len(header), 16 + 88)
+        cells = dict(zip(header, row))
+        self.assertEqual((cells["Given Name"], cells["Identifier"], cells["Total %"]), ("Ada", "A1, west", "12.5"))
+        self.assertEqual((cells["Item 1"], cells["Item 2"], cells["Item 3"], cells["Item 88"]), ("3", "1", "", "0"))
+        self.assertEqual(cells["Items Scored"], "3")
+        self.assertNotEqual(cells["A %"], "")
+        self.assertEqual((report.students, report.sessions, report.rows), (2, 1, 1))
+
+    def test_long_layout_has_a_row_per_tested_item(self):
+        report = export_csv(self.db_context, "long", self.out_dir / "long.csv")
+        rows = self._read_csv(report.path)
+        self.assertEqual(rows[0], LONG_CSV_HEADER)
+        self.assertEqual([(r[5], r[6]) for r in rows[1:]], [("1", "3"), ("2", "1"), ("88", "0")])
+        self.assertTrue(all(r[0] == str(self.session.id) and r[2] == "A1, west" for r in rows[1:]))
+
+    def test_unknown_layout_is_rejected(self):
+        with self.assertRaises(ValueError):
+            export_csv(self.db_context, "diagonal", self.out_dir / "x.csv")
+
+    def test_cancel_removes_partial_file(self):
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(ExportCancelled):
+            export_csv(self.db_context, "wide", self.out_dir / "wide.csv", cancel=cancel)
+        self.assertEqual(list(self.out_dir.glob("wide.csv*")), [])
+
+    def test_export_job_runs_in_background_and_reports(self):
+        finished = []
+        job = ExportJob(lambda cancel: export_csv(self.db_context, "wide", self.out_dir / "w.csv", cancel=cancel), finished.append)
+        self.assertTrue(job.start().join(timeout=10))
+        self.assertEqual(finished, [job])
+        self.assertEqual((job.report.sessions, job.cancelled, job.error), (1, False, None))
+
+        job = ExportJob(lambda cancel: export_csv(self.db_context, "long", self.out_dir / "l.csv", cancel=cancel))
+        job.cancel()
+        self.assertTrue(job.start().join(timeout=10))
+        self.assertTrue(job.cancelled)
+        self.assertIsNone(job.report)
+
+
+@unittest.skipUnless(BENCHMARK, "set GMFM_BENCHMARK=1 to run benchmarks")
+class TestJsonlExportBenchmark(ExportTestCase):
+    SESSIONS = 50_000
+
+    def test_export_50k_sessions_in_flat_memory(self):
+        rng = random.Random(3)
+        students = self.students.bulk_create_students(
+            [Student(given_name=f"Given{i}", family_name=f"Family{i}") for i in range(self.SESSIONS // 5)]
+        )
+        self.sessions.bulk_create_sessions(
+            Session(student_id=students[i % len(students)].id, raw_scores={item: rng.randint(0, 3) for item in range(1, 89)})
+            for i in range(self.SESSIONS)
+        )
+
+        started = time.perf_counter()
+        report = export_jsonl(self.db_context, self.out_dir / "big.jsonl")
+        elapsed = time.perf_counter() - started
+        self.assertEqual(report.sessions, self.SESSIONS)
+
+        tracemalloc.start()  # second run: tracing slows the export down many times over
+        export_jsonl(self.db_context, self.out_dir / "big.jsonl")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"\nexported {report.sessions} sessions in {elapsed:.2f}s, peak {peak / 1e6:.1f} MB traced")
+        self.assertLess(peak, 8_000_000)  # a few fetch batches, not the caseload
+
+
+if __name__ == "__main__":
+    unittest.main()
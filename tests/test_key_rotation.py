@@ -0,0 +1,160 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.data.database import DatabaseContext
+from gmfm_app.data.models import Student
+from gmfm_app.data.repositories import StudentRepository
+from gmfm_app.services import security
+from gmfm_app.services.key_rotation import CHECKPOINT_SETTING, rotate_student_keys
+from gmfm_app.services.security import CRYPTO_AVAILABLE, ENV_KEY_VAR, SecurityProvider
+
+BENCHMARK = os.getenv("GMFM_BENCHMARK") == "1"
+
+
+class Interrupted(Exception):
+    pass
+
+
+@unittest.skipUnless(CRYPTO_AVAILABLE, "cryptography not installed")
+class RotationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.temp_dir.name)
+        patcher = mock.patch.object(security, "get_data_dir", return_value=self.data_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        env = mock.patch.dict(os.environ)
+        env.start()
+        os.environ.pop(ENV_KEY_VAR, None)
+        self.addCleanup(env.stop)
+
+        self.provider = SecurityProvider()
+        self.db_context = DatabaseContext(str(self.data_dir / "rotation.sqlite"), security=self.provider)
+        self.students = StudentRepository(self.db_context)
+
+    def tearDown(self):
+        self.provider.shutdown()
+        self.db_context.close()
+        self.temp_dir.cleanup()
+
+    def _key_file(self):
+        return (self.data_dir / security.KEY_FILE_NAME).read_text().split()
+
+
+class TestKeyRotation(RotationTestCase):
+    def _populate(self, count):
+        with self.db_context.connect():
+            for i in range(count):
+                self.students.create_student(Student(given_name=f"Given{i}", family_name=f"Family{i}", identifier=f"ID{i}"))
+
+    def test_rotation_re_encrypts_every_row(self):
+        self._populate(23)
+        old_key = self.provider.keys[0]
+        with self.db_context.connect() as conn:
+            before = conn.execute("SELECT given_name FROM students ORDER BY id").fetchall()
+
+        seen = []
+        report = rotate_student_keys(self.db_context, batch_size=5, progress=lambda done, total: seen.append((done, total)))
+
+        self.assertEqual((report.rows, report.batches, report.unreadable), (23, 5, 0))
+        self.assertEqual(seen[-1], (23, 23))
+        self.assertNotEqual(self.provider.keys, [old_key])
+        self.assertEqual(len(self.provider.keys), 1)
+        self.assertEqual(self._key_file(), [self.provider.keys[0].decode()])
+        with self.db_context.connect() as conn:
+            after = conn.execute("SELECT given_name FROM students ORDER BY id").fetchall()
+            self.assertIsNone(conn.execute("SELECT 1 FROM settings WHERE key = ?", (CHECKPOINT_SETTING,)).fetchone())
+        self.assertTrue(all(a[0] != b[0] for a, b in zip(after, before)))
+
+        students = self.students.list_students(limit=100)
+        self.assertEqual(sorted(s.identifier for s in students), sorted(f"ID{i}" for i in range(23)))
+        self.assertEqual([s.given_name for s in self.students.search_students("given7")], ["Given7"])
+
+    def test_interrupted_rotation_resumes_from_checkpoint(self):
+        self._populate(20)
+
+        def stop_after_two_batches(done, total):
+            if done >= 8:
+                raise Interrupted
+
+        with self.assertRaises(Interrupted):
+            rotate_student_keys(self.db_context, batch_size=4, progress=stop_after_two_batches)
+        # Mid-rotation: both keys are on disk and every row is still readable
+        self.assertEqual(len(self._key_file()), 2)
+        self.assertEqual(len([s for s in self.students.list_students(limit=100) if s.given_name]), 20)
+
+        restarted = SecurityProvider()  # as if the app was relaunched
+        self.db_context.security = restarted
+        self.addCleanup(restarted.shutdown)
+        report = rotate_student_keys(self.db_context, batch_size=4)
+        self.assertEqual((report.resumed_from, report.rows), (8, 12))
+        self.assertEqual(len(restarted.keys), 1)
+        self.assertEqual(len([s for s in self.students.list_students(limit=100) if s.given_name]), 20)
+
+    def test_other_repositories_follow_the_new_search_key(self):
+        self._populate(3)
+        other = StudentRepository(self.db_context)  # e.g. a view opened before the rotation
+        self.assertEqual([s.given_name for s in other.search_students("given1")], ["Given1"])
+
+        rotate_student_keys(self.db_context)
+        fresh = StudentRepository(self.db_context)
+        self.assertEqual([s.given_name for s in fresh.search_students("given2")], ["Given2"])
+        # Tokens written through the older repository must use the new key too
+        added = other.create_student(Student(given_name="Ada", family_name="Lovelace"))
+        self.assertEqual([s.id for s in fresh.search_students("lovelace")], [added.id])
+        self.assertEqual([s.id for s in other.search_students("lovelace")], [added.id])
+
+    def test_env_keys_need_an_explicit_new_key(self):
+        old_key = self.provider.keys[0]
+        self._populate(3)
+        new_key = security.Fernet.generate_key()
+        os.environ[ENV_KEY_VAR] = f"{new_key.decode()} {old_key.decode()}"
+        provider = SecurityProvider()
+        self.addCleanup(provider.shutdown)
+        self.db_context.security = provider
+        with self.assertRaises(RuntimeError):
+            rotate_student_keys(self.db_context)  # a generated key could never be saved
+
+        rotate_student_keys(self.db_context, new_key=new_key)
+        os.environ[ENV_KEY_VAR] = new_key.decode()  # old key dropped, as after a restart
+        restarted = SecurityProvider()
+        self.addCleanup(restarted.shutdown)
+        self.db_context.security = restarted
+        self.assertEqual(sorted(s.given_name for s in self.students.list_students(limit=10)), ["Given0", "Given1", "Given2"])
+
+
+@unittest.skipUnless(BENCHMARK, "set GMFM_BENCHMARK=1 to run benchmarks")
+class TestKeyRotationBenchmark(RotationTestCase):
+    ROWS = 100_000
+
+    def test_rotate_100k_students(self):
+        created = datetime.utcnow().isoformat()
+        values = self.provider.encrypt_many([f"Name{i}" for i in range(self.ROWS)])
+        with self.db_context.connect() as conn:
+            conn.executemany(
+                "INSERT INTO students (given_name, family_name, identifier, created_at) VALUES (?, ?, NULL, ?)",
+                ((value, value, created) for value in values),
+            )
+
+        started = time.perf_counter()
+        report = rotate_student_keys(self.db_context)
+        elapsed = time.perf_counter() - started
+        print(f"\nrotated {report.rows} students in {elapsed:.2f}s ({report.rows / elapsed:,.0f} rows/s)")
+        self.assertEqual((report.rows, report.unreadable), (self.ROWS, 0))
+        sample = self.students.list_students(limit=10)
+        self.assertTrue(all(s.given_name and s.given_name.startswith("Name") for s in sample))
+
+
+if __name__ == "__main__":
+    unittest.main()
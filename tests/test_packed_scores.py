@@ -0,0 +1,46 @@
+import random
+import sys
+from pathlib import Path
+import unittest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.data.models import Session
+from gmfm_app.scoring.engine import calculate_gmfm_scores
+from gmfm_app.scoring.packed import PACKED_SIZE, PackedScores
+
+
+class TestPackedScores(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            raw = {iid: rng.randint(0, 3) for iid in rng.sample(range(1, 89), rng.randint(0, 88))}
+            packed = PackedScores.from_dict(raw)
+            self.assertEqual(len(packed.to_bytes()), PACKED_SIZE)
+            self.assertEqual(packed.to_dict(), raw)
+            self.assertEqual(len(packed), len(raw))
+            self.assertEqual(PackedScores(packed.to_bytes()), packed)
+            self.assertEqual(PackedScores.from_vector(packed.to_vector()), packed)
+
+    def test_json_keys_and_clamping(self):
+        packed = PackedScores.from_dict({"1": "3", "2": 7, "3": -1, "99": 2, "4": None})
+        self.assertEqual(packed.to_dict(), {1: 3, 2: 3, 3: 0})
+        self.assertIsNone(packed.get("1"))
+        self.assertNotIn(4, packed)
+
+    def test_engine_scores_packed_directly(self):
+        raw = {1: 3, 5: 1, 20: 2, 52: 0, 66: 3, 88: 1}
+        packed = PackedScores.from_dict(raw)
+        for scale in ("88", "66"):
+            self.assertEqual(calculate_gmfm_scores(packed, scale), calculate_gmfm_scores(raw, scale))
+
+    def test_session_accepts_packed_scores(self):
+        packed = PackedScores.from_dict({1: 2})
+        self.assertEqual(dict(Session(student_id=1, raw_scores=packed).raw_scores), {1: 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
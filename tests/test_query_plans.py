@@ -0,0 +1,112 @@
+import re
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.data.database import DatabaseContext
+from gmfm_app.data.import_ledger import ImportLedger
+from gmfm_app.data.models import Session, Student
+from gmfm_app.data.repositories import SessionRepository, StudentRepository
+
+# Whole-table aggregates (dashboard totals) and the one-off search index
+# rebuild, which reads every student by design, are allowed to scan
+FULL_SCAN_ALLOWED = re.compile(
+    r"^\s*SELECT\s+((COUNT|AVG)\(.*\bFROM sessions|id, given_name, family_name FROM students)\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+BASE_TABLES = {"sessions", "students", "s", "st"}
+
+
+class TestQueryPlans(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_context = DatabaseContext(str(Path(self.temp_dir.name) / "plans.sqlite"))
+        self.students = StudentRepository(self.db_context)
+        self.sessions = SessionRepository(self.db_context)
+        start = datetime(2024, 1, 1)
+        for i in range(20):
+            student = self.students.create_student(Student(given_name=f"G{i}", family_name=f"F{i}", created_at=start + timedelta(days=i)))
+            for j in range(3):
+                self.sessions.create_session(Session(
+                    student_id=student.id, raw_scores={1: j}, total_score=float(j),
+                    created_at=start + timedelta(days=i, hours=j),
+                ))
+
+    def tearDown(self):
+        self.db_context.close()
+        self.temp_dir.cleanup()
+
+    def _capture(self):
+        statements = []
+        with self.db_context.connect() as conn:
+            conn.set_trace_callback(statements.append)
+        self.addCleanup(self._stop_capture)
+        return statements
+
+    def _stop_capture(self):
+        with self.db_context.connect() as conn:
+            conn.set_trace_callback(None)
+
+    def _run_every_repository_query(self):
+        student = self.students.list_students(limit=5)[0]
+        _, cursor = self.students.list_students_page(limit=5)
+        self.students.list_students_page(after=cursor, limit=5)
+        self.students.search_students("g1")
+        self.students.search_students("g1 f1")
+        self.students.get_student(student.id)
+        self.students.update_student(student)
+        sessions = self.sessions.list_sessions_for_student(student.id)
+        self.sessions.get_session(sessions[0].id)
+        self.sessions.get_latest_session_for_student(student.id)
+        self.sessions.get_recent_sessions(3)
+        self.sessions.get_dashboard_stats()
+        self.sessions.get_latest_session_per_student()
+        self.sessions.get_domain_trend(student.id)
+        self.sessions.get_domain_averages(student.id)
+        self.sessions.update_session(sessions[0])
+        self.sessions.delete_session(sessions[-1].id)
+        # DOCX import lookups: student by name (through the search index) and the ledger
+        self.students.find_student_by_name("G1", "F1")
+        ledger = ImportLedger(self.db_context)
+        with self.db_context.connect() as conn:
+            ledger.known_files(conn, ["0" * 64])
+            ledger.find_scores(conn, "0" * 64)
+
+    def test_repository_queries_use_indexes(self):
+        statements = self._capture()
+        self._run_every_repository_query()
+        self._stop_capture()
+
+        checked = 0
+        with self.db_context.connect() as conn:
+            for sql in statements:
+                if not re.match(r"^\s*(SELECT|UPDATE|DELETE)", sql, re.IGNORECASE):
+                    continue
+                if FULL_SCAN_ALLOWED.match(sql):
+                    continue
+                plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+                checked += 1
+                for detail in plan:
+                    scan = re.match(r"SCAN (\w+)", detail)
+                    if scan and scan.group(1) in BASE_TABLES:
+                        self.assertIn("USING", detail, f"full table scan in {sql!r}: {plan}")
+        self.assertGreaterEqual(checked, 12)
+
+    def test_lookup_indexes_exist(self):
+        with self.db_context.connect() as conn:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name in ("idx_sessions_student_created", "idx_sessions_created", "idx_students_created"):
+            self.assertIn(name, names)
+        # Name lookups go through the search tokens (names may be encrypted)
+        self.assertNotIn("idx_students_name", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
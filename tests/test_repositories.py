@@ -0,0 +1,376 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.data.database import DatabaseContext, init_db
+from gmfm_app.data.models import Session, Student
+from gmfm_app.data.repositories import SessionRepository, StudentRepository
+from gmfm_app.data.search_index import forget_ready
+from gmfm_app.scoring.engine import calculate_gmfm_scores
+from gmfm_app.services.dashboard_service import load_dashboard_snapshot, load_student_page
+
+BENCHMARK = os.getenv("GMFM_BENCHMARK") == "1"
+
+
+class RepositoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "test_db.sqlite"
+        self.db_context = DatabaseContext(str(self.db_path))
+        self.students = StudentRepository(self.db_context)
+        self.sessions = SessionRepository(self.db_context)
+
+    def tearDown(self):
+        self.db_context.close()
+        self.temp_dir.cleanup()
+
+    def _student(self, given="Ada", family="Lovelace"):
+        return self.students.create_student(Student(given_name=given, family_name=family))
+
+
+class TestScoreStorage(RepositoryTestCase):
+    def test_scores_stored_as_packed_blob(self):
+        student = self._student()
+        session = self.sessions.create_session(Session(student_id=student.id, raw_scores={1: 3, 88: 0}, total_score=1.0))
+        with sqlite3.connect(self.db_path) as conn:
+            kind, = conn.execute("SELECT typeof(raw_scores) FROM sessions WHERE id = ?", (session.id,)).fetchone()
+        self.assertEqual(kind, "blob")
+        self.assertEqual(dict(self.sessions.get_session(session.id).raw_scores), {1: 3, 88: 0})
+
+    def test_legacy_json_rows_are_migrated(self):
+        legacy_path = Path(self.temp_dir.name) / "legacy.sqlite"
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute(
+                "CREATE TABLE sessions (id INTEGER PRIMARY KEY, student_id INTEGER NOT NULL, scale TEXT NOT NULL,"
+                " raw_scores TEXT NOT NULL, total_score REAL NOT NULL, notes TEXT, created_at TEXT NOT NULL)"
+            )
+            conn.execute(
+                "INSERT INTO sessions (student_id, scale, raw_scores, total_score, created_at) VALUES (1, '88', ?, 0, '2024-01-01T00:00:00')",
+                (json.dumps({"1": 2, "40": 3}),),
+            )
+        init_db(legacy_path)
+        with sqlite3.connect(legacy_path) as conn:
+            kind, = conn.execute("SELECT typeof(raw_scores) FROM sessions").fetchone()
+        self.assertEqual(kind, "blob")
+        legacy_context = DatabaseContext(str(legacy_path))
+        self.addCleanup(legacy_context.close)
+        migrated = SessionRepository(legacy_context).get_session(1)
+        self.assertEqual(dict(migrated.raw_scores), {1: 2, 40: 3})
+        self.assertEqual(migrated.items_scored, 2)
+        self.assertEqual(migrated.domain_scores["C"], 100.0)
+
+
+class TestDomainColumns(RepositoryTestCase):
+    def test_domain_percentages_written_on_save(self):
+        from gmfm_app.scoring.engine import calculate_gmfm88
+
+        student = self._student()
+        raw = {1: 3, 2: 1, 18: 2, 52: 0}
+        session = self.sessions.create_session(Session(student_id=student.id, raw_scores=raw, total_score=10.0))
+        expected = calculate_gmfm88(raw)["domains"]
+        stored = self.sessions.get_session(session.id)
+        self.assertEqual(stored.domain_scores["A"], expected["Lying & Rolling"]["percent"])
+        self.assertEqual(stored.domain_scores["D"], 0.0)
+        self.assertEqual(stored.items_scored, 4)
+
+        stored.raw_scores = {1: 0}
+        self.sessions.update_session(stored)
+        trend = self.sessions.get_domain_trend(student.id)
+        self.assertEqual(trend[0]["domains"]["A"], 0.0)
+        self.assertEqual(trend[0]["items_scored"], 1)
+        self.assertEqual(self.sessions.get_domain_averages(student.id)["A"], 0.0)
+
+
+class TestConnectionPool(RepositoryTestCase):
+    def test_connections_are_reused(self):
+        student = self._student()
+        for _ in range(5):
+            self.students.get_student(student.id)
+        stats = self.db_context.pool_stats()
+        self.assertEqual(stats["opened"], 1)
+        self.assertEqual(stats["reused"], stats["checkouts"] - 1)
+        with self.db_context.connect() as conn:
+            mode, = conn.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+    def test_finished_threads_release_their_connections(self):
+        self._student()
+        for _ in range(20):
+            worker = threading.Thread(target=self.students.list_students)
+            worker.start()
+            worker.join()
+        stats = self.db_context.pool_stats()
+        self.assertEqual((stats["opened"], stats["closed"], stats["open"]), (21, 20, 1))
+
+    def test_close_all_while_another_thread_is_in_a_block(self):
+        inside, closed, outcome = threading.Event(), threading.Event(), []
+
+        def worker():
+            try:
+                with self.db_context.connect() as conn:
+                    conn.execute("SELECT 1").fetchone()
+                    inside.set()
+                    closed.wait(5)
+            except Exception as exc:
+                outcome.append(exc)
+            # The pool still works for this thread afterwards
+            outcome.append(self.students.list_students())
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertTrue(inside.wait(5))
+        self.db_context.close()
+        closed.set()
+        thread.join(5)
+        # Not an AttributeError from the swapped thread-local
+        self.assertIsInstance(outcome[0], sqlite3.ProgrammingError)
+        self.assertEqual(outcome[1], [])
+
+    def test_failed_block_rolls_back(self):
+        with self.assertRaises(RuntimeError):
+            with self.db_context.connect() as conn:
+                conn.execute("INSERT INTO students (given_name, family_name, created_at) VALUES ('a', 'b', 'c')")
+                raise RuntimeError("boom")
+        self.assertEqual(self.students.list_students(), [])
+
+
+class TestStudentPagination(RepositoryTestCase):
+    def test_keyset_pages_cover_every_student_once(self):
+        start = datetime(2024, 1, 1)
+        # Shared timestamps force the id tie-breaker
+        for i in range(23):
+            self.students.create_student(Student(given_name=f"G{i}", family_name="F", created_at=start + timedelta(days=i // 2)))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.students.list_students_page(after=cursor, limit=5)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual([s.id for s in seen], [s.id for s in self.students.list_students(limit=100)])
+        self.assertEqual(len({s.id for s in seen}), 23)
+
+    def test_cursor_uses_stored_created_at_text(self):
+        with self.db_context.connect() as conn:
+            # Older rows written with a space separator, plus one with an unparsable date
+            conn.executemany(
+                "INSERT INTO students (given_name, family_name, created_at) VALUES (?, 'F', ?)",
+                [(f"G{i}", f"2024-01-0{1 + i // 2} 10:00:00") for i in range(6)] + [("Odd", "unknown")],
+            )
+        seen, cursor = [], None
+        for _ in range(10):  # bounded: a repeating cursor must fail, not hang
+            page, cursor = self.students.list_students_page(after=cursor, limit=2)
+            seen.extend(s.id for s in page)
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), list(range(1, 8)))
+
+        seen, cursor = [], None
+        for _ in range(10):
+            page, _, cursor = load_student_page(self.db_context, after=cursor, limit=3)
+            seen.extend(s.id for s in page)
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), list(range(1, 8)))
+
+    def test_dashboard_pages_follow_snapshot_cursor(self):
+        for i in range(7):
+            self._student(given=f"G{i}")
+        snapshot = load_dashboard_snapshot(self.db_context, student_limit=4)
+        rest, latest, cursor = load_student_page(self.db_context, after=snapshot.next_cursor, limit=4)
+        self.assertIsNone(cursor)
+        self.assertEqual(latest, {})
+        self.assertEqual([s.id for s in snapshot.students + rest], [s.id for s in self.students.list_students(limit=10)])
+
+
+class TestStudentSearch(RepositoryTestCase):
+    def test_search_reaches_beyond_loaded_pages(self):
+        start = datetime(2024, 1, 1)
+        for i in range(120):
+            self.students.create_student(Student(given_name=f"Student{i:03d}", family_name="Filler", created_at=start + timedelta(hours=i)))
+        oldest = self.students.search_students("student000")
+        self.assertEqual([s.given_name for s in oldest], ["Student000"])
+        self.assertEqual(len(self.students.search_students("fil", limit=500)), 120)
+
+    def test_index_follows_updates_and_deletes(self):
+        ada = self._student("Ada", "Lovelace")
+        grace = self._student("Grace", "Hopper")
+        self.assertEqual([s.id for s in self.students.search_students("love")], [ada.id])
+        self.assertEqual([s.id for s in self.students.search_students("ho")], [grace.id])  # word prefix
+        self.assertEqual(self.students.search_students("op"), [])  # short terms match word starts only
+
+        ada.family_name = "Byron"
+        self.students.update_student(ada)
+        self.assertEqual(self.students.search_students("love"), [])
+        self.assertEqual([s.id for s in self.students.search_students("ADA  by")], [ada.id])
+
+        self.students.delete_student(grace.id)
+        self.assertEqual(self.students.search_students("hopper"), [])
+
+    def test_index_stores_no_plaintext_and_rebuilds(self):
+        ada = self._student("Ada", "Lovelace")
+        with self.db_context.connect() as conn:
+            conn.execute("DELETE FROM student_search_tokens")
+            conn.execute("DELETE FROM settings")
+        forget_ready(self.db_context.path)
+        self.assertEqual([s.id for s in self.students.search_students("lovelace")], [ada.id])
+        with self.db_context.connect() as conn:
+            types = {row[0] for row in conn.execute("SELECT DISTINCT typeof(token) FROM student_search_tokens")}
+        self.assertEqual(types, {"integer"})
+
+    def test_rolled_back_rebuild_is_not_trusted(self):
+        ada = self._student("Ada", "Lovelace")
+        with self.db_context.connect() as conn:
+            conn.execute("DELETE FROM student_search_tokens")
+            conn.execute("DELETE FROM settings")
+        forget_ready(self.db_context.path)
+        with self.assertRaises(RuntimeError):
+            with self.db_context.unit_of_work():
+                self.assertEqual([s.id for s in self.students.search_students("lovelace")], [ada.id])
+                raise RuntimeError("import failed")  # rolls back the rebuild and its marker
+        self.assertEqual([s.id for s in self.students.search_students("lovelace")], [ada.id])
+
+
+class TestBulkOperations(RepositoryTestCase):
+    def test_bulk_create_students_assigns_ids_and_indexes(self):
+        existing = self._student("Ada", "Lovelace")
+        created = self.students.bulk_create_students(
+            [Student(given_name=f"Bulk{i}", family_name="Student") for i in range(30)]
+        )
+        self.assertEqual([s.id for s in created], list(range(existing.id + 1, existing.id + 31)))
+        self.assertEqual(self.students.get_student(created[7].id).given_name, "Bulk7")
+        self.assertEqual([s.id for s in self.students.search_students("bulk12")], [created[12].id])
+
+    def test_bulk_create_sessions_matches_single_inserts(self):
+        student = self._student()
+        rng = random.Random(5)
+        sheets = [{item: rng.randint(0, 3) for item in rng.sample(range(1, 89), 40)} for _ in range(25)]
+        single = self.sessions.create_session(Session(student_id=student.id, raw_scores=sheets[0], total_score=1.0))
+
+        commits = self.db_context.pool_stats()["commits"]
+        bulk = self.sessions.bulk_create_sessions(
+            [Session(student_id=student.id, scale="66" if i % 2 else "88", raw_scores=sheet, total_score=float(i)) for i, sheet in enumerate(sheets)]
+        )
+        self.assertEqual(self.db_context.pool_stats()["commits"], commits + 1)
+
+        self.assertEqual([s.id for s in bulk], list(range(single.id + 1, single.id + 26)))
+        self.assertEqual(self.sessions.get_session(bulk[0].id).domain_scores, single.domain_scores)
+        for session, sheet in zip(bulk, sheets):
+            stored = self.sessions.get_session(session.id)
+            self.assertEqual(dict(stored.raw_scores), sheet)
+            self.assertEqual(stored.domain_scores, session.domain_scores)
+            expected = calculate_gmfm_scores(sheet, scale=session.scale)
+            self.assertEqual(stored.items_scored, expected["items_scored"])
+
+    def test_bulk_create_sessions_fills_missing_totals_from_the_engine(self):
+        student = self._student()
+        sheet = {1: 3, 2: 3, 20: 1}
+        given, missing = self.sessions.bulk_create_sessions(
+            [Session(student_id=student.id, raw_scores=sheet, total_score=42.0), Session(student_id=student.id, raw_scores=sheet)]
+        )
+        self.assertEqual(self.sessions.get_session(given.id).total_score, 42.0)
+        self.assertEqual(self.sessions.get_session(missing.id).total_score, calculate_gmfm_scores(sheet, scale="88")["total_percent"])
+
+    def test_unit_of_work_is_all_or_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with self.db_context.unit_of_work():
+                student = self._student()
+                self.sessions.create_session(Session(student_id=student.id, raw_scores={1: 2}, total_score=5.0))
+                raise RuntimeError("abort")
+        self.assertEqual(self.students.list_students(), [])
+        with self.db_context.connect() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0], 0)
+
+    def test_delete_student_cascade(self):
+        keep = self._student("Keep", "Me")
+        gone = self._student("Drop", "Me")
+        self.sessions.bulk_create_sessions(
+            [Session(student_id=sid, raw_scores={1: 1}, total_score=1.0) for sid in (keep.id, gone.id, gone.id)]
+        )
+        self.assertEqual(self.students.delete_student_cascade(gone.id), 2)
+        self.assertIsNone(self.students.get_student(gone.id))
+        self.assertEqual(self.sessions.list_sessions_for_student(gone.id), [])
+        self.assertEqual(len(self.sessions.list_sessions_for_student(keep.id)), 1)
+        self.assertEqual(self.students.search_students("drop"), [])
+
+
+@unittest.skipUnless(BENCHMARK, "set GMFM_BENCHMARK=1 to run benchmarks")
+class TestBulkBenchmark(RepositoryTestCase):
+    ROWS = 10_000
+    BUDGET = 1.5  # seconds per 10k-row import; single core, no numpy
+
+    def test_bulk_import_10k_rows(self):
+        rng = random.Random(7)
+        started = time.perf_counter()
+        students = self.students.bulk_create_students(
+            [Student(given_name=f"Given{i}", family_name=f"Family{i}") for i in range(self.ROWS)]
+        )
+        students_elapsed = time.perf_counter() - started
+        sheets = [{item: rng.randint(0, 3) for item in range(1, 89)} for _ in range(self.ROWS)]
+        started = time.perf_counter()
+        self.sessions.bulk_create_sessions(
+            [Session(student_id=students[i].id, raw_scores=sheet, total_score=0.0) for i, sheet in enumerate(sheets)]
+        )
+        sessions_elapsed = time.perf_counter() - started
+        print(f"\n{self.ROWS} students in {students_elapsed:.3f}s, {self.ROWS} sessions in {sessions_elapsed:.3f}s")
+        self.assertLess(students_elapsed, 2 * self.BUDGET)  # also hashes ~20 search tokens per student
+        self.assertLess(sessions_elapsed, self.BUDGET)
+
+
+class TestDashboardSnapshot(RepositoryTestCase):
+    def test_snapshot_matches_repository_queries(self):
+        start = datetime(2024, 1, 1)
+        for i in range(6):
+            student = self.students.create_student(Student(given_name=f"G{i}", family_name=f"F{i}", created_at=start + timedelta(days=i)))
+            for j in range(i % 3):
+                self.sessions.create_session(Session(
+                    student_id=student.id, raw_scores={1: 3}, total_score=float(10 * i + j),
+                    created_at=start + timedelta(days=i, hours=j),
+                ))
+
+        statements = []
+        with self.db_context.connect() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            snapshot = load_dashboard_snapshot(self.db_context, student_limit=4, recent_limit=3)
+        finally:
+            with self.db_context.connect() as conn:
+                conn.set_trace_callback(None)
+        self.assertEqual(len([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]), 2)
+
+        self.assertEqual(snapshot.students, self.students.list_students(limit=4))
+        for student in snapshot.students:
+            expected = self.sessions.get_latest_session_for_student(student.id)
+            latest = snapshot.latest.get(student.id)
+            if expected is None:
+                self.assertIsNone(latest)
+            else:
+                self.assertEqual((latest.session_id, latest.total_score), (expected.id, expected.total_score))
+
+        recent = self.sessions.get_recent_sessions(3)
+        self.assertEqual([r.session_id for r in snapshot.recent], [r["session"].id for r in recent])
+        self.assertEqual(snapshot.recent[0].student_name, "G5 F5")
+        stats = self.sessions.get_dashboard_stats()
+        self.assertEqual(snapshot.total_students, 6)
+        self.assertEqual(snapshot.total_sessions, stats["total_sessions"])
+
+    def test_empty_database(self):
+        snapshot = load_dashboard_snapshot(self.db_context)
+        self.assertEqual((snapshot.students, snapshot.recent, snapshot.total_sessions), ([], [], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
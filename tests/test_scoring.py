@@ -1,4 +1,6 @@
+import os
 import sys
+import time
 from pathlib import Path
 import unittest
 
@@ -7,8 +9,20 @@ SRC_PATH = PROJECT_ROOT / "src"
 if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
 
-from gmfm_app.scoring.engine import calculate_gmfm66, calculate_gmfm88
+from gmfm_app.scoring.engine import (
+    calculate_gmfm66,
+    calculate_gmfm88,
+    calculate_gmfm_scores,
+    calculate_gmfm_scores_batch,
+    clear_scoring_cache,
+    scoring_cache_info,
+)
 from gmfm_app.scoring.constants import GMFM66_ITEMS, GMFM88_ITEMS
+from gmfm_app.scoring.incremental import IncrementalScorer
+from gmfm_app.scoring.packed import PackedScores
+from gmfm_app.scoring.plan import get_scoring_plan
+
+BENCHMARK = os.getenv("GMFM_BENCHMARK") == "1"
 
 
 class TestScoring(unittest.TestCase):
@@ -26,6 +40,16 @@ class TestScoring(unittest.TestCase):
         for d in result["domains"].values():
             self.assertEqual(d["percent"], 0.0)
 
+    def test_gmfm66_scores_only_its_items(self):
+        plan = get_scoring_plan("66")
+        self.assertEqual(plan.n_items, 66)
+        raw = {iid: 3 for ids in GMFM66_ITEMS.values() for iid in ids}
+        extra = {iid: 0 for ids in GMFM88_ITEMS.values() for iid in ids if iid not in plan.item_slots}
+        result = calculate_gmfm66({**raw, **extra})
+        self.assertEqual(result["total_percent"], 100.0)
+        self.assertEqual(result["items_scored"], 66)
+        self.assertEqual(result["items_total"], 66)
+
     def test_gmfm88_partial_scores(self):
         raw = {ids[0]: 1 for ids in GMFM88_ITEMS.values() if ids}
         result = calculate_gmfm88(raw)
@@ -34,6 +58,76 @@ class TestScoring(unittest.TestCase):
         for d in result["domains"].values():
             self.assertGreaterEqual(d["percent"], 0.0)
 
+    def test_plan_matches_catalog(self):
+        plan = get_scoring_plan("88")
+        self.assertIs(plan, get_scoring_plan("88"))
+        self.assertEqual(plan.n_items, 88)
+        for d, ids in enumerate(GMFM88_ITEMS.values()):
+            self.assertEqual(list(plan.domain_items(d)), list(ids))
+            self.assertEqual(plan.domain_max_scores[d], len(ids) * 3)
+
+    def test_unscored_domains_report_zero_items(self):
+        result = calculate_gmfm88({})
+        self.assertEqual(result["items_scored"], 0)
+        for d in result["domains"].values():
+            self.assertEqual(d["n_items_scored"], 0)
+
+    def test_batch_matches_per_session(self):
+        all_ids = [iid for ids in GMFM88_ITEMS.values() for iid in ids]
+        sessions = [
+            {},
+            {iid: 3 for iid in all_ids},
+            {iid: iid % 4 for iid in all_ids[::3]},
+            {all_ids[0]: 5, all_ids[-1]: -1},
+        ]
+        batch = calculate_gmfm_scores_batch(sessions)
+        self.assertEqual(batch, [calculate_gmfm_scores(raw) for raw in sessions])
+        self.assertEqual(calculate_gmfm_scores_batch([]), [])
+
+    def test_incremental_scorer_tracks_full_rescore(self):
+        scorer = IncrementalScorer("88")
+        raw = {}
+        for iid in list(GMFM88_ITEMS.values())[1][:5]:
+            scorer.set(iid, 2)
+            raw[iid] = 2
+        scorer.set(1, 3)
+        raw[1] = 3
+        scorer.clear_item(raw.popitem()[0])
+        self.assertEqual(scorer.result(), calculate_gmfm88(raw))
+        scorer.fill(3)
+        self.assertEqual(scorer.total_percent, 100.0)
+        scorer.clear()
+        self.assertEqual(scorer.result(), calculate_gmfm88({}))
+
+    def test_repeat_scoring_hits_cache(self):
+        clear_scoring_cache()
+        first = calculate_gmfm88(PackedScores.from_dict({1: 3, 2: "2", 18: 1}))
+        first["domains"].clear()  # callers must not be able to poison the cache
+        second = calculate_gmfm88(PackedScores.from_dict({18: 1, 2: 2, 1: 3, 200: 3}))
+        calculate_gmfm88({1: 3, 2: 2, 18: 1})  # dicts are scored directly
+        info = scoring_cache_info()
+        self.assertEqual((info["hits"], info["misses"]), (1, 1))
+        self.assertEqual(second, calculate_gmfm_scores_batch([{1: 3, 2: 2, 18: 1}])[0])
+        self.assertEqual(second, calculate_gmfm88({1: 3, 2: 2, 18: 1}))
+
+
+@unittest.skipUnless(BENCHMARK, "set GMFM_BENCHMARK=1 to run benchmarks")
+class TestScoreCacheBenchmark(unittest.TestCase):
+    ROUNDS = 5000
+
+    def test_cache_hit_skips_scoring(self):
+        sheets = [PackedScores.from_dict({item: (item * seed) % 4 for item in range(1, 89)}) for seed in range(1, 4)]
+        timings = {}
+        for name in ("miss", "hit"):
+            started = time.perf_counter()
+            for _ in range(self.ROUNDS):
+                if name == "miss":
+                    clear_scoring_cache()
+                for sheet in sheets:
+                    calculate_gmfm88(sheet)
+            timings[name] = (time.perf_counter() - started) / (self.ROUNDS * len(sheets))
+        print("\n" + ", ".join(f"{name}: {seconds * 1e6:.1f} us" for name, seconds in timings.items()))
+        self.assertLess(timings["hit"], timings["miss"] / 2)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,150 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = PROJECT_ROOT / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from gmfm_app.services import security
+from gmfm_app.services.security import (
+    CRYPTO_AVAILABLE,
+    ENV_KEY_VAR,
+    KEY_FILE_NAME,
+    SecurityProvider,
+    _DecryptCache,
+    get_security_provider,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDecryptCache(unittest.TestCase):
+    def test_lru_eviction_and_hit_rate(self):
+        cache = _DecryptCache(maxsize=2, ttl=60)
+        cache.put("t1", "a")
+        cache.put("t2", "b")
+        self.assertEqual(cache.get("t1"), "a")  # t1 becomes most recent
+        cache.put("t3", "c")  # evicts t2
+        self.assertIsNone(cache.get("t2"))
+        self.assertEqual(cache.get("t3"), "c")
+        info = cache.info()
+        self.assertEqual((info["hits"], info["misses"], info["currsize"]), (2, 1, 2))
+        self.assertAlmostEqual(info["hit_rate"], 2 / 3)
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = _DecryptCache(maxsize=8, ttl=10, clock=clock)
+        cache.put("t1", "a")
+        clock.now = 9.9
+        self.assertEqual(cache.get("t1"), "a")
+        clock.now = 10.0
+        self.assertIsNone(cache.get("t1"))
+        self.assertEqual(cache.info()["expired"], 1)
+        self.assertEqual(cache.info()["currsize"], 0)
+
+
+def make_provider():
+    with mock.patch.dict(os.environ, {ENV_KEY_VAR: security.Fernet.generate_key().decode()}):
+        provider = SecurityProvider()
+        provider.warm_up()
+        return provider
+
+
+@unittest.skipUnless(CRYPTO_AVAILABLE, "cryptography not installed")
+class TestProviderDecryptCache(unittest.TestCase):
+    def setUp(self):
+        self.provider = make_provider()
+
+    def test_repeat_decrypts_hit_cache(self):
+        self.assertIsNone(self.provider.decrypt_cache_info())
+        self.provider.enable_decrypt_cache(maxsize=16)
+        token = self.provider.encrypt("Ada")
+        for _ in range(3):
+            self.assertEqual(self.provider.decrypt(token), "Ada")
+        info = self.provider.decrypt_cache_info()
+        self.assertEqual((info["hits"], info["misses"]), (2, 1))
+
+    def test_lock_and_key_change_clear_cache(self):
+        self.provider.enable_decrypt_cache()
+        token = self.provider.encrypt("Ada")
+        self.provider.decrypt(token)
+        self.provider.lock()
+        self.assertEqual(self.provider.decrypt_cache_info()["currsize"], 0)
+
+        self.provider.decrypt(token)
+        self.provider.use_key(security.Fernet.generate_key())
+        self.assertIsNone(self.provider.decrypt(token))  # old token no longer readable
+
+
+@unittest.skipUnless(CRYPTO_AVAILABLE, "cryptography not installed")
+class TestBulkCrypto(unittest.TestCase):
+    def test_many_round_trip_preserves_order(self):
+        provider = make_provider()
+        self.addCleanup(provider.shutdown)
+        values = [f"name-{i}" if i % 7 else None for i in range(1000)]
+        tokens = provider.encrypt_many(values, chunk_size=64)
+        self.assertEqual(len(tokens), len(values))
+        self.assertIsNone(tokens[0])
+        self.assertEqual(provider.decrypt_many(tokens, chunk_size=64), values)
+        self.assertEqual(provider.decrypt_many(tokens[:3]), values[:3])  # below one chunk: inline
+
+
+@unittest.skipIf(CRYPTO_AVAILABLE, "only meaningful without cryptography")
+class TestBulkCryptoPassthrough(unittest.TestCase):
+    def test_values_pass_through_unencrypted(self):
+        provider = SecurityProvider()
+        self.assertEqual(provider.encrypt_many(["a", None]), ["a", None])
+        self.assertEqual(provider.decrypt_many(("a", "b")), ["a", "b"])
+
+
+class TestProviderRegistry(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.data_dir = Path(temp_dir.name)
+        for patcher in (
+            mock.patch.object(security, "get_data_dir", return_value=self.data_dir),
+            mock.patch.dict(security._providers, clear=True),
+            mock.patch.dict(os.environ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.environ.pop(ENV_KEY_VAR, None)
+
+    def test_construction_touches_no_key_file(self):
+        SecurityProvider()
+        self.assertFalse((self.data_dir / KEY_FILE_NAME).exists())
+
+    def test_registry_shares_one_provider_per_key_location(self):
+        first = get_security_provider()
+        self.assertIs(get_security_provider(), first)
+        os.environ[ENV_KEY_VAR] = "other"
+        self.assertIsNot(get_security_provider(), first)
+
+    @unittest.skipUnless(CRYPTO_AVAILABLE, "cryptography not installed")
+    def test_warm_up_loads_existing_keys_without_generating(self):
+        self.assertFalse(get_security_provider().warm_up(generate_key=False))
+        self.assertFalse((self.data_dir / KEY_FILE_NAME).exists())
+
+        key = security.Fernet.generate_key()
+        (self.data_dir / KEY_FILE_NAME).write_text(key.decode())
+        os.environ[ENV_KEY_VAR] = ""  # new registry identity, still file-backed
+        provider = get_security_provider()
+        self.assertTrue(provider.warm_up(generate_key=False))
+        self.assertEqual(provider.keys, [key])
+        self.assertEqual(provider.decrypt(provider.encrypt("Ada")), "Ada")
+
+
+if __name__ == "__main__":
+    unittest.main()